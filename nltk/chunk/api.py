@@ -10,7 +10,13 @@
 ##  Chunk Parser Interface
 ##//////////////////////////////////////////////////////
 
+import time
+from itertools import tee
+
+from six.moves import zip
+
 from nltk.parse import ParserI
+from nltk.util import parallel_apply
 
 from nltk.chunk.util import ChunkScore
 
@@ -33,19 +39,35 @@ class ChunkParserI(ParserI):
         """
         raise NotImplementedError()
 
-    def evaluate(self, gold):
+    def evaluate(self, gold, n_jobs=1, chunksize=64):
         """
         Score the accuracy of the chunker against the gold standard.
         Remove the chunking the gold standard text, rechunk it using
         the chunker, and return a ``ChunkScore`` object
         reflecting the performance of this chunk peraser.
 
+        The gold standard sentences are read one at a time, and scored
+        as they are chunked, so *gold* may be a corpus view or an
+        iterator.  If ``n_jobs`` is not 1, they are chunked by that many
+        worker processes (see ``nltk.util.parallel_apply()``).
+
         :type gold: list(Tree)
         :param gold: The list of chunked sentences to score the chunker on.
+        :param n_jobs: the number of worker processes.
+        :type n_jobs: int
+        :param chunksize: the number of sentences sent to a worker at a
+            time.
+        :type chunksize: int
         :rtype: ChunkScore
         """
+        gold, unchunked = tee(gold)
         chunkscore = ChunkScore()
-        for correct in gold:
-            chunkscore.score(correct, self.parse(correct.leaves()))
+        start = time.time()
+        guesses = parallel_apply(self, 'parse',
+                                 (correct.leaves() for correct in unchunked),
+                                 n_jobs, chunksize)
+        for correct, guessed in zip(gold, guesses):
+            chunkscore.score(correct, guessed)
+        chunkscore.add_time(time.time() - start)
         return chunkscore
 
@@ -127,6 +127,8 @@ class ChunkScore(object):
         self._count = 0
         self._tags_correct = 0.0
         self._tags_total = 0.0
+        self._tokens = 0
+        self._seconds = 0.0
 
         self._measuresNeedUpdate = False
 
@@ -154,6 +156,7 @@ class ChunkScore(object):
         self._correct |= _chunksets(correct, self._count, self._chunk_label)
         self._guessed |= _chunksets(guessed, self._count, self._chunk_label)
         self._count += 1
+        self._tokens += len(correct.leaves())
         self._measuresNeedUpdate = True
         # Keep track of per-tag accuracy (if possible)
         try:
@@ -169,6 +172,23 @@ class ChunkScore(object):
                                                      correct_tags)
                                   if t==g)
 
+    def add_time(self, seconds):
+        """
+        Record that *seconds* were spent chunking the texts scored.
+        """
+        self._seconds += seconds
+
+    def tokens_per_second(self):
+        """
+        Return the number of tokens scored per second spent chunking
+        them (see ``add_time``), or None if no time was recorded.
+
+        :rtype: float or None
+        """
+        if not self._seconds:
+            return None
+        return self._tokens / self._seconds
+
     def accuracy(self):
         """
         Return the overall tag-based accuracy for all text that have
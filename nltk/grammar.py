@@ -71,6 +71,7 @@ with the right hand side (*rhs*) in a tree (*tree*) is known as
 from __future__ import print_function, unicode_literals, division
 
 import re
+from collections import OrderedDict
 from functools import total_ordering
 
 from six import string_types
@@ -731,6 +732,27 @@ class CFG(object):
         return (self.is_flexible_chomsky_normal_form() and
                 self._all_unary_are_lexical)
 
+    def compiled(self):
+        """
+        Return the ``CompiledGrammar`` of this grammar, which holds the
+        tables that the chart parser rules use.  It is built the first
+        time it is needed, and shared by all the parsers (and all the
+        sentences they parse) that use this grammar.
+
+        :rtype: CompiledGrammar
+        """
+        try:
+            return self._compiled
+        except AttributeError:
+            self._compiled = CompiledGrammar(self)
+            return self._compiled
+
+    def __getstate__(self):
+        # The compiled grammar is rebuilt on demand.
+        state = self.__dict__.copy()
+        state.pop('_compiled', None)
+        return state
+
     def __repr__(self):
         return '<Grammar with %d productions>' % len(self._productions)
 
@@ -742,6 +764,287 @@ class CFG(object):
         return result
 
 
+class CompiledGrammar(object):
+    """
+    Tables derived from a ``CFG`` for the chart parsers, which are
+    computed once per grammar rather than once per sentence or edge:
+
+    - the productions for each left-hand side, paired with the terminal
+      that their right-hand side starts with (if any), for top-down
+      prediction;
+    - the set of nullable nonterminals, which can derive the empty
+      string;
+    - the left-corner relation, stored as integer bitsets over the
+      numbers of the nonterminals (a nonterminal ``B`` is a left corner
+      of ``A`` if ``A`` can derive ``B beta``, taking nullable symbols
+      into account), from which the set of words that each symbol can
+      start with is computed on demand.
+
+    Use ``CFG.compiled()`` to get the compiled grammar of a grammar.
+
+        >>> from nltk.grammar import CFG
+        >>> grammar = CFG.fromstring('''
+        ... S -> NP VP
+        ... NP -> Det N | 'John'
+        ... Det -> 'the' |
+        ... VP -> 'walks'
+        ... N -> 'dog'
+        ... ''')
+        >>> compiled = grammar.compiled()
+        >>> sorted(compiled.nullable)
+        [Det]
+        >>> sorted(compiled.first_words(grammar.start()))
+        ['John', 'dog', 'the']
+        >>> compiled.starts_with(grammar.productions()[1].rhs(), 1, 'dog')
+        True
+        >>> compiled.starts_with(grammar.productions()[1].rhs(), 1, 'walks')
+        False
+    """
+    def __init__(self, grammar):
+        """
+        :param grammar: The grammar to compile.
+        :type grammar: CFG
+        """
+        self._grammar = grammar
+        if isinstance(grammar, FeatureGrammar):
+            self._key = grammar._get_type_if_possible
+        else:
+            self._key = None
+
+        self._predictions = {}
+        for (lhs, productions) in grammar._lhs_index.items():
+            self._predictions[lhs] = tuple(
+                (prod, prod._rhs[0] if prod._rhs and is_terminal(prod._rhs[0])
+                 else None) for prod in productions)
+
+        self.nullable = frozenset()
+        """The set of nonterminals that can derive the empty string."""
+        if not grammar.is_nonempty():
+            self.nullable = self._nullable(grammar.productions())
+
+        # The left-corner tables are only built for the grammars whose
+        # parsers need them.
+        self._leftcorner_bits = None
+        self._first_words = {}
+        self._lc_predictions = {}
+
+    @staticmethod
+    def _nullable(productions):
+        nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for prod in productions:
+                if (prod._lhs not in nullable and
+                        all(sym in nullable for sym in prod._rhs)):
+                    nullable.add(prod._lhs)
+                    changed = True
+        return frozenset(nullable)
+
+    def _calculate_leftcorners(self):
+        # Number the nonterminals, and find the immediate left corners
+        # of each of them: the symbols that can start one of its
+        # right-hand sides, after a (possibly empty) nullable prefix.
+        nullable = self.nullable
+        symbols = []
+        ids = {}
+        immediate = []
+        words = []
+        for prod in self._grammar.productions():
+            for sym in (prod._lhs,) + tuple(prod._rhs):
+                if is_nonterminal(sym) and sym not in ids:
+                    ids[sym] = len(symbols)
+                    symbols.append(sym)
+                    immediate.append(0)
+                    words.append(set())
+        for prod in self._grammar.productions():
+            i = ids[prod._lhs]
+            for sym in prod._rhs:
+                if is_terminal(sym):
+                    words[i].add(sym)
+                    break
+                immediate[i] |= 1 << ids[sym]
+                if sym not in nullable:
+                    break
+
+        # Close the relation: the left corners of a left corner of A
+        # are left corners of A.
+        bits = [b | (1 << i) for (i, b) in enumerate(immediate)]
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(bits)):
+                closure = old = bits[i]
+                rest = immediate[i]
+                while rest:
+                    low = rest & -rest
+                    closure |= bits[low.bit_length() - 1]
+                    rest ^= low
+                if closure != old:
+                    bits[i] = closure
+                    changed = True
+
+        self.symbols = symbols
+        """The nonterminals of the grammar, by number."""
+        self.symbol_ids = ids
+        """The number of each nonterminal of the grammar."""
+        self._immediate_words = words
+        self._leftcorner_bits = bits
+
+    def leftcorner_ids(self, cat):
+        """
+        Return the left corners of ``cat`` (including itself) as a
+        bitset: an integer whose bit ``i`` is set if ``symbols[i]`` is
+        a left corner of ``cat``.
+
+        :type cat: Nonterminal
+        :rtype: int
+        """
+        if self._leftcorner_bits is None:
+            self._calculate_leftcorners()
+        i = self.symbol_ids.get(cat)
+        return 0 if i is None else self._leftcorner_bits[i]
+
+    def first_words(self, sym):
+        """
+        Return the set of words that ``sym`` can start with: the
+        terminal itself, if ``sym`` is a terminal.
+
+        :rtype: frozenset
+        """
+        try:
+            return self._first_words[sym]
+        except KeyError:
+            pass
+        if is_terminal(sym):
+            result = frozenset([sym])
+        else:
+            result = set()
+            bits = self.leftcorner_ids(sym)
+            while bits:
+                low = bits & -bits
+                result.update(self._immediate_words[low.bit_length() - 1])
+                bits ^= low
+            result = frozenset(result)
+        self._first_words[sym] = result
+        return result
+
+    def starts_with(self, rhs, index, token):
+        """
+        Return True if ``rhs[index:]`` can start with ``token``, or can
+        derive the empty string.
+
+        :type rhs: tuple(Nonterminal or str)
+        :type index: int
+        :rtype: bool
+        """
+        nullable = self.nullable
+        first_words = self._first_words
+        for i in range(index, len(rhs)):
+            sym = rhs[i]
+            words = first_words.get(sym)
+            if words is None:
+                words = self.first_words(sym)
+            if token in words:
+                return True
+            if sym not in nullable:
+                return False
+        return True
+
+    def predictions(self, lhs):
+        """
+        Return the productions whose left-hand side is ``lhs``, as
+        ``(production, first)`` pairs, where ``first`` is the terminal
+        that the production's right-hand side starts with, or None.
+
+        :rtype: tuple(tuple(Production, str))
+        """
+        if self._key is not None:
+            lhs = self._key(lhs)
+        return self._predictions.get(lhs, ())
+
+    def leftcorner_predictions(self, cat, token):
+        """
+        Return the productions whose right-hand side starts with
+        ``cat``, and whose remaining right-hand side can start with
+        ``token`` (or derive the empty string).
+
+        :type cat: Nonterminal
+        :rtype: tuple(Production)
+        """
+        key = (cat, token)
+        try:
+            return self._lc_predictions[key]
+        except KeyError:
+            result = self._lc_predictions[key] = tuple(
+                prod for prod in self._grammar.productions(rhs=cat)
+                if self.starts_with(prod._rhs, 1, token))
+            return result
+
+
+class CompiledFeatureGrammar(CompiledGrammar):
+    """
+    The ``CompiledGrammar`` of a ``FeatureGrammar``.  Besides the tables
+    of ``CompiledGrammar``, it remembers the results of the unifications
+    made by the feature chart parser rules, so that the same pair of
+    feature structures is only unified once per grammar, rather than
+    once for every pair of edges that holds them.
+
+    The results are kept in a least-recently-used cache of at most
+    ``cache_size`` entries.  The keys are chosen by the rules; they
+    must hold everything that the result depends on.
+
+        >>> from nltk.grammar import FeatureGrammar
+        >>> compiled = FeatureGrammar.fromstring("S -> 'a'").compiled()
+        >>> compiled.cache_size = 2
+        >>> compiled.remember_unification('x', 1)
+        >>> compiled.remember_unification('y', 2)
+        >>> compiled.unification('x')
+        1
+        >>> compiled.remember_unification('z', 3)
+        >>> compiled.unification('y')
+        Traceback (most recent call last):
+          . . .
+        KeyError: 'y'
+    """
+    def __init__(self, grammar, cache_size=100000):
+        """
+        :param grammar: The grammar to compile.
+        :type grammar: FeatureGrammar
+        :param cache_size: The maximum number of unification results
+            that are remembered.
+        :type cache_size: int
+        """
+        CompiledGrammar.__init__(self, grammar)
+        self.cache_size = cache_size
+        self._unifications = OrderedDict()
+
+    def unification(self, key):
+        """
+        Return the unification result remembered for ``key``.
+
+        :raise KeyError: If there is no result for ``key``.
+        """
+        # Move the entry to the (most recently used) end of the cache.
+        result = self._unifications.pop(key)
+        self._unifications[key] = result
+        return result
+
+    def remember_unification(self, key, result):
+        """
+        Remember ``result`` as the unification result for ``key``,
+        evicting the least recently used result if the cache is full.
+        A ``cache_size`` of 0 disables the cache.
+        """
+        if self.cache_size <= 0:
+            return
+        unifications = self._unifications
+        if key not in unifications:
+            while len(unifications) >= self.cache_size:
+                unifications.popitem(last=False)
+        unifications[key] = result
+
+
 class FeatureGrammar(CFG):
     """
     A feature-based grammar.  This is equivalent to a
@@ -826,6 +1129,18 @@ class FeatureGrammar(CFG):
                                           encoding=encoding)
         return cls(start, productions)
 
+    def compiled(self):
+        """
+        Return the ``CompiledFeatureGrammar`` of this grammar.
+
+        :rtype: CompiledFeatureGrammar
+        """
+        try:
+            return self._compiled
+        except AttributeError:
+            self._compiled = CompiledFeatureGrammar(self)
+            return self._compiled
+
     def productions(self, lhs=None, rhs=None, empty=False):
         """
         Return the grammar productions, filtered by the left-hand side
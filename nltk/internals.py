@@ -18,6 +18,7 @@ import types
 import sys
 import stat
 import locale
+import threading
 
 # Use the c version of ElementTree, which is faster, if possible:
 try:
@@ -106,24 +107,9 @@ def java(cmd, classpath=None, stdin=None, stdout=None, stderr=None,
     if stdin == 'pipe': stdin = subprocess.PIPE
     if stdout == 'pipe': stdout = subprocess.PIPE
     if stderr == 'pipe': stderr = subprocess.PIPE
-    if isinstance(cmd, string_types):
-        raise TypeError('cmd should be a list of strings')
-
-    # Make sure we know where a java binary is.
-    if _java_bin is None:
-        config_java()
-
-    # Set up the classpath.
-    if isinstance(classpath, string_types):
-        classpaths=[classpath]
-    else:
-        classpaths=list(classpath)
-    classpath=os.path.pathsep.join(classpaths)
 
     # Construct the full command string.
-    cmd = list(cmd)
-    cmd = ['-cp', classpath] + cmd
-    cmd = [_java_bin] + _java_options + cmd
+    cmd = java_command(cmd, classpath)
 
     # Call java via a subprocess
     p = subprocess.Popen(cmd, stdin=stdin, stdout=stdout, stderr=stderr)
@@ -137,6 +123,36 @@ def java(cmd, classpath=None, stdin=None, stdout=None, stderr=None,
 
     return (stdout, stderr)
 
+def java_command(cmd, classpath=None):
+    """
+    Return the full command line that ``java()`` would run for the given
+    java command, using the current java configuration.  If java has not
+    yet been configured, it will be configured by calling
+    ``config_java()`` with no arguments.
+
+    :param cmd: The java command, formatted as a list of strings.
+    :type cmd: list(str)
+    :param classpath: A ``':'`` separated list of directories, JAR
+        archives, and ZIP archives to search for class files.
+    :type classpath: str
+    :rtype: list(str)
+    """
+    if isinstance(cmd, string_types):
+        raise TypeError('cmd should be a list of strings')
+
+    # Make sure we know where a java binary is.
+    if _java_bin is None:
+        config_java()
+
+    # Set up the classpath.
+    if isinstance(classpath, string_types):
+        classpaths=[classpath]
+    else:
+        classpaths=list(classpath)
+    classpath=os.path.pathsep.join(classpaths)
+
+    return [_java_bin] + _java_options + ['-cp', classpath] + list(cmd)
+
 if 0:
     #config_java(options='-Xmx512m')
     # Write:
@@ -150,6 +166,208 @@ if 0:
                  classpath='/Users/edloper/Desktop/weka/weka.jar')
 
 
+##########################################################################
+# Persistent Subprocesses
+##########################################################################
+
+class PersistentProcess(object):
+    """
+    A long-running external program (or a small pool of copies of it)
+    that is sent items one per line on its standard input, and answers
+    each item with one or more lines on its standard output.  Keeping
+    the program running means that its start-up cost, such as starting
+    a Java virtual machine and loading a model, is paid once rather
+    than on every call.
+
+        >>> import sys
+        >>> echo = ('import sys\\n'
+        ...         'for line in iter(sys.stdin.readline, ""):\\n'
+        ...         '    sys.stdout.write(line.upper())\\n'
+        ...         '    sys.stdout.flush()\\n')
+        >>> with PersistentProcess([sys.executable, '-c', echo]) as process:
+        ...     for answer in process.communicate(['abc', 'def']):
+        ...         print(answer)
+        ['ABC']
+        ['DEF']
+
+    The program must flush its output after answering each item, rather
+    than when its input is closed.  If it exits, closes its output, or
+    writes nothing for ``timeout`` seconds before answering every item
+    in a batch, it is restarted and the batch is sent again, up to
+    ``max_restarts`` times.  Like ``HunposTagger``, a ``PersistentProcess``
+    should be closed when it is no longer needed, or used in a ``with``
+    statement.
+
+    :param cmd: The command that starts the program.
+    :type cmd: list(str)
+    :param item_end: A function that returns true for the last output
+        line answering an item.  By default, each item is answered by
+        exactly one line.
+    :param encoding: The encoding of the program's input and output.
+    :param processes: The number of copies of the program to run.  Each
+        batch is split between them, and they run concurrently.
+    :type processes: int
+    :param max_restarts: The number of times the program is restarted
+        during a single batch before giving up.
+    :type max_restarts: int
+    :param timeout: The number of seconds to wait for each line of
+        output before killing the program, or None to wait forever.
+    :type timeout: float
+    """
+
+    def __init__(self, cmd, item_end=None, encoding='utf8', processes=1,
+                 max_restarts=3, timeout=60):
+        # Set first, so that close() works even if the rest fails.
+        self._processes = []
+        self._devnull = None
+        self._cmd = list(cmd)
+        self._timeout = timeout
+        self._item_end = item_end
+        self._encoding = encoding
+        self._max_restarts = max_restarts
+        self._processes = [None] * processes
+        self._devnull = open(os.devnull, 'wb')
+
+    def _start(self):
+        return subprocess.Popen(self._cmd, stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=self._devnull)
+
+    def _stop(self, index):
+        process = self._processes[index]
+        self._processes[index] = None
+        if process is not None:
+            for stream in (process.stdin, process.stdout):
+                try:
+                    stream.close()
+                except (IOError, OSError):
+                    pass
+            if process.poll() is None:
+                process.terminate()
+            process.wait()
+
+    def close(self):
+        """Stop the program."""
+        for index in range(len(self._processes)):
+            self._stop(index)
+        if self._devnull is not None and not self._devnull.closed:
+            self._devnull.close()
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def communicate(self, items):
+        """
+        Send a batch of items to the program, and return its answers.
+
+        :param items: The items, which must not contain newlines.
+        :type items: list(str)
+        :return: The output lines answering each item, without their
+            line endings.
+        :rtype: list(list(str))
+        """
+        items = list(items)
+        for item in items:
+            if '\n' in item:
+                raise ValueError('Items should not contain newlines')
+
+        numchunks = min(len(self._processes), len(items))
+        if numchunks <= 1:
+            return self._communicate(0, items)
+
+        # Split the batch between the copies of the program, talking to
+        # each from its own thread; the work is done in the subprocesses.
+        size = -(-len(items) // numchunks)
+        results = [None] * numchunks
+        errors = []
+        def run(index):
+            try:
+                results[index] = self._communicate(
+                    index, items[index*size:(index+1)*size])
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run, args=(index,))
+                   for index in range(numchunks)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return [answer for result in results for answer in result]
+
+    def _communicate(self, index, items):
+        for attempt in range(self._max_restarts + 1):
+            if (self._processes[index] is None or
+                    self._processes[index].poll() is not None):
+                self._stop(index)
+                self._processes[index] = self._start()
+            try:
+                return self._exchange(self._processes[index], items)
+            except (IOError, OSError, EOFError):
+                self._stop(index)
+        raise OSError('Command failed %d times: %s' %
+                      (self._max_restarts + 1, ' '.join(self._cmd)))
+
+    def _exchange(self, process, items):
+        # Write from a separate thread, so that neither side can block
+        # the other when the pipes fill up.
+        data = b''.join((item + '\n').encode(self._encoding)
+                        for item in items)
+        def write():
+            try:
+                process.stdin.write(data)
+                process.stdin.flush()
+            except (IOError, OSError):
+                pass  # the program died; reading will fail too
+        writer = threading.Thread(target=write)
+        writer.start()
+
+        # Read from another thread too, so that a program that stops
+        # answering can be given up on after `timeout` seconds.
+        answers = []
+        errors = []
+        lines_read = [0]
+        def read():
+            try:
+                for item in items:
+                    answer = []
+                    while True:
+                        line = process.stdout.readline()
+                        if not line:
+                            raise EOFError('Unexpected end of output')
+                        lines_read[0] += 1
+                        line = line.decode(self._encoding).rstrip('\r\n')
+                        answer.append(line)
+                        if self._item_end is None or self._item_end(line):
+                            break
+                    answers.append(answer)
+            except Exception as e:
+                errors.append(e)
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            while True:
+                seen = lines_read[0]
+                reader.join(self._timeout)
+                if not reader.is_alive():
+                    break
+                if lines_read[0] == seen:
+                    # Killing the program ends the reader's readline().
+                    process.kill()
+                    reader.join()
+                    raise EOFError('No output for %s seconds' % self._timeout)
+        finally:
+            writer.join()
+        if errors:
+            raise errors[0]
+        return answers
+
 ######################################################################
 # Parsing
 ######################################################################
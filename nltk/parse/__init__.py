@@ -43,7 +43,7 @@ three sub-modules for specialized kinds of parsing:
     associates a probability with each parse.
 """
 
-from nltk.parse.api import ParserI
+from nltk.parse.api import ParserI, ParseBudgetExceeded
 from nltk.parse.chart import (ChartParser, SteppingChartParser, TopDownChartParser,
                               BottomUpChartParser, BottomUpLeftCornerChartParser,
                               LeftCornerChartParser)
@@ -68,6 +68,7 @@ from nltk.parse.recursivedescent import (RecursiveDescentParser,
 from nltk.parse.shiftreduce import (ShiftReduceParser, SteppingShiftReduceParser)
 from nltk.parse.util import load_parser, TestGrammar, extract_test_sentences
 from nltk.parse.viterbi import ViterbiParser
+from nltk.parse.cky import CKYParser
 from nltk.parse.dependencygraph import DependencyGraph
 from nltk.parse.projectivedependencyparser import (ProjectiveDependencyParser,
                                                    ProbabilisticProjectiveDependencyParser)
@@ -7,9 +7,20 @@
 # For license information, see LICENSE.TXT
 #
 
+import inspect
 import itertools
+import signal
+import sys
+import threading
 
 from nltk.internals import overridden
+from nltk.util import parallel_apply
+
+class ParseBudgetExceeded(Exception):
+    """
+    Raised when a sentence takes longer to parse than its time budget,
+    or when a chart parser adds more edges than its edge budget.
+    """
 
 class ParserI(object):
     """
@@ -53,9 +64,49 @@ class ParserI(object):
     def parse_sents(self, sents, *args, **kwargs):
         """
         Apply ``self.parse()`` to each element of ``sents``.
+
+        The keyword arguments below are used by ``parse_sents()`` itself;
+        any other arguments are passed on to ``parse()``.  If any of them
+        is given, the parses of each sentence are found (and kept in a
+        list) before they are yielded, and a sentence that goes over its
+        budget yields no parses rather than stopping the batch.
+
+        :param n_jobs: If not 1, parse the sentences in parallel with
+            that many worker processes (one per CPU if ``None``).  The
+            parser, and its grammar, is sent to each worker once; the
+            results are yielded in input order.  See
+            ``nltk.util.parallel_apply()``.
+        :type n_jobs: int
+        :param chunksize: The number of sentences sent to a worker at
+            a time.
+        :type chunksize: int
+        :param timeout: The number of seconds each sentence may take.
+            It is enforced with ``SIGALRM``, so it has no effect on
+            platforms without ``signal.setitimer``, or when parsing in
+            a thread other than the main thread.
+        :type timeout: float
+        :param max_edges: The number of edges each sentence may add to
+            its chart.  Only the chart parsers, which accept ``max_edges``
+            in ``parse()``, support it; for other parsers it raises a
+            ``ValueError``.
+        :type max_edges: int
         :rtype: iter(iter(Tree))
         """
-        return (self.parse(sent, *args, **kwargs) for sent in sents)
+        n_jobs = kwargs.pop('n_jobs', 1)
+        chunksize = kwargs.pop('chunksize', 1)
+        timeout = kwargs.pop('timeout', None)
+        max_edges = kwargs.pop('max_edges', None)
+        if n_jobs == 1 and timeout is None and max_edges is None:
+            return (self.parse(sent, *args, **kwargs) for sent in sents)
+
+        if max_edges is not None:
+            if not _accepts_keyword(self.parse, 'max_edges'):
+                raise ValueError('%s.parse() does not accept max_edges' %
+                                 type(self).__name__)
+            kwargs['max_edges'] = max_edges
+        job = _ParseJob(self, args, kwargs, timeout)
+        return (iter(trees) for trees in
+                parallel_apply(job, 'parse', sents, n_jobs, chunksize))
 
     def parse_all(self, sent, *args, **kwargs):
         """:rtype: list(Tree)"""
@@ -64,3 +115,64 @@ class ParserI(object):
     def parse_one(self, sent, *args, **kwargs):
         """:rtype: Tree or None"""
         return next(self.parse(sent, *args, **kwargs), None)
+
+
+def _accepts_keyword(function, name):
+    """
+    Return True if ``function`` accepts the keyword argument ``name``.
+    """
+    if sys.version_info[0] >= 3:
+        argspec = inspect.getfullargspec(function)
+    else:
+        argspec = inspect.getargspec(function)
+    return name in argspec[0] or argspec[2] is not None
+
+
+class _ParseJob(object):
+    """
+    The task run by ``ParserI.parse_sents()`` for each sentence: parse
+    it within its budget, and return the list of its parses (an empty
+    list if it goes over its budget).
+    """
+    def __init__(self, parser, args, kwargs, timeout):
+        self._parser = parser
+        self._args = args
+        self._kwargs = kwargs
+        self._timeout = timeout
+
+    def parse(self, sent):
+        try:
+            with _time_limit(self._timeout):
+                return list(self._parser.parse(sent, *self._args,
+                                               **self._kwargs))
+        except ParseBudgetExceeded:
+            return []
+
+
+class _time_limit(object):
+    """
+    A context manager that raises ``ParseBudgetExceeded`` in its body
+    after ``seconds`` seconds, where ``SIGALRM`` can be used for that.
+    """
+    def __init__(self, seconds):
+        self._seconds = seconds
+        self._armed = False
+
+    def __enter__(self):
+        if (self._seconds is None or not hasattr(signal, 'setitimer') or
+                not isinstance(threading.current_thread(),
+                               threading._MainThread)):
+            return
+        self._handler = signal.signal(signal.SIGALRM, self._expire)
+        signal.setitimer(signal.ITIMER_REAL, self._seconds)
+        self._armed = True
+
+    def __exit__(self, *exc_info):
+        if self._armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._handler)
+            self._armed = False
+
+    def _expire(self, signum, frame):
+        raise ParseBudgetExceeded('Parsing took more than %s seconds'
+                                  % self._seconds)
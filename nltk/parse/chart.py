@@ -40,17 +40,17 @@ from __future__ import print_function, division, unicode_literals
 import itertools
 import re
 import warnings
+from collections import OrderedDict
 from functools import total_ordering
 
 from six.moves import range
 
 from nltk.tree import Tree
-from nltk.grammar import PCFG, is_nonterminal, is_terminal
-from nltk.util import OrderedDict
+from nltk.grammar import PCFG, is_nonterminal
 from nltk.internals import raise_unorderable_types
 from nltk.compat import python_2_unicode_compatible, unicode_repr
 
-from nltk.parse.api import ParserI
+from nltk.parse.api import ParserI, ParseBudgetExceeded
 
 
 ########################################################################
@@ -90,6 +90,10 @@ class EdgeI(object):
     The ``EdgeI`` interface provides a common interface to both types
     of edge, allowing chart parsers to treat them in a uniform manner.
     """
+    # Charts hold very many edges, so the edge classes keep their
+    # fields in slots rather than in a per-instance dictionary.
+    __slots__ = ()
+
     def __init__(self):
         if self.__class__ == EdgeI:
             raise TypeError('Edge is an abstract interface')
@@ -249,6 +253,8 @@ class TreeEdge(EdgeI):
 
     For more information about edges, see the ``EdgeI`` interface.
     """
+    __slots__ = ('_span', '_lhs', '_rhs', '_dot', '_comparison_key', '_hash')
+
     def __init__(self, span, lhs, rhs, dot=0):
         """
         Construct a new ``TreeEdge``.
@@ -347,6 +353,8 @@ class LeafEdge(EdgeI):
     side is ``()``.  Its span is ``[index, index+1]``, and its dot
     position is ``0``.
     """
+    __slots__ = ('_leaf', '_index', '_comparison_key', '_hash')
+
     def __init__(self, leaf, index):
         """
         Construct a new ``LeafEdge``.
@@ -378,6 +386,29 @@ class LeafEdge(EdgeI):
     def __repr__(self):
         return '[Edge: %s]' % (self)
 
+class _Backpointer(object):
+    """
+    A child pointer in a packed chart: the edge was formed by moving
+    the dot of ``previous`` over ``child``, so its child pointer lists
+    are those of ``previous``, each extended with ``child``.
+    """
+    __slots__ = ('previous', 'child', '_hash')
+
+    def __init__(self, previous, child):
+        self.previous = previous
+        self.child = child
+        self._hash = hash((previous, child))
+
+    def __eq__(self, other):
+        return (isinstance(other, _Backpointer) and
+                self.previous == other.previous and self.child == other.child)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
 ########################################################################
 ##  Chart
 ########################################################################
@@ -409,18 +440,31 @@ class Chart(object):
     :ivar _indexes: A dictionary mapping tuples of edge attributes
         to indices, where each index maps the corresponding edge
         attribute values to lists of edges.
+
+    A *packed* chart stores the child pointers added by
+    ``insert_with_backpointer`` as a single (previous edge, child edge)
+    pair, instead of extending every child pointer list of the
+    previous edge.  The child pointer lists of an edge then form a
+    packed forest that is shared with the edges it was built from, and
+    ``trees`` and ``parses`` read the trees off that forest lazily, one
+    at a time.  This keeps the chart small for highly ambiguous
+    grammars.
     """
-    def __init__(self, tokens):
+    def __init__(self, tokens, packed=False):
         """
         Construct a new chart. The chart is initialized with the
         leaf edges corresponding to the terminal leaves.
 
         :type tokens: list
         :param tokens: The sentence that this chart will be used to parse.
+        :type packed: bool
+        :param packed: Store child pointers as a packed forest, and
+            generate trees lazily from it.
         """
         # Record the sentence token and the sentence length.
         self._tokens = tuple(tokens)
         self._num_leaves = len(self._tokens)
+        self._packed = packed
 
         # Initialise the chart.
         self.initialize()
@@ -577,6 +621,8 @@ class Chart(object):
         """
         Add a new edge to the chart, using a pointer to the previous edge.
         """
+        if self._packed:
+            return self.insert(new_edge, _Backpointer(previous_edge, child_edge))
         cpls = self.child_pointer_lists(previous_edge)
         new_cpls = [cpl+(child_edge,) for cpl in cpls]
         return self.insert(new_edge, *new_cpls)
@@ -596,18 +642,21 @@ class Chart(object):
             the trees (or partial trees) that are associated with ``edge``.
         :rtype: bool
         """
+        # Get the set of child pointer lists for this edge.
+        cpls = self._edge_to_cpls.get(edge)
+
         # Is it a new edge?
-        if edge not in self._edge_to_cpls:
+        if cpls is None:
             # Add it to the list of edges.
             self._append_edge(edge)
             # Register with indexes.
             self._register_with_indexes(edge)
+            cpls = self._edge_to_cpls[edge] = OrderedDict()
 
-        # Get the set of child pointer lists for this edge.
-        cpls = self._edge_to_cpls.setdefault(edge, OrderedDict())
         chart_was_modified = False
         for child_pointer_list in child_pointer_lists:
-            child_pointer_list = tuple(child_pointer_list)
+            if not isinstance(child_pointer_list, _Backpointer):
+                child_pointer_list = tuple(child_pointer_list)
             if child_pointer_list not in cpls:
                 # It's a new CPL; register it, and return true.
                 cpls[child_pointer_list] = True
@@ -644,7 +693,12 @@ class Chart(object):
             Tree may be used to encode that subtree in
             both trees.  If you need to eliminate this subtree
             sharing, then create a deep copy of each tree.
+        :note: In a packed chart the trees are generated lazily, and a
+            tree that contains an edge inside a subtree of that same
+            edge is skipped.
         """
+        if self._packed:
+            return self._iter_trees(edge, complete, (), tree_class)
         return iter(self._trees(edge, complete, memo={}, tree_class=tree_class))
 
     def _trees(self, edge, complete, memo, tree_class):
@@ -703,6 +757,71 @@ class Chart(object):
         # Return the list of trees.
         return trees
 
+    def _iter_trees(self, edge, complete, ancestors, tree_class):
+        """
+        A helper function for ``trees`` in a packed chart, which
+        generates the trees for ``edge`` one at a time.
+
+        :param ancestors: The edges whose trees contain the trees
+            being generated.  They are skipped, which filters out
+            cyclic trees.
+        """
+        # when we're reading trees off the chart, don't use incomplete edges
+        if complete and edge.is_incomplete():
+            return
+
+        # Leaf edges.
+        if isinstance(edge, LeafEdge):
+            yield self._tokens[edge.start()]
+            return
+
+        if edge in ancestors:
+            return
+        ancestors += (edge,)
+
+        lhs = edge.lhs().symbol()
+        unexpanded = edge.rhs()[edge.dot():] if edge.is_incomplete() else ()
+        for children in self._iter_children(edge, complete, ancestors,
+                                            tree_class):
+            # If the edge is incomplete, then extend it with "partial trees".
+            tree = tree_class(lhs, list(children))
+            tree.extend(tree_class(elt, []) for elt in unexpanded)
+            yield tree
+
+    def _iter_children(self, edge, complete, ancestors, tree_class):
+        """
+        A helper function for ``_iter_trees``, which generates a tuple
+        of subtrees for each way of building the children of ``edge``
+        in a packed chart.
+        """
+        for cpl in self._edge_to_cpls.get(edge, ()):
+            if isinstance(cpl, _Backpointer):
+                # The children of the previous edge, followed by the
+                # trees for the new child.
+                for children in self._iter_children(cpl.previous, complete,
+                                                    ancestors, tree_class):
+                    for child in self._iter_trees(cpl.child, complete,
+                                                  ancestors, tree_class):
+                        yield children + (child,)
+            else:
+                for children in self._iter_product(cpl, complete, ancestors,
+                                                   tree_class):
+                    yield children
+
+    def _iter_product(self, cpl, complete, ancestors, tree_class):
+        """
+        A helper function for ``_iter_children``, which lazily generates
+        the product of the trees for each edge in the child pointer
+        list ``cpl``.
+        """
+        if not cpl:
+            yield ()
+            return
+        for first in self._iter_trees(cpl[0], complete, ancestors, tree_class):
+            for rest in self._iter_product(cpl[1:], complete, ancestors,
+                                           tree_class):
+                yield (first,) + rest
+
     def child_pointer_lists(self, edge):
         """
         Return the set of child pointer lists for the given edge.
@@ -711,8 +830,20 @@ class Chart(object):
 
         :rtype: list(list(EdgeI))
         """
-        # Make a copy, in case they modify it.
-        return self._edge_to_cpls.get(edge, {}).keys()
+        cpls = self._edge_to_cpls.get(edge, {})
+        if not self._packed:
+            # Make a copy, in case they modify it.
+            return cpls.keys()
+
+        # Unpack the backpointers of a packed chart.
+        result = []
+        for cpl in cpls:
+            if isinstance(cpl, _Backpointer):
+                result.extend(prev_cpl + (cpl.child,) for prev_cpl in
+                              self.child_pointer_lists(cpl.previous))
+            else:
+                result.append(cpl)
+        return result
 
     #////////////////////////////////////////////////////////////
     # Display
@@ -1073,7 +1204,18 @@ class CachedTopDownPredictRule(TopDownPredictRule):
     """
     def __init__(self):
         TopDownPredictRule.__init__(self)
-        self._done = {}
+        self._chart = self._grammar = None
+        self._done = set()
+
+    def _done_in(self, chart, grammar):
+        """
+        Return the set of ``(next, end)`` pairs that this rule has been
+        applied to in ``chart`` with ``grammar``.
+        """
+        if chart is not self._chart or grammar is not self._grammar:
+            self._chart, self._grammar = chart, grammar
+            self._done = set()
+        return self._done
 
     def apply(self, chart, grammar, edge):
         if edge.is_complete(): return
@@ -1083,24 +1225,22 @@ class CachedTopDownPredictRule(TopDownPredictRule):
         # If we've already applied this rule to an edge with the same
         # next & end, and the chart & grammar have not changed, then
         # just return (no new edges to add).
-        done = self._done.get((nextsym, index), (None,None))
-        if done[0] is chart and done[1] is grammar: return
+        done = self._done_in(chart, grammar)
+        if (nextsym, index) in done: return
 
         # Add all the edges indicated by the top down expand rule.
-        for prod in grammar.productions(lhs=nextsym):
-            # If the left corner in the predicted production is
-            # leaf, it must match with the input.
-            if prod.rhs():
-                first = prod.rhs()[0]
-                if is_terminal(first):
-                    if index >= chart.num_leaves() or first != chart.leaf(index): continue
+        # If the left corner in the predicted production is a leaf,
+        # it must match with the input.
+        leaf = index < chart.num_leaves() and chart.leaf(index)
+        for (prod, first) in grammar.compiled().predictions(nextsym):
+            if first is not None and first != leaf: continue
 
             new_edge = TreeEdge.from_production(prod, index)
             if chart.insert(new_edge, ()):
                 yield new_edge
 
         # Record the fact that we've applied this rule.
-        self._done[nextsym, index] = (chart, grammar)
+        done.add((nextsym, index))
 
 #////////////////////////////////////////////////////////////
 # Bottom-Up Prediction
@@ -1162,21 +1302,23 @@ class FilteredSingleEdgeFundamentalRule(SingleEdgeFundamentalRule):
     def _apply_complete(self, chart, grammar, right_edge):
         end = right_edge.end()
         nexttoken = end < chart.num_leaves() and chart.leaf(end)
+        starts_with = grammar.compiled().starts_with
         for left_edge in chart.select(end=right_edge.start(),
                                       is_complete=False,
                                       nextsym=right_edge.lhs()):
-            if _bottomup_filter(grammar, nexttoken, left_edge.rhs(), left_edge.dot()):
+            if starts_with(left_edge.rhs(), left_edge.dot() + 1, nexttoken):
                 new_edge = left_edge.move_dot_forward(right_edge.end())
                 if chart.insert_with_backpointer(new_edge, left_edge, right_edge):
                     yield new_edge
 
     def _apply_incomplete(self, chart, grammar, left_edge):
+        starts_with = grammar.compiled().starts_with
         for right_edge in chart.select(start=left_edge.end(),
                                        is_complete=True,
                                        lhs=left_edge.nextsym()):
             end = right_edge.end()
             nexttoken = end < chart.num_leaves() and chart.leaf(end)
-            if _bottomup_filter(grammar, nexttoken, left_edge.rhs(), left_edge.dot()):
+            if starts_with(left_edge.rhs(), left_edge.dot() + 1, nexttoken):
                 new_edge = left_edge.move_dot_forward(right_edge.end())
                 if chart.insert_with_backpointer(new_edge, left_edge, right_edge):
                     yield new_edge
@@ -1188,20 +1330,16 @@ class FilteredBottomUpPredictCombineRule(BottomUpPredictCombineRule):
 
         end = edge.end()
         nexttoken = end < chart.num_leaves() and chart.leaf(end)
-        for prod in grammar.productions(rhs=edge.lhs()):
-            if _bottomup_filter(grammar, nexttoken, prod.rhs()):
-                new_edge = TreeEdge(edge.span(), prod.lhs(), prod.rhs(), 1)
-                if chart.insert(new_edge, (edge,)):
-                    yield new_edge
+        compiled = grammar.compiled()
+        for prod in compiled.leftcorner_predictions(edge.lhs(), nexttoken):
+            new_edge = TreeEdge(edge.span(), prod.lhs(), prod.rhs(), 1)
+            if chart.insert(new_edge, (edge,)):
+                yield new_edge
 
 def _bottomup_filter(grammar, nexttoken, rhs, dot=0):
-    if len(rhs) <= dot + 1:
-        return True
-    _next = rhs[dot + 1]
-    if is_terminal(_next):
-        return nexttoken == _next
-    else:
-        return grammar.is_leftcorner(_next, nexttoken)
+    # True if the rest of ``rhs`` after the symbol at ``dot`` can
+    # start with ``nexttoken``.
+    return grammar.compiled().starts_with(rhs, dot + 1, nexttoken)
 
 
 ########################################################################
@@ -1238,7 +1376,8 @@ class ChartParser(ParserI):
     | Return any complete parses in the chart
     """
     def __init__(self, grammar, strategy=BU_LC_STRATEGY, trace=0,
-                 trace_chart_width=50, use_agenda=True, chart_class=Chart):
+                 trace_chart_width=50, use_agenda=True, chart_class=Chart,
+                 packed=False):
         """
         Create a new chart parser, that uses ``grammar`` to parse
         texts.
@@ -1262,6 +1401,9 @@ class ChartParser(ParserI):
             if possible.
         :param chart_class: The class that should be used to create
             the parse charts.
+        :type packed: bool
+        :param packed: Build packed charts, whose parses are generated
+            lazily (see ``Chart``).
         """
         self._grammar = grammar
         self._strategy = strategy
@@ -1271,6 +1413,7 @@ class ChartParser(ParserI):
         # inference rules (NUM_EDGES==1), we can use an agenda-based algorithm:
         self._use_agenda = use_agenda
         self._chart_class = chart_class
+        self._packed = packed
 
         self._axioms = []
         self._inference_rules = []
@@ -1285,6 +1428,12 @@ class ChartParser(ParserI):
     def grammar(self):
         return self._grammar
 
+    def _make_chart(self, tokens):
+        # Chart classes that predate packed charts take only the tokens.
+        if self._packed:
+            return self._chart_class(tokens, packed=True)
+        return self._chart_class(tokens)
+
     def _trace_new_edges(self, chart, rule, new_edges, trace, edge_width):
         if not trace: return
         print_rule_header = trace > 1
@@ -1294,13 +1443,17 @@ class ChartParser(ParserI):
                 print_rule_header = False
             print(chart.pretty_format_edge(edge, edge_width))
 
-    def chart_parse(self, tokens, trace=None):
+    def chart_parse(self, tokens, trace=None, max_edges=None):
         """
         Return the final parse ``Chart`` from which all possible
         parse trees can be extracted.
 
         :param tokens: The sentence to be parsed
         :type tokens: list(str)
+        :param max_edges: The maximum number of edges in the chart.
+        :type max_edges: int
+        :raise ParseBudgetExceeded: If the chart gets more than
+            ``max_edges`` edges.
         :rtype: Chart
         """
         if trace is None: trace = self._trace
@@ -1308,7 +1461,7 @@ class ChartParser(ParserI):
 
         tokens = list(tokens)
         self._grammar.check_coverage(tokens)
-        chart = self._chart_class(tokens)
+        chart = self._make_chart(tokens)
         grammar = self._grammar
 
         # Width, for printing trace edges.
@@ -1333,6 +1486,8 @@ class ChartParser(ParserI):
                     if trace:
                         trace_new_edges(chart, rule, new_edges, trace, trace_edge_width)
                     agenda += new_edges
+                if max_edges is not None:
+                    _check_edge_budget(chart, max_edges)
 
         else:
             # Do not use an agenda-based algorithm.
@@ -1343,14 +1498,21 @@ class ChartParser(ParserI):
                     new_edges = list(rule.apply_everywhere(chart, grammar))
                     edges_added = len(new_edges)
                     trace_new_edges(chart, rule, new_edges, trace, trace_edge_width)
+                    if max_edges is not None:
+                        _check_edge_budget(chart, max_edges)
 
         # Return the final chart.
         return chart
 
-    def parse(self, tokens, tree_class=Tree):
-        chart = self.chart_parse(tokens)
+    def parse(self, tokens, tree_class=Tree, max_edges=None):
+        chart = self.chart_parse(tokens, max_edges=max_edges)
         return iter(chart.parses(self._grammar.start(), tree_class=tree_class))
 
+def _check_edge_budget(chart, max_edges):
+    if chart.num_edges() > max_edges:
+        raise ParseBudgetExceeded('The chart has more than %d edges'
+                                  % max_edges)
+
 class TopDownChartParser(ChartParser):
     """
     A ``ChartParser`` using a top-down parsing strategy.
@@ -0,0 +1,380 @@
+# Natural Language Toolkit: CKY Probabilistic Parser
+#
+# Copyright (C) 2001-2018 NLTK Project
+# URL: <http://nltk.org/>
+# For license information, see LICENSE.TXT
+"""
+A Viterbi parser for probabilistic context free grammars in (flexible)
+Chomsky normal form, which fills its chart with NumPy array operations.
+
+A ``PCFG`` can be put in this form by inducing it from trees that have
+been converted with ``Tree.chomsky_normal_form()`` (see
+``nltk.treetransforms``); the trees it returns can be converted back
+with ``Tree.un_chomsky_normal_form()``.
+"""
+from __future__ import print_function, unicode_literals
+
+import heapq
+import itertools
+from functools import reduce
+
+try:
+    import numpy as np
+except ImportError:
+    pass
+
+from nltk.tree import Tree, ProbabilisticTree
+from nltk.compat import python_2_unicode_compatible
+
+from nltk.parse.api import ParserI
+
+##//////////////////////////////////////////////////////
+##  CKY Parser
+##//////////////////////////////////////////////////////
+
+# The kinds of hyperedges of the chart: productions A -> "s", A -> B C
+# and A -> B.
+_LEXICAL, _BINARY, _UNARY = range(3)
+
+
+@python_2_unicode_compatible
+class CKYParser(ParserI):
+    """
+    A bottom-up ``PCFG`` parser that finds the most likely parses of a
+    text with the CKY algorithm.  Like ``ViterbiParser``, it fills in a
+    table with the probability of the most likely constituent for each
+    span and nonterminal, but the grammar is first compiled into arrays
+    of the nonterminal numbers and log probabilities of its binary and
+    unary productions, and the entries for each span are computed for
+    all the productions and split points at once.
+
+    The grammar must be in flexible Chomsky normal form: every
+    production must be of the form A -> B C, A -> B or A -> "s".
+
+    The ``n`` most likely parses are extracted from the table lazily,
+    with algorithm 3 of Huang and Chiang (2005), "Better k-best
+    parsing"; for grammars with cycles of unary productions, parses
+    that go around a cycle may be missed.
+
+        >>> from nltk.grammar import toy_pcfg1
+        >>> from nltk.parse.cky import CKYParser
+        >>> parser = CKYParser(toy_pcfg1, n=2)
+        >>> for tree in parser.parse('I saw the man with my telescope'.split()):
+        ...     print(tree)
+        (S
+          (NP I)
+          (VP
+            (V saw)
+            (NP
+              (NP (Det the) (N man))
+              (PP (P with) (NP (Det my) (N telescope)))))) (p=0.000104081)
+        (S
+          (NP I)
+          (VP
+            (VP (V saw) (NP (Det the) (N man)))
+            (PP (P with) (NP (Det my) (N telescope))))) (p=4.16325e-05)
+
+    :type _grammar: PCFG
+    :ivar _grammar: The grammar used to parse sentences.
+    :type _n: int
+    :ivar _n: The maximum number of parses returned for a sentence.
+    """
+    def __init__(self, grammar, n=1, trace=0):
+        """
+        Create a new ``CKYParser`` parser, that uses ``grammar`` to
+        parse texts.
+
+        :type grammar: PCFG
+        :param grammar: The grammar used to parse texts.
+        :type n: int
+        :param n: The maximum number of parses to return for a text.
+        :type trace: int
+        :param trace: The level of tracing that should be used when
+            parsing a text.  ``0`` will generate no tracing output;
+            and higher numbers will produce more verbose tracing
+            output.
+        """
+        if not grammar.is_flexible_chomsky_normal_form():
+            raise ValueError('CKYParser requires a grammar in flexible '
+                             'Chomsky normal form (A -> B C, A -> B, '
+                             'A -> "s")')
+        self._grammar = grammar
+        self._n = n
+        self._trace = trace
+        self._compile()
+
+    def grammar(self):
+        return self._grammar
+
+    def trace(self, trace=2):
+        """
+        Set the level of tracing output that should be generated when
+        parsing a text.
+
+        :type trace: int
+        :param trace: The trace level.  A trace level of ``0`` will
+            generate no tracing output; and higher trace levels will
+            produce more verbose tracing output.
+        :rtype: None
+        """
+        self._trace = trace
+
+    def _compile(self):
+        """
+        Number the nonterminals of the grammar, and build the arrays of
+        its binary and unary productions (sorted by left hand side) and
+        the table of its lexical productions.
+        """
+        nonterminals = set([self._grammar.start()])
+        for production in self._grammar.productions():
+            nonterminals.add(production.lhs())
+            if production.is_nonlexical():
+                nonterminals.update(production.rhs())
+        self._nonterminals = sorted(nonterminals, key=lambda nt: nt.symbol())
+        self._index = dict((nt, i) for i, nt in enumerate(self._nonterminals))
+
+        binary, unary = [], []
+        self._lexical = {}
+        for production in self._grammar.productions():
+            if production.is_lexical():
+                self._lexical.setdefault(production.rhs()[0], []).append(
+                    (self._index[production.lhs()], production))
+            elif len(production) == 2:
+                binary.append(production)
+            else:
+                unary.append(production)
+
+        self._binary = self._production_arrays(binary, 2)
+        self._unary = self._production_arrays(unary, 1)
+
+    def _production_arrays(self, productions, width):
+        """
+        Return a dictionary of arrays describing ``productions``, whose
+        right hand sides have ``width`` elements, sorted by left hand
+        side: ``productions``, the sorted productions; ``lhs``, ``rhs``
+        (one column per right hand side element) and ``logprob``, their
+        nonterminal numbers and log probabilities; and ``groups`` and
+        ``parents``, the index of the first production and the left hand
+        side of each group of productions with the same left hand side.
+        """
+        productions = sorted(productions, key=lambda p: self._index[p.lhs()])
+        arrays = {
+            'productions': productions,
+            'lhs': np.array([self._index[p.lhs()] for p in productions],
+                            dtype=int),
+            'rhs': np.array([[self._index[nt] for nt in p.rhs()]
+                             for p in productions], dtype=int
+                            ).reshape(len(productions), width),
+            'logprob': np.array([p.logprob() for p in productions],
+                                dtype=float) * np.log(2),
+        }
+        lhs = arrays['lhs']
+        groups = np.flatnonzero(np.r_[True, lhs[1:] != lhs[:-1]]
+                                if len(productions) else [])
+        arrays['groups'] = groups
+        arrays['parents'] = arrays['lhs'][groups]
+        return arrays
+
+    def parse(self, tokens):
+        # Inherit docs from ParserI
+
+        tokens = list(tokens)
+        self._grammar.check_coverage(tokens)
+        if not tokens:
+            return
+
+        chart = self._fill_chart(tokens)
+        root = (0, len(tokens), self._index[self._grammar.start()])
+        if chart[root] == -np.inf:
+            return
+
+        # The derivations found for each node (start, end, nonterminal),
+        # best first, and the candidates for the next ones.
+        derivations = {}
+        candidates = {}
+        for k in range(self._n):
+            self._kth_best(root, k, tokens, chart, derivations, candidates,
+                           set())
+            if len(derivations[root]) <= k:
+                break
+            yield self._tree(root, k, tokens, derivations)
+
+    def _fill_chart(self, tokens):
+        """
+        Return an array whose entry ``[start, end, i]`` is the log
+        probability of the most likely constituent that covers
+        ``tokens[start:end]`` and whose node value is nonterminal ``i``,
+        or ``-inf`` if there is none.
+        """
+        n = len(tokens)
+        chart = np.full((n, n + 1, len(self._nonterminals)), -np.inf)
+
+        if self._trace:
+            print('Inserting tokens into the most likely constituents table...')
+        for index, token in enumerate(tokens):
+            cell = chart[index, index + 1]
+            for (nt, production) in self._lexical.get(token, ()):
+                cell[nt] = max(cell[nt], production.logprob() * np.log(2))
+            self._close_unary(cell)
+
+        binary = self._binary
+        left, right = binary['rhs'][:, 0], binary['rhs'][:, 1]
+        for length in range(2, n + 1):
+            if self._trace:
+                print('Finding the most likely constituents spanning '
+                      '%d text elements...' % length)
+            if not len(binary['productions']):
+                break
+            for start in range(n - length + 1):
+                end = start + length
+                splits = np.arange(start + 1, end)
+                scores = (chart[start, splits][:, left] +
+                          chart[splits, end][:, right]).max(axis=0)
+                scores += binary['logprob']
+                best = np.maximum.reduceat(scores, binary['groups'])
+                chart[start, end, binary['parents']] = best
+                self._close_unary(chart[start, end])
+        return chart
+
+    def _close_unary(self, cell):
+        """
+        Update the log probabilities of the constituents of a span in
+        ``cell`` with the constituents formed from them by the unary
+        productions, until none of them improves.
+        """
+        unary = self._unary
+        if not len(unary['productions']):
+            return
+        child = unary['rhs'][:, 0]
+        while True:
+            scores = cell[child] + unary['logprob']
+            best = np.maximum.reduceat(scores, unary['groups'])
+            improved = best > cell[unary['parents']]
+            if not improved.any():
+                return
+            cell[unary['parents'][improved]] = best[improved]
+
+    def _edges(self, node, tokens, chart):
+        """
+        Return a list of the ways of building ``node`` from the chart,
+        as ``(logprob, kind, production, tails)`` tuples, where ``tails``
+        are the nodes it is built from and ``logprob`` is the log
+        probability of building it from their most likely constituents.
+        """
+        start, end, nt = node
+        edges = []
+        if end == start + 1:
+            for (lhs, production) in self._lexical.get(tokens[start], ()):
+                if lhs == nt:
+                    edges.append((production.logprob() * np.log(2), _LEXICAL,
+                                  production, ()))
+
+        binary = self._binary
+        group = np.searchsorted(binary['parents'], nt)
+        if end > start + 1 and group < len(binary['parents']) and \
+                binary['parents'][group] == nt:
+            first = binary['groups'][group]
+            last = (binary['groups'][group + 1]
+                    if group + 1 < len(binary['groups'])
+                    else len(binary['productions']))
+            rhs = binary['rhs'][first:last]
+            splits = np.arange(start + 1, end)
+            scores = (chart[start, splits][:, rhs[:, 0]] +
+                      chart[splits, end][:, rhs[:, 1]] +
+                      binary['logprob'][first:last])
+            for (i, j) in zip(*np.nonzero(scores > -np.inf)):
+                split = int(splits[i])
+                edges.append((scores[i, j], _BINARY,
+                              binary['productions'][first + j],
+                              ((start, split, int(rhs[j, 0])),
+                               (split, end, int(rhs[j, 1])))))
+
+        unary = self._unary
+        for i in np.flatnonzero(unary['lhs'] == nt):
+            child = int(unary['rhs'][i, 0])
+            score = chart[start, end, child] + unary['logprob'][i]
+            if score > -np.inf:
+                edges.append((score, _UNARY, unary['productions'][i],
+                              ((start, end, child),)))
+        return edges
+
+    def _kth_best(self, node, k, tokens, chart, derivations, candidates,
+                  active):
+        """
+        Extend the list of derivations of ``node`` in ``derivations``,
+        best first, until it has ``k + 1`` derivations or there are no
+        more.  A derivation is a tuple ``(logprob, production, tails,
+        ranks)``, where ``ranks`` are the ranks of the derivations of
+        the ``tails`` it is built from.  ``active`` holds the nodes whose
+        lists are being extended, which can't be extended again by a
+        cycle of unary productions.
+        """
+        if node not in derivations:
+            derivations[node] = []
+            heap = []
+            counter = itertools.count()
+            for (logprob, kind, production, tails) in self._edges(
+                    node, tokens, chart):
+                ranks = (0,) * len(tails)
+                heap.append((-logprob, next(counter),
+                             (logprob, production, tails, ranks)))
+            heapq.heapify(heap)
+            candidates[node] = (heap, counter, set())
+
+        if node in active:
+            return
+        active.add(node)
+        found = derivations[node]
+        heap, counter, seen = candidates[node]
+        while len(found) <= k:
+            if found:
+                self._push_successors(found[-1], heap, counter, seen, tokens,
+                                      chart, derivations, candidates, active)
+            if not heap:
+                break
+            derivation = heapq.heappop(heap)[2]
+            for (tail, rank) in zip(derivation[2], derivation[3]):
+                self._kth_best(tail, rank, tokens, chart, derivations,
+                               candidates, active)
+            found.append(derivation)
+        active.discard(node)
+
+    def _push_successors(self, derivation, heap, counter, seen, tokens,
+                         chart, derivations, candidates, active):
+        """
+        Add the derivations that use the next derivation of one of the
+        tails of ``derivation`` to the candidates ``heap``.
+        """
+        (logprob, production, tails, ranks) = derivation
+        for i, tail in enumerate(tails):
+            next_ranks = ranks[:i] + (ranks[i] + 1,) + ranks[i+1:]
+            if (production, tails, next_ranks) in seen:
+                continue
+            self._kth_best(tail, next_ranks[i], tokens, chart, derivations,
+                           candidates, active)
+            if next_ranks[i] < len(derivations[tail]):
+                seen.add((production, tails, next_ranks))
+                next_logprob = (logprob - derivations[tail][ranks[i]][0] +
+                                derivations[tail][next_ranks[i]][0])
+                heapq.heappush(heap, (-next_logprob, next(counter),
+                                      (next_logprob, production, tails,
+                                       next_ranks)))
+
+    def _tree(self, node, k, tokens, derivations):
+        """
+        Return the ``ProbabilisticTree`` of the ``k``-th best derivation
+        of ``node``.  Its probability is computed from those of its
+        children as in ``ViterbiParser``.
+        """
+        (logprob, production, tails, ranks) = derivations[node][k]
+        if not tails:
+            children = [tokens[node[0]]]
+        else:
+            children = [self._tree(tail, rank, tokens, derivations)
+                        for (tail, rank) in zip(tails, ranks)]
+        subtrees = [c for c in children if isinstance(c, Tree)]
+        p = reduce(lambda pr, t: pr*t.prob(), subtrees, production.prob())
+        return ProbabilisticTree(production.lhs().symbol(), children, prob=p)
+
+    def __repr__(self):
+        return '<CKYParser for %r>' % self._grammar
@@ -32,6 +32,21 @@ from nltk.compat import python_2_unicode_compatible
 #################################################################
 
 
+def _empty_node():
+    # A module-level function rather than a lambda, so that graphs can
+    # be pickled (e.g., to send parses back from worker processes).
+    return {'address': None,
+            'word': None,
+            'lemma': None,
+            'ctag': None,
+            'tag': None,
+            'feats': None,
+            'head': None,
+            'deps': defaultdict(list),
+            'rel': None,
+            }
+
+
 @python_2_unicode_compatible
 class DependencyGraph(object):
     """
@@ -56,16 +71,7 @@ class DependencyGraph(object):
         identified, for examlple, `ROOT`, `null` or `TOP`.
 
         """
-        self.nodes = defaultdict(lambda:  {'address': None,
-                                           'word': None,
-                                           'lemma': None,
-                                           'ctag': None,
-                                           'tag': None,
-                                           'feats': None,
-                                           'head': None,
-                                           'deps': defaultdict(list),
-                                           'rel': None,
-                                           })
+        self.nodes = defaultdict(_empty_node)
 
         self.nodes[0].update(
             {
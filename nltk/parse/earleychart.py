@@ -35,7 +35,8 @@ from nltk.parse.chart import (Chart, ChartParser, EdgeI, LeafEdge, LeafInitRule,
                               EmptyPredictRule,
                               CachedTopDownPredictRule,
                               FilteredSingleEdgeFundamentalRule,
-                              FilteredBottomUpPredictCombineRule)
+                              FilteredBottomUpPredictCombineRule,
+                              _check_edge_budget)
 from nltk.parse.featurechart import (FeatureChart, FeatureChartParser,
                                      FeatureTopDownInitRule,
                                      FeatureTopDownPredictRule,
@@ -264,7 +265,7 @@ class IncrementalChartParser(ChartParser):
     """
     def __init__(self, grammar, strategy=BU_LC_INCREMENTAL_STRATEGY,
                  trace=0, trace_chart_width=50,
-                 chart_class=IncrementalChart):
+                 chart_class=IncrementalChart, packed=False):
         """
         Create a new Earley chart parser, that uses ``grammar`` to
         parse texts.
@@ -282,11 +283,15 @@ class IncrementalChartParser(ChartParser):
             be used to display edges.
         :param chart_class: The class that should be used to create
             the charts used by this parser.
+        :type packed: bool
+        :param packed: Build packed charts, whose parses are generated
+            lazily (see ``Chart``).
         """
         self._grammar = grammar
         self._trace = trace
         self._trace_chart_width = trace_chart_width
         self._chart_class = chart_class
+        self._packed = packed
 
         self._axioms = []
         self._inference_rules = []
@@ -299,13 +304,13 @@ class IncrementalChartParser(ChartParser):
                 raise ValueError("Incremental inference rules must have "
                                  "NUM_EDGES == 0 or 1")
 
-    def chart_parse(self, tokens, trace=None):
+    def chart_parse(self, tokens, trace=None, max_edges=None):
         if trace is None: trace = self._trace
         trace_new_edges = self._trace_new_edges
 
         tokens = list(tokens)
         self._grammar.check_coverage(tokens)
-        chart = self._chart_class(tokens)
+        chart = self._make_chart(tokens)
         grammar = self._grammar
 
         # Width, for printing trace edges.
@@ -328,6 +333,8 @@ class IncrementalChartParser(ChartParser):
                     for new_edge in new_edges:
                         if new_edge.end()==end:
                             agenda.append(new_edge)
+                if max_edges is not None:
+                    _check_edge_budget(chart, max_edges)
 
         return chart
 
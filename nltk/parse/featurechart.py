@@ -13,6 +13,8 @@ feature structures as nodes.
 """
 from __future__ import print_function, unicode_literals
 
+import weakref
+
 from six.moves import range
 
 from nltk.compat import python_2_unicode_compatible
@@ -20,8 +22,7 @@ from nltk.featstruct import FeatStruct, unify, TYPE, find_variables
 from nltk.sem import logic
 from nltk.tree import Tree
 from nltk.grammar import (Nonterminal, Production, CFG,
-                          FeatStructNonterminal, is_nonterminal,
-                          is_terminal)
+                          FeatStructNonterminal, is_nonterminal)
 from nltk.parse.chart import (TreeEdge, Chart, ChartParser, EdgeI,
                               FundamentalRule, LeafInitRule,
                               EmptyPredictRule, BottomUpPredictRule,
@@ -30,6 +31,33 @@ from nltk.parse.chart import (TreeEdge, Chart, ChartParser, EdgeI,
                               CachedTopDownPredictRule,
                               TopDownInitRule)
 
+#////////////////////////////////////////////////////////////
+# Hash-consing
+#////////////////////////////////////////////////////////////
+
+# The nonterminals that the edges build by applying their bindings are
+# hash-consed: equal feature structures are replaced by one frozen
+# object, so that comparing them (e.g., when an edge is looked up in
+# the chart) is an identity test rather than a traversal.  The table
+# maps each structure to a weak reference to itself, so it does not
+# keep structures alive after the charts that use them are gone.
+_hash_consed = weakref.WeakKeyDictionary()
+
+def _hash_cons(fstruct):
+    """
+    Return the frozen feature structure that is shared by all the
+    structures equal to ``fstruct``; values that are not feature
+    structures are returned as-is.
+    """
+    if not isinstance(fstruct, FeatStruct): return fstruct
+    fstruct.freeze()
+    ref = _hash_consed.get(fstruct)
+    shared = ref and ref()
+    if shared is None:
+        shared = fstruct
+        _hash_consed[fstruct] = weakref.ref(fstruct)
+    return shared
+
 #////////////////////////////////////////////////////////////
 # Tree Edge
 #////////////////////////////////////////////////////////////
@@ -47,6 +75,8 @@ class FeatureTreeEdge(TreeEdge):
     every nonterminal in the edge whose symbol implements the
     interface ``SubstituteBindingsI``.
     """
+    __slots__ = ('_bindings',)
+
     def __init__(self, span, lhs, rhs, dot=0, bindings=None):
         """
         Construct a new edge.  If the edge is incomplete (i.e., if
@@ -102,7 +132,7 @@ class FeatureTreeEdge(TreeEdge):
 
     def _bind(self, nt, bindings):
         if not isinstance(nt, FeatStructNonterminal): return nt
-        return nt.substitute_bindings(bindings)
+        return _hash_cons(nt.substitute_bindings(bindings))
 
     def next_with_bindings(self):
         return self._bind(self.nextsym(), self._bindings)
@@ -123,6 +153,13 @@ class FeatureTreeEdge(TreeEdge):
                               list(self._bindings.values()),
                               fs_class=FeatStruct)
 
+    def _unification_key(self):
+        """
+        Return a key for the parts of this edge that its unifications
+        depend on: everything but its span.
+        """
+        return (self._lhs, self._rhs, self._dot, self._comparison_key[1])
+
     def __str__(self):
         if self.is_complete():
             return TreeEdge.__unicode__(self)
@@ -238,6 +275,11 @@ class FeatureFundamentalRule(FundamentalRule):
     - ``[A -> alpha B3 \* beta][i:j]``
 
     assuming that B1 and B2 can be unified to generate B3.
+
+    The bindings that result from unifying B1 and B2 are remembered
+    by the grammar's ``CompiledFeatureGrammar``, so each combination
+    of an incomplete edge's rule, dot and bindings with a found B2 is
+    only unified once.
     """
     def apply(self, chart, grammar, left_edge, right_edge):
         # Make sure the rule is applicable.
@@ -251,15 +293,22 @@ class FeatureFundamentalRule(FundamentalRule):
         if isinstance(right_edge, FeatureTreeEdge):
             if not is_nonterminal(nextsym): return
             if left_edge.nextsym()[TYPE] != right_edge.lhs()[TYPE]: return
-            # Create a copy of the bindings.
-            bindings = left_edge.bindings()
-            # We rename vars here, because we don't want variables
-            # from the two different productions to match.
-            found = found.rename_variables(used_vars=left_edge.variables())
-            # Unify B1 (left_edge.nextsym) with B2 (right_edge.lhs) to
-            # generate B3 (result).
-            result = unify(nextsym, found, bindings, rename_vars=False)
-            if result is None: return
+            compiled = grammar.compiled()
+            key = ('fundamental', left_edge._unification_key(), found)
+            try:
+                bindings = compiled.unification(key)
+            except KeyError:
+                # Create a copy of the bindings.
+                bindings = left_edge.bindings()
+                # We rename vars here, because we don't want variables
+                # from the two different productions to match.
+                found = found.rename_variables(used_vars=left_edge.variables())
+                # Unify B1 (left_edge.nextsym) with B2 (right_edge.lhs) to
+                # generate B3 (result).
+                if unify(nextsym, found, bindings, rename_vars=False) is None:
+                    bindings = None
+                compiled.remember_unification(key, bindings)
+            if bindings is None: return
         else:
             if nextsym != found: return
             # Create a copy of the bindings.
@@ -336,28 +385,33 @@ class FeatureTopDownPredictRule(CachedTopDownPredictRule):
         # next & end, and the chart & grammar have not changed, then
         # just return (no new edges to add).
         nextsym_with_bindings = edge.next_with_bindings()
-        done = self._done.get((nextsym_with_bindings, index), (None, None))
-        if done[0] is chart and done[1] is grammar:
+        done = self._done_in(chart, grammar)
+        if (nextsym_with_bindings, index) in done:
             return
 
-        for prod in grammar.productions(lhs=nextsym):
-            # If the left corner in the predicted production is
-            # leaf, it must match with the input.
-            if prod.rhs():
-                first = prod.rhs()[0]
-                if is_terminal(first):
-                    if index >= chart.num_leaves(): continue
-                    if first != chart.leaf(index): continue
-
-            # We rename vars here, because we don't want variables
-            # from the two different productions to match.
-            if unify(prod.lhs(), nextsym_with_bindings, rename_vars=True):
+        # If the left corner in the predicted production is a leaf,
+        # it must match with the input.
+        leaf = index < chart.num_leaves() and chart.leaf(index)
+        compiled = grammar.compiled()
+        for (prod, first) in compiled.predictions(nextsym):
+            if first is not None and first != leaf: continue
+
+            key = ('predict', prod.lhs(), nextsym_with_bindings)
+            try:
+                unifies = compiled.unification(key)
+            except KeyError:
+                # We rename vars here, because we don't want variables
+                # from the two different productions to match.
+                unifies = bool(unify(prod.lhs(), nextsym_with_bindings,
+                                     rename_vars=True))
+                compiled.remember_unification(key, unifies)
+            if unifies:
                 new_edge = FeatureTreeEdge.from_production(prod, edge.end())
                 if chart.insert(new_edge, ()):
                     yield new_edge
 
         # Record the fact that we've applied this rule.
-        self._done[nextsym_with_bindings, index] = (chart, grammar)
+        done.add((nextsym_with_bindings, index))
 
 
 #////////////////////////////////////////////////////////////
@@ -380,20 +434,27 @@ class FeatureBottomUpPredictCombineRule(BottomUpPredictCombineRule):
     def apply(self, chart, grammar, edge):
         if edge.is_incomplete(): return
         found = edge.lhs()
+        compiled = grammar.compiled()
         for prod in grammar.productions(rhs=found):
             bindings = {}
             if isinstance(edge, FeatureTreeEdge):
                 _next = prod.rhs()[0]
                 if not is_nonterminal(_next): continue
 
-                # We rename vars here, because we don't want variables
-                # from the two different productions to match.
-                used_vars = find_variables((prod.lhs(),) + prod.rhs(),
-                                           fs_class=FeatStruct)
-                found = found.rename_variables(used_vars=used_vars)
-
-                result = unify(_next, found, bindings, rename_vars=False)
-                if result is None: continue
+                key = ('combine', prod, edge.lhs())
+                try:
+                    bindings = compiled.unification(key)
+                except KeyError:
+                    # We rename vars here, because we don't want variables
+                    # from the two different productions to match.
+                    used_vars = find_variables((prod.lhs(),) + prod.rhs(),
+                                               fs_class=FeatStruct)
+                    found = edge.lhs().rename_variables(used_vars=used_vars)
+
+                    if unify(_next, found, bindings, rename_vars=False) is None:
+                        bindings = None
+                    compiled.remember_unification(key, bindings)
+                if bindings is None: continue
 
             new_edge = (FeatureTreeEdge.from_production(prod, edge.start())
                         .move_dot_forward(edge.end(), bindings))
@@ -463,8 +524,8 @@ class InstantiateVarsChart(FeatureChart):
     variables in the edge's ``lhs`` whose names start with '@' will be
     replaced by unique new ``Variable``s.
     """
-    def __init__(self, tokens):
-        FeatureChart.__init__(self, tokens)
+    def __init__(self, tokens, packed=False):
+        FeatureChart.__init__(self, tokens, packed)
 
     def initialize(self):
         self._instantiated = set()
@@ -8,11 +8,16 @@
 #
 from __future__ import print_function
 
-import math
 import logging
 
 from six.moves import range
 
+try:
+    import numpy as np
+except ImportError:
+    pass
+
+from nltk.parse.api import ParserI
 from nltk.parse.dependencygraph import DependencyGraph
 
 logger = logging.getLogger(__name__)
@@ -70,6 +75,10 @@ class DependencyScorerI(object):
         When used in conjunction with a MaxEntClassifier, each score would
         correspond to the confidence of a particular edge being classified
         with the positive training examples.
+
+        The scores can also be returned as a two-dimensional array, such
+        that scores[0][1] is the score of the arc from node 0 to node 1,
+        with ``-inf`` for the arcs that are not allowed.
         """
         raise NotImplementedError()
 
@@ -140,19 +149,27 @@ class NaiveBayesDependencyScorer(DependencyScorerI):
         Converts the graph into a feature-based representation of
         each edge, and then assigns a score to each based on the
         confidence of the classifier in assigning it to the
-        positive label.  Scores are returned in a multidimensional list.
+        positive label.  The distinct edges are classified in a single
+        call to the classifier's ``prob_classify_many()``.
 
         :type graph: DependencyGraph
         :param graph: A dependency graph to score.
-        :rtype: 3 dimensional list
-        :return: Edge scores for the graph parameter.
+        :rtype: numpy.ndarray
+        :return: Edge scores for the graph parameter, indexed by the
+            addresses of the head and the dependent.
         """
         # Convert graph to feature representation
+        nodes = list(graph.nodes.values())
         edges = []
-        for head_node in graph.nodes.values():
-            for child_node in graph.nodes.values():
-                edges.append(
-                    (
+        edge_indexes = {}
+        arcs = []
+        for head_node in nodes:
+            for child_node in nodes:
+                key = (head_node['word'], head_node['tag'],
+                       child_node['word'], child_node['tag'])
+                if key not in edge_indexes:
+                    edge_indexes[key] = len(edges)
+                    edges.append(
                         dict(
                             a=head_node['word'],
                             b=head_node['tag'],
@@ -160,22 +177,14 @@ class NaiveBayesDependencyScorer(DependencyScorerI):
                             d=child_node['tag'],
                         )
                     )
-                )
+                arcs.append(edge_indexes[key])
 
         # Score edges
-        edge_scores = []
-        row = []
-        count = 0
-        for pdist in self.classifier.prob_classify_many(edges):
-            logger.debug('%.4f %.4f', pdist.prob('T'), pdist.prob('F'))
-            # smoothing in case the probability = 0
-            row.append([math.log(pdist.prob("T")+0.00000000001)])
-            count += 1
-            if count == len(graph.nodes):
-                edge_scores.append(row)
-                row = []
-                count = 0
-        return edge_scores
+        probs = np.array([pdist.prob('T') for pdist in
+                          self.classifier.prob_classify_many(edges)])
+        # smoothing in case the probability = 0
+        edge_scores = np.log(probs + 0.00000000001)[arcs]
+        return edge_scores.reshape(len(nodes), len(nodes))
 
 
 #################################################################
@@ -193,6 +202,151 @@ class DemoScorer(DependencyScorerI):
                 [[], [10], [],   [5]],
                 [[], [8],  [8],  []]]
 
+#################################################################
+# Maximum Spanning Trees
+#################################################################
+
+
+def _score_matrix(scores):
+    """
+    :return: The scores returned by a ``DependencyScorerI``, as a
+        two-dimensional array of floats.
+    :rtype: numpy.ndarray
+    """
+    if isinstance(scores, np.ndarray):
+        return scores.astype(float)
+    return np.array(
+        [[max(cell) if cell else -np.inf for cell in row] for row in scores],
+        dtype=float,
+    )
+
+
+def _find_cycle(heads, active):
+    """
+    :return: The nodes of a cycle in the graph of arcs from ``heads[v]``
+        to each active node ``v`` other than the root node ``0``, or None
+        if there is no cycle.
+    :rtype: list(int)
+    """
+    state = [0] * len(heads)  # 0: unvisited, 1: on the path, 2: done
+    for start, is_active in enumerate(active):
+        if start == 0 or not is_active or state[start]:
+            continue
+        path = []
+        node = start
+        while node != 0 and not state[node]:
+            state[node] = 1
+            path.append(node)
+            node = heads[node]
+        if node != 0 and state[node] == 1:
+            return path[path.index(node):]
+        for node in path:
+            state[node] = 2
+    return None
+
+
+def chu_liu_edmonds(scores):
+    """
+    Find the maximum spanning tree of a graph with the Chu-Liu-Edmonds
+    algorithm, as used in McDonald et al.'s (2005) MST parser.  The
+    graph's nodes are numbered from ``0``, the root, and ``scores[h][d]``
+    is the score of the arc from node ``h`` to node ``d``, or ``-inf``
+    if there is no such arc.  Each node picks its best incoming arc,
+    and each cycle among those arcs is contracted into one node, by
+    updating the rows and columns of the score matrix for its arcs, until
+    there are no cycles left.  Each contraction takes time proportional to
+    the size of the cycle times the number of nodes, so the whole tree is
+    found in O(n^2) time, as in Tarjan (1977).
+
+    The scores of Figure 2 of Keith Hall's "K-best Spanning Tree Parsing":
+
+        >>> from nltk.parse.nonprojectivedependencyparser import chu_liu_edmonds
+        >>> no = float('-inf')
+        >>> chu_liu_edmonds([[no,  5,  1,  1],
+        ...                  [no, no, 11,  4],
+        ...                  [no, 10, no,  5],
+        ...                  [no,  8,  8, no]])
+        [-1, 0, 1, 2]
+
+    :param scores: A square array of arc scores.
+    :type scores: numpy.ndarray or list(list(float))
+    :return: The head of each node in the tree, with ``-1`` for the root.
+    :rtype: list(int)
+    """
+    scores = np.array(scores, dtype=float)
+    n = len(scores)
+    if n == 0:
+        return []
+    np.fill_diagonal(scores, -np.inf)
+    scores[:, 0] = -np.inf
+    nodes = np.arange(n)
+
+    # The original head and dependent of the arc between each pair of
+    # current nodes, the current node that contains each original node,
+    # and the nodes that have not been contracted into others.
+    original_heads = np.repeat(nodes[:, None], n, axis=1)
+    original_deps = np.repeat(nodes[None, :], n, axis=0)
+    containing = nodes.copy()
+    active = np.ones(n, dtype=bool)
+    best_in = scores.argmax(axis=0)
+    best_in[0] = -1
+
+    contractions = []
+    cycle = _find_cycle(best_in.tolist(), active.tolist())
+    while cycle is not None:
+        cycle = np.array(cycle)
+        new_node = cycle[0]
+        cycle_heads = best_in[cycle]
+        contractions.append((
+            new_node, cycle,
+            original_heads[cycle_heads, cycle], original_deps[cycle_heads, cycle],
+            containing.copy(),
+        ))
+        outside = active.copy()
+        outside[cycle] = False
+
+        # The best arc from each node into the cycle, which replaces the
+        # cycle's arc into the same node, and from the cycle to each node.
+        entering = scores[:, cycle] - scores[cycle_heads, cycle]
+        best_entering = cycle[entering.argmax(axis=1)]
+        entering_scores = entering.max(axis=1)
+        best_leaving = cycle[scores[cycle, :].argmax(axis=0)]
+
+        scores[new_node, outside] = scores[best_leaving, nodes][outside]
+        original_heads[new_node, :] = original_heads[best_leaving, nodes]
+        original_deps[new_node, :] = original_deps[best_leaving, nodes]
+        scores[outside, new_node] = entering_scores[outside]
+        original_heads[:, new_node] = original_heads[nodes, best_entering]
+        original_deps[:, new_node] = original_deps[nodes, best_entering]
+        for node in cycle[1:]:
+            scores[node, :] = scores[:, node] = -np.inf
+        scores[new_node, new_node] = -np.inf
+
+        active[cycle[1:]] = False
+        containing[np.isin(containing, cycle)] = new_node
+        best_in[np.isin(best_in, cycle) & active] = new_node
+        best_in[new_node] = scores[:, new_node].argmax()
+        cycle = _find_cycle(best_in.tolist(), active.tolist())
+
+    # Read off the arcs of the tree, then break each contracted cycle at
+    # the node that the arc into it enters.
+    heads = [-1] * n
+    entered = {}
+    for node in nodes[active][1:]:
+        head, dep = original_heads[best_in[node], node], original_deps[best_in[node], node]
+        heads[dep] = head
+        entered[node] = dep
+    for (new_node, cycle, cycle_heads, cycle_deps, containing) in reversed(contractions):
+        dep = entered[new_node]
+        for (node, head, cycle_dep) in zip(cycle, cycle_heads, cycle_deps):
+            if node == containing[dep]:
+                entered[node] = dep
+            else:
+                heads[cycle_dep] = head
+                entered[node] = cycle_dep
+    return [int(head) for head in heads]
+
+
 #################################################################
 # Non-Projective Probabilistic Parsing
 #################################################################
@@ -206,7 +360,8 @@ class ProbabilisticNonprojectiveParser(object):
     typical parses in some languages.  This parser follows the MST parsing
     algorithm, outlined in McDonald(2005), which likens the search for the best
     non-projective parse to finding the maximum spanning tree in a weighted
-    directed graph.
+    directed graph.  The tree is found by ``chu_liu_edmonds()``, from a
+    matrix of the arc scores given by the parser's scorer.
 
     >>> class Scorer(DependencyScorerI):
     ...     def train(self, graphs):
@@ -281,159 +436,6 @@ class ProbabilisticNonprojectiveParser(object):
         """
         self.scores = self._scorer.score(graph)
 
-    def collapse_nodes(self, new_node, cycle_path, g_graph, b_graph, c_graph):
-        """
-        Takes a list of nodes that have been identified to belong to a cycle,
-        and collapses them into on larger node.  The arcs of all nodes in
-        the graph must be updated to account for this.
-
-        :type new_node: Node.
-        :param new_node: A Node (Dictionary) to collapse the cycle nodes into.
-        :type cycle_path: A list of integers.
-        :param cycle_path: A list of node addresses, each of which is in the cycle.
-        :type g_graph, b_graph, c_graph: DependencyGraph
-        :param g_graph, b_graph, c_graph: Graphs which need to be updated.
-        """
-        logger.debug('Collapsing nodes...')
-        # Collapse all cycle nodes into v_n+1 in G_Graph
-        for cycle_node_index in cycle_path:
-            g_graph.remove_by_address(cycle_node_index)
-        g_graph.add_node(new_node)
-        g_graph.redirect_arcs(cycle_path, new_node['address'])
-
-    def update_edge_scores(self, new_node, cycle_path):
-        """
-        Updates the edge scores to reflect a collapse operation into
-        new_node.
-
-        :type new_node: A Node.
-        :param new_node: The node which cycle nodes are collapsed into.
-        :type cycle_path: A list of integers.
-        :param cycle_path: A list of node addresses that belong to the cycle.
-        """
-        logger.debug('cycle %s', cycle_path)
-
-        cycle_path = self.compute_original_indexes(cycle_path)
-
-        logger.debug('old cycle %s', cycle_path)
-        logger.debug('Prior to update: %s', self.scores)
-
-        for i, row in enumerate(self.scores):
-            for j, column in enumerate(self.scores[i]):
-                logger.debug(self.scores[i][j])
-                if (
-                    j in cycle_path
-                    and i not in cycle_path
-                    and self.scores[i][j]
-                ):
-                    subtract_val = self.compute_max_subtract_score(j, cycle_path)
-
-                    logger.debug('%s - %s', self.scores[i][j], subtract_val)
-
-                    new_vals = []
-                    for cur_val in self.scores[i][j]:
-                        new_vals.append(cur_val - subtract_val)
-
-                    self.scores[i][j] = new_vals
-
-        for i, row in enumerate(self.scores):
-            for j, cell in enumerate(self.scores[i]):
-                if i in cycle_path and j in cycle_path:
-                    self.scores[i][j] = []
-
-        logger.debug('After update: %s', self.scores)
-
-    def compute_original_indexes(self, new_indexes):
-        """
-        As nodes are collapsed into others, they are replaced
-        by the new node in the graph, but it's still necessary
-        to keep track of what these original nodes were.  This
-        takes a list of node addresses and replaces any collapsed
-        node addresses with their original addresses.
-
-        :type new_indexes: A list of integers.
-        :param new_indexes: A list of node addresses to check for
-        subsumed nodes.
-        """
-        swapped = True
-        while swapped:
-            originals = []
-            swapped = False
-            for new_index in new_indexes:
-                if new_index in self.inner_nodes:
-                    for old_val in self.inner_nodes[new_index]:
-                        if old_val not in originals:
-                            originals.append(old_val)
-                            swapped = True
-                else:
-                    originals.append(new_index)
-            new_indexes = originals
-        return new_indexes
-
-    def compute_max_subtract_score(self, column_index, cycle_indexes):
-        """
-        When updating scores the score of the highest-weighted incoming
-        arc is subtracted upon collapse.  This returns the correct
-        amount to subtract from that edge.
-
-        :type column_index: integer.
-        :param column_index: A index representing the column of incoming arcs
-        to a particular node being updated
-        :type cycle_indexes: A list of integers.
-        :param cycle_indexes: Only arcs from cycle nodes are considered.  This
-        is a list of such nodes addresses.
-        """
-        max_score = -100000
-        for row_index in cycle_indexes:
-            for subtract_val in self.scores[row_index][column_index]:
-                if subtract_val > max_score:
-                    max_score = subtract_val
-        return max_score
-
-    def best_incoming_arc(self, node_index):
-        """
-        Returns the source of the best incoming arc to the
-        node with address: node_index
-
-        :type node_index: integer.
-        :param node_index: The address of the 'destination' node,
-        the node that is arced to.
-        """
-        originals = self.compute_original_indexes([node_index])
-        logger.debug('originals: %s', originals)
-
-        max_arc = None
-        max_score = None
-        for row_index in range(len(self.scores)):
-            for col_index in range(len(self.scores[row_index])):
-                # print self.scores[row_index][col_index]
-                if col_index in originals and (max_score is None or self.scores[row_index][col_index] > max_score):
-                    max_score = self.scores[row_index][col_index]
-                    max_arc = row_index
-                    logger.debug('%s, %s', row_index, col_index)
-
-        logger.debug(max_score)
-
-        for key in self.inner_nodes:
-            replaced_nodes = self.inner_nodes[key]
-            if max_arc in replaced_nodes:
-                return key
-
-        return max_arc
-
-    def original_best_arc(self, node_index):
-        originals = self.compute_original_indexes([node_index])
-        max_arc = None
-        max_score = None
-        max_orig = None
-        for row_index in range(len(self.scores)):
-            for col_index in range(len(self.scores[row_index])):
-                if col_index in originals and (max_score is None or self.scores[row_index][col_index] > max_score):
-                    max_score = self.scores[row_index][col_index]
-                    max_arc = row_index
-                    max_orig = col_index
-        return [max_arc, max_orig]
-
     def parse(self, tokens, tags):
         """
         Parses a list of tokens in accordance to the MST parsing algorithm
@@ -449,8 +451,6 @@ class ProbabilisticNonprojectiveParser(object):
         :return: An iterator of non-projective parses.
         :rtype: iter(DependencyGraph)
         """
-        self.inner_nodes = {}
-
         # Initialize g_graph
         g_graph = DependencyGraph()
         for index, token in enumerate(tokens):
@@ -462,8 +462,6 @@ class ProbabilisticNonprojectiveParser(object):
                     'address': index + 1,
                 }
             )
-        #print (g_graph.nodes)
-
 
         # Fully connect non-root nodes in g_graph
         g_graph.connect_graph()
@@ -478,95 +476,14 @@ class ProbabilisticNonprojectiveParser(object):
                 }
             )
 
-        b_graph = DependencyGraph()
-        c_graph = DependencyGraph()
-
-        for index, token in enumerate(tokens):
-            c_graph.nodes[index + 1].update(
-                {
-                    'word': token,
-                    'tag': tags[index],
-                    'rel': 'NTOP',
-                    'address': index + 1,
-                }
-            )
-
         # Assign initial scores to g_graph edges
         self.initialize_edge_scores(g_graph)
         logger.debug(self.scores)
-        # Initialize a list of unvisited vertices (by node address)
-        unvisited_vertices = [
-            vertex['address'] for vertex in c_graph.nodes.values()
-        ]
-        # Iterate over unvisited vertices
-        nr_vertices = len(tokens)
-        betas = {}
-        while unvisited_vertices:
-            # Mark current node as visited
-            current_vertex = unvisited_vertices.pop(0)
-            logger.debug('current_vertex: %s', current_vertex)
-            # Get corresponding node n_i to vertex v_i
-            current_node = g_graph.get_by_address(current_vertex)
-            logger.debug('current_node: %s', current_node)
-            # Get best in-edge node b for current node
-            best_in_edge = self.best_incoming_arc(current_vertex)
-            betas[current_vertex] = self.original_best_arc(current_vertex)
-            logger.debug('best in arc: %s --> %s', best_in_edge, current_vertex)
-            # b_graph = Union(b_graph, b)
-            for new_vertex in [current_vertex, best_in_edge]:
-                b_graph.nodes[new_vertex].update(
-                    {
-                        'word': 'TEMP',
-                        'rel': 'NTOP',
-                        'address': new_vertex,
-                    }
-                )
-            b_graph.add_arc(best_in_edge, current_vertex)
-            # Beta(current node) = b  - stored for parse recovery
-            # If b_graph contains a cycle, collapse it
-            cycle_path = b_graph.contains_cycle()
-            if cycle_path:
-                # Create a new node v_n+1 with address = len(nodes) + 1
-                new_node = {
-                    'word': 'NONE',
-                    'rel': 'NTOP',
-                    'address': nr_vertices + 1,
-                }
-                # c_graph = Union(c_graph, v_n+1)
-                c_graph.add_node(new_node)
-                # Collapse all nodes in cycle C into v_n+1
-                self.update_edge_scores(new_node, cycle_path)
-                self.collapse_nodes(new_node, cycle_path, g_graph, b_graph, c_graph)
-                for cycle_index in cycle_path:
-                    c_graph.add_arc(new_node['address'], cycle_index)
-                    # self.replaced_by[cycle_index] = new_node['address']
-
-                self.inner_nodes[new_node['address']] = cycle_path
-
-                # Add v_n+1 to list of unvisited vertices
-                unvisited_vertices.insert(0, nr_vertices + 1)
-
-                # increment # of nodes counter
-                nr_vertices += 1
-
-                # Remove cycle nodes from b_graph; B = B - cycle c
-                for cycle_node_address in cycle_path:
-                    b_graph.remove_by_address(cycle_node_address)
-
-            logger.debug('g_graph: %s', g_graph)
-            logger.debug('b_graph: %s', b_graph)
-            logger.debug('c_graph: %s', c_graph)
-            logger.debug('Betas: %s', betas)
-            logger.debug('replaced nodes %s', self.inner_nodes)
-
-        # Recover parse tree
-        logger.debug('Final scores: %s', self.scores)
 
-        logger.debug('Recovering parse...')
-        for i in range(len(tokens) + 1, nr_vertices + 1):
-            betas[betas[i][1]] = betas[i]
+        # Find the maximum spanning tree
+        heads = chu_liu_edmonds(_score_matrix(self.scores))
+        logger.debug('Heads: %s', heads)
 
-        logger.debug('Betas: %s', betas)
         for node in original_graph.nodes.values():
             # TODO: It's dangerous to assume that deps it a dictionary
             # because it's a default dictionary. Ideally, here we should not
@@ -574,7 +491,7 @@ class ProbabilisticNonprojectiveParser(object):
             # graph.
             node['deps'] = {}
         for i in range(1, len(tokens) + 1):
-            original_graph.add_arc(betas[i][0], betas[i][1])
+            original_graph.add_arc(heads[i], i)
 
         logger.debug('Done.')
         yield original_graph
@@ -584,7 +501,7 @@ class ProbabilisticNonprojectiveParser(object):
 #################################################################
 
 
-class NonprojectiveDependencyParser(object):
+class NonprojectiveDependencyParser(ParserI):
     """
     A non-projective, rule-based, dependency parser.  This parser
     will return the set of all possible non-projective parses based on
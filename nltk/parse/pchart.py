@@ -28,6 +28,9 @@ search strategies.  Currently the following subclasses are defined:
 The ``BottomUpProbabilisticChartParser`` constructor has an optional
 argument beam_size.  If non-zero, this controls the size of the beam
 (aka the edge queue).  This option is most useful with InsideChartParser.
+It also has an optional argument beam_threshold, which discards each
+complete edge whose probability is less than beam_threshold times the
+probability of the best complete edge with the same span.
 """
 from __future__ import print_function, unicode_literals
 
@@ -38,19 +41,28 @@ from __future__ import print_function, unicode_literals
 # [XX] This might not be implemented quite right -- it would be better
 # to associate probabilities with child pointer lists.
 
+import heapq
+import itertools
 from functools import reduce
+
 from nltk.tree import Tree, ProbabilisticTree
 from nltk.grammar import Nonterminal, PCFG
 
+from nltk.internals import overridden
 from nltk.parse.api import ParserI
-from nltk.parse.chart import Chart, LeafEdge, TreeEdge, AbstractChartRule
+from nltk.parse.chart import (Chart, LeafEdge, TreeEdge, AbstractChartRule,
+                              _check_edge_budget)
 from nltk.compat import python_2_unicode_compatible
 
 # Probabilistic edges
 class ProbabilisticLeafEdge(LeafEdge):
+    __slots__ = ()
+
     def prob(self): return 1.0
 
 class ProbabilisticTreeEdge(TreeEdge):
+    __slots__ = ('_prob',)
+
     def __init__(self, prob, *args, **kwargs):
         TreeEdge.__init__(self, *args, **kwargs)
         self._prob = prob
@@ -77,11 +89,10 @@ class ProbabilisticBottomUpPredictRule(AbstractChartRule):
     NUM_EDGES=1
     def apply(self, chart, grammar, edge):
         if edge.is_incomplete(): return
-        for prod in grammar.productions():
-            if edge.lhs() == prod.rhs()[0]:
-                new_edge = ProbabilisticTreeEdge.from_production(prod, edge.start(), prod.prob())
-                if chart.insert(new_edge, ()):
-                    yield new_edge
+        for prod in grammar.productions(rhs=edge.lhs()):
+            new_edge = ProbabilisticTreeEdge.from_production(prod, edge.start(), prod.prob())
+            if chart.insert(new_edge, ()):
+                yield new_edge
 
 class ProbabilisticFundamentalRule(AbstractChartRule):
     NUM_EDGES=2
@@ -150,7 +161,10 @@ class BottomUpProbabilisticChartParser(ParserI):
     ``BottomUpProbabilisticChartParser``.  Different sorting orders will
     result in different search strategies.  The sorting order for the
     queue is defined by the method ``sort_queue``; subclasses are required
-    to provide a definition for this method.
+    to provide a definition for this method.  Subclasses whose order is
+    given by a fixed key for each edge should also define
+    ``edge_priority``: the queue is then kept as a heap, rather than
+    being sorted again after each edge.
 
     :type _grammar: PCFG
     :ivar _grammar: The grammar used to parse sentences.
@@ -158,7 +172,7 @@ class BottomUpProbabilisticChartParser(ParserI):
     :ivar _trace: The level of tracing output that should be generated
         when parsing a text.
     """
-    def __init__(self, grammar, beam_size=0, trace=0):
+    def __init__(self, grammar, beam_size=0, trace=0, beam_threshold=0):
         """
         Create a new ``BottomUpProbabilisticChartParser``, that uses
         ``grammar`` to parse texts.
@@ -167,6 +181,10 @@ class BottomUpProbabilisticChartParser(ParserI):
         :param grammar: The grammar used to parse texts.
         :type beam_size: int
         :param beam_size: The maximum length for the parser's edge queue.
+        :type beam_threshold: float
+        :param beam_threshold: If non-zero, discard each complete edge
+            whose probability is less than ``beam_threshold`` times the
+            probability of the best complete edge found for its span.
         :type trace: int
         :param trace: The level of tracing that should be used when
             parsing a text.  ``0`` will generate no tracing output;
@@ -177,6 +195,7 @@ class BottomUpProbabilisticChartParser(ParserI):
             raise ValueError("The grammar must be probabilistic PCFG")
         self._grammar = grammar
         self.beam_size = beam_size
+        self.beam_threshold = beam_threshold
         self._trace = trace
 
     def grammar(self):
@@ -196,15 +215,13 @@ class BottomUpProbabilisticChartParser(ParserI):
         self._trace = trace
 
     # TODO: change this to conform more with the standard ChartParser
-    def parse(self, tokens):
+    def parse(self, tokens, max_edges=None):
         self._grammar.check_coverage(tokens)
         chart = Chart(list(tokens))
         grammar = self._grammar
 
         # Chart parser rules.
         bu_init = ProbabilisticBottomUpInitRule()
-        bu = ProbabilisticBottomUpPredictRule()
-        fr = SingleEdgeProbabilisticFundamentalRule()
 
         # Our queue
         queue = []
@@ -216,6 +233,35 @@ class BottomUpProbabilisticChartParser(ParserI):
                                         edge.prob()))
             queue.append(edge)
 
+        if self._uses_edge_priority():
+            self._parse_heap(chart, grammar, queue, max_edges)
+        else:
+            self._parse_sorted(chart, grammar, queue, max_edges)
+
+        # Get a list of complete parses.
+        parses = list(chart.parses(grammar.start(), ProbabilisticTree))
+
+        # Assign probabilities to the trees.
+        prod_probs = {}
+        for prod in grammar.productions():
+            prod_probs[prod.lhs(), prod.rhs()] = prod.prob()
+        for parse in parses:
+            self._setprob(parse, prod_probs)
+
+        # Sort by probability
+        parses.sort(reverse=True, key=lambda tree: tree.prob())
+
+        return iter(parses)
+
+    def _parse_sorted(self, chart, grammar, queue, max_edges):
+        """
+        Fill the chart, re-sorting the queue with ``sort_queue`` before
+        each edge is taken from it.
+        """
+        bu = ProbabilisticBottomUpPredictRule()
+        fr = SingleEdgeProbabilisticFundamentalRule()
+        best = {}
+
         while len(queue) > 0:
             # Re-sort the queue.
             self.sort_queue(queue, chart)
@@ -226,6 +272,8 @@ class BottomUpProbabilisticChartParser(ParserI):
 
             # Get the best edge.
             edge = queue.pop()
+            if self.beam_threshold and self._below_threshold(edge, best, chart):
+                continue
             if self._trace > 0:
                 print('  %-50s [%s]' % (chart.pretty_format_edge(edge,width=2),
                                         edge.prob()))
@@ -233,21 +281,64 @@ class BottomUpProbabilisticChartParser(ParserI):
             # Apply BU & FR to it.
             queue.extend(bu.apply(chart, grammar, edge))
             queue.extend(fr.apply(chart, grammar, edge))
+            if max_edges is not None:
+                _check_edge_budget(chart, max_edges)
 
-        # Get a list of complete parses.
-        parses = list(chart.parses(grammar.start(), ProbabilisticTree))
+    def _parse_heap(self, chart, grammar, queue, max_edges):
+        """
+        Fill the chart, keeping the queue in a heap ordered by
+        ``edge_priority``.  Edges with equal priorities are taken in
+        the same order as by ``_parse_sorted``: the most recently
+        queued first.
+        """
+        bu = ProbabilisticBottomUpPredictRule()
+        fr = SingleEdgeProbabilisticFundamentalRule()
+        best = {}
+        priority = self.edge_priority
+        counter = itertools.count()
+        heap = [(-priority(edge), -next(counter), edge) for edge in queue]
+        heapq.heapify(heap)
 
-        # Assign probabilities to the trees.
-        prod_probs = {}
-        for prod in grammar.productions():
-            prod_probs[prod.lhs(), prod.rhs()] = prod.prob()
-        for parse in parses:
-            self._setprob(parse, prod_probs)
+        while heap:
+            # Prune the queue to the correct size if a beam was defined
+            if self.beam_size and len(heap) > self.beam_size:
+                heap = self._prune_heap(heap, chart)
 
-        # Sort by probability
-        parses.sort(reverse=True, key=lambda tree: tree.prob())
+            # Get the best edge.
+            edge = heapq.heappop(heap)[2]
+            if self.beam_threshold and self._below_threshold(edge, best, chart):
+                continue
+            if self._trace > 0:
+                print('  %-50s [%s]' % (chart.pretty_format_edge(edge,width=2),
+                                        edge.prob()))
 
-        return iter(parses)
+            # Apply BU & FR to it.
+            for new_edge in itertools.chain(bu.apply(chart, grammar, edge),
+                                            fr.apply(chart, grammar, edge)):
+                heapq.heappush(heap, (-priority(new_edge), -next(counter),
+                                      new_edge))
+            if max_edges is not None:
+                _check_edge_budget(chart, max_edges)
+
+    def _below_threshold(self, edge, best, chart):
+        """
+        Return True if ``edge`` is a complete edge whose probability is
+        below the beam threshold for its span, and record its
+        probability in ``best`` (the best probability for each span)
+        otherwise.
+        """
+        if not edge.is_complete():
+            return False
+        span = edge.span()
+        prob = edge.prob()
+        best_prob = best.get(span, 0.0)
+        if prob < self.beam_threshold * best_prob:
+            if self._trace > 2:
+                print('  %-50s [DISCARDED]' % chart.pretty_format_edge(edge,2))
+            return True
+        if prob > best_prob:
+            best[span] = prob
+        return False
 
     def _setprob(self, tree, prod_probs):
         if tree.prob() is not None: return
@@ -288,6 +379,40 @@ class BottomUpProbabilisticChartParser(ParserI):
         """
         raise NotImplementedError()
 
+    def edge_priority(self, edge):
+        """
+        Return the priority of ``edge`` in the queue: edges with higher
+        priorities are tried first.  Subclasses whose ``sort_queue``
+        sorts the queue by a fixed key for each edge should return that
+        key, so that the queue can be kept as a heap.
+
+        :type edge: EdgeI
+        """
+        raise NotImplementedError()
+
+    def _uses_edge_priority(self):
+        """
+        Return True if the queue order is given by ``edge_priority``:
+        that is, if ``edge_priority`` is overridden by the same class
+        that defines the ``sort_queue`` this parser uses.  A subclass
+        that only overrides ``sort_queue`` keeps its own order.
+        """
+        if not overridden(self.edge_priority):
+            return False
+        def defining_class(name):
+            for cls in type(self).__mro__:
+                if name in cls.__dict__:
+                    return cls
+        return defining_class('edge_priority') is defining_class('sort_queue')
+
+    def _prune_heap(self, heap, chart):
+        """ Keep the best ``beam_size`` items of the heap ``heap``."""
+        kept = heapq.nsmallest(self.beam_size, heap)
+        if self._trace > 2:
+            for item in sorted(heap, reverse=True)[:-self.beam_size]:
+                print('  %-50s [DISCARDED]' % chart.pretty_format_edge(item[2],2))
+        return kept
+
     def _prune(self, queue, chart):
         """ Discard items in the queue if the queue is longer than the beam."""
         if len(queue) > self.beam_size:
@@ -330,6 +455,9 @@ class InsideChartParser(BottomUpProbabilisticChartParser):
         """
         queue.sort(key=lambda edge: edge.prob())
 
+    def edge_priority(self, edge):
+        return edge.prob()
+
 # Eventually, this will become some sort of inside-outside parser:
 # class InsideOutsideParser(BottomUpProbabilisticChartParser):
 #     def __init__(self, grammar, trace=0):
@@ -385,6 +513,9 @@ class LongestChartParser(BottomUpProbabilisticChartParser):
     def sort_queue(self, queue, chart):
         queue.sort(key=lambda edge: edge.length())
 
+    def edge_priority(self, edge):
+        return edge.length()
+
 ##//////////////////////////////////////////////////////
 ##  Test Code
 ##//////////////////////////////////////////////////////
@@ -10,10 +10,12 @@ from __future__ import print_function, unicode_literals
 
 from collections import defaultdict
 from itertools import chain
+from operator import add
 from functools import total_ordering
 
 from nltk.grammar import (DependencyProduction, DependencyGrammar,
                           ProbabilisticDependencyGrammar)
+from nltk.parse.api import ParserI
 from nltk.parse.dependencygraph import DependencyGraph
 from nltk.internals import raise_unorderable_types
 from nltk.compat import python_2_unicode_compatible
@@ -134,11 +136,200 @@ class ChartCell(object):
 
 
 #################################################################
-# Parsing  with Dependency Grammars
+# Eisner Chart
 #################################################################
 
+_NO_ARC = float('-inf')
+
+class EisnerChart(object):
+    """
+    The chart built by Eisner's (1996) O(n^3) dynamic program for
+    projective dependency parsing with first-order arc scores.  The
+    chart is filled from an array of scores, where ``scores[h][m]`` is
+    the score of an arc from the head word with index ``h`` to the
+    modifier with index ``m``, and ``float('-inf')`` marks an arc that is
+    not allowed.  The score of a parse is the sum of the scores of its
+    arcs, plus the score of its root word.
+
+    Each entry of the chart is indexed by the start and end indexes of
+    a span of words, and holds the best score of either a "complete"
+    span, in which the word at one end has taken all of its modifiers
+    on that side, or an "incomplete" span, which is bounded by an arc
+    between the words at its ends.  A parse is returned as a list of
+    head indexes, with ``-1`` for the root word.
+
+        >>> from nltk.parse.projectivedependencyparser import EisnerChart
+        >>> no = float('-inf')
+        >>> chart = EisnerChart([[no, 2, 1],
+        ...                      [0, no, 1],
+        ...                      [0, 3, no]], root_scores=[0, 1, 0])
+        >>> chart.score()
+        4
+        >>> chart.best()
+        [-1, 2, 0]
+        >>> len(list(chart.parses()))
+        7
+    """
+    def __init__(self, scores, root_scores=None):
+        """
+        Fill a chart with Eisner's algorithm.
+
+        :param scores: The score of each arc, indexed by the indexes of
+            its head and its modifier.
+        :type scores: list(list(float))
+        :param root_scores: The score of each word as the root of a
+            parse, or None if every word scores ``0``.
+        :type root_scores: list(float)
+        """
+        n = len(scores)
+        self._n = n
+        self._scores = scores
+        if root_scores is None:
+            root_scores = [0] * n
+        self._root_scores = root_scores
+
+        # The complete spans (right: headed by their start, left: headed
+        # by their end) and incomplete spans (right: with an arc from
+        # their start to their end, left: with an arc from their end to
+        # their start), indexed by start and end.  The tables are also
+        # kept indexed by end and start, so that the scores of every
+        # split of a span can be summed from two slices.
+        complete_right = [[_NO_ARC] * n for i in range(n)]
+        complete_left = [[_NO_ARC] * n for i in range(n)]
+        incomplete_right = [[_NO_ARC] * n for i in range(n)]
+        incomplete_left = [[_NO_ARC] * n for i in range(n)]
+        complete_right_by_end = [[_NO_ARC] * n for i in range(n)]
+        complete_left_by_end = [[_NO_ARC] * n for i in range(n)]
+        incomplete_left_by_end = [[_NO_ARC] * n for i in range(n)]
+        for i in range(n):
+            complete_right[i][i] = complete_left[i][i] = 0
+            complete_right_by_end[i][i] = complete_left_by_end[i][i] = 0
+        self._complete_right = complete_right
+        self._complete_left = complete_left
+        self._incomplete_right = incomplete_right
+        self._incomplete_left = incomplete_left
+
+        for width in range(1, n):
+            for s in range(n - width):
+                t = s + width
+                best = max(map(add, complete_right[s][s:t],
+                               complete_left_by_end[t][s+1:t+1]))
+                incomplete_right[s][t] = best + scores[s][t]
+                incomplete_left[s][t] = incomplete_left_by_end[t][s] = \
+                    best + scores[t][s]
+                complete_right[s][t] = complete_right_by_end[t][s] = max(
+                    map(add, incomplete_right[s][s+1:t+1],
+                        complete_right_by_end[t][s+1:t+1]))
+                complete_left[s][t] = complete_left_by_end[t][s] = max(
+                    map(add, complete_left[s][s:t],
+                        incomplete_left_by_end[t][s:t]))
+
+    def _roots(self):
+        """
+        :return: A list of ``(score, root)`` pairs for the words that
+            can be the root of a parse, best first.
+        """
+        roots = [(self._complete_left[0][h] + self._complete_right[h][-1]
+                  + self._root_scores[h], h) for h in range(self._n)]
+        return sorted((root for root in roots if root[0] > _NO_ARC),
+                      key=lambda root: root[0], reverse=True)
+
+    def score(self):
+        """
+        :return: The score of the best parse, or None if there is no
+            parse.
+        :rtype: float
+        """
+        roots = self._roots()
+        return roots[0][0] if roots else None
+
+    def best(self):
+        """
+        :return: The list of head indexes of the best parse, or None if
+            there is no parse.
+        :rtype: list(int)
+        """
+        return next(self.parses(), None)
+
+    def parses(self):
+        """
+        Generate every parse in the chart exactly once.  The first
+        parse generated is a best one.
+
+        :return: An iterator over lists of head indexes.
+        :rtype: iter(list(int))
+        """
+        for (score, h) in self._roots():
+            for left in self._iter_complete_left(0, h):
+                for right in self._iter_complete_right(h, self._n - 1):
+                    heads = [-1] * self._n
+                    for (head, mod) in left + right:
+                        heads[mod] = head
+                    yield heads
+
+    # Each of the following methods generates the arcs of every way of
+    # building a span from smaller spans, trying the split points with
+    # the best scores first.
+
+    def _splits(self, candidates):
+        candidates = [(score, r) for (score, r) in candidates if score > _NO_ARC]
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [r for (score, r) in candidates]
+
+    def _iter_incomplete(self, s, t, arc):
+        complete_right, complete_left = self._complete_right, self._complete_left
+        for r in self._splits((complete_right[s][r] + complete_left[r+1][t], r)
+                              for r in range(s, t)):
+            for left in self._iter_complete_right(s, r):
+                for right in self._iter_complete_left(r+1, t):
+                    yield (arc,) + left + right
+
+    def _iter_complete_right(self, s, t):
+        if s == t:
+            yield ()
+            return
+        incomplete, complete = self._incomplete_right, self._complete_right
+        for r in self._splits((incomplete[s][r] + complete[r][t], r)
+                              for r in range(s+1, t+1)):
+            for left in self._iter_incomplete(s, r, (s, r)):
+                for right in self._iter_complete_right(r, t):
+                    yield left + right
+
+    def _iter_complete_left(self, s, t):
+        if s == t:
+            yield ()
+            return
+        complete, incomplete = self._complete_left, self._incomplete_left
+        for r in self._splits((complete[s][r] + incomplete[r][t], r)
+                              for r in range(s, t)):
+            for left in self._iter_complete_left(s, r):
+                for right in self._iter_incomplete(r, t, (t, r)):
+                    yield left + right
+
+
+#################################################################
+# Parsing  with Dependency Grammars
+#################################################################
 
-class ProjectiveDependencyParser(object):
+def _arc_scores(grammar, tokens):
+    """
+    :return: The array of arc scores for an ``EisnerChart`` that allows
+        exactly the arcs between the tokens that ``grammar`` contains.
+    :rtype: list(list(float))
+    """
+    allowed = {}
+    scores = []
+    for head in tokens:
+        row = []
+        for mod in tokens:
+            if (head, mod) not in allowed:
+                allowed[head, mod] = grammar.contains(head, mod)
+            row.append(0 if allowed[head, mod] else _NO_ARC)
+        scores.append(row)
+    return scores
+
+
+class ProjectiveDependencyParser(ParserI):
     """
     A projective, rule-based, dependency parser.  A ProjectiveDependencyParser
     is created with a DependencyGrammar, a set of productions specifying
@@ -164,7 +355,7 @@ class ProjectiveDependencyParser(object):
     def parse(self, tokens):
         """
         Performs a projective dependency parse on the list of tokens using
-        a chart-based, span-concatenation algorithm similar to Eisner (1996).
+        the chart-based, span-concatenation algorithm of Eisner (1996).
 
         :param tokens: The list of input tokens.
         :type tokens: list(str)
@@ -172,32 +363,13 @@ class ProjectiveDependencyParser(object):
         :rtype: iter(Tree)
         """
         self._tokens = list(tokens)
-        chart = []
-        for i in range(0, len(self._tokens) + 1):
-            chart.append([])
-            for j in range(0, len(self._tokens) + 1):
-                chart[i].append(ChartCell(i,j))
-                if i==j+1:
-                    chart[i][j].add(DependencySpan(i-1,i,i-1,[-1], ['null']))
-
-        for i in range(1,len(self._tokens)+1):
-            for j in range(i-2,-1,-1):
-                for k in range(i-1,j,-1):
-                    for span1 in chart[k][j]._entries:
-                        for span2 in chart[i][k]._entries:
-                            for newspan in self.concatenate(span1, span2):
-                                chart[i][j].add(newspan)
-
-        for parse in chart[len(self._tokens)][0]._entries:
+        chart = EisnerChart(_arc_scores(self._grammar, self._tokens))
+        for heads in chart.parses():
             conll_format = ""
-#            malt_format = ""
-            for i in range(len(tokens)):
-#                malt_format += '%s\t%s\t%d\t%s\n' % (tokens[i], 'null', parse._arcs[i] + 1, 'null')
-                #conll_format += '\t%d\t%s\t%s\t%s\t%s\t%s\t%d\t%s\t%s\t%s\n' % (i+1, tokens[i], tokens[i], 'null', 'null', 'null', parse._arcs[i] + 1, 'null', '-', '-')
+            for i in range(len(self._tokens)):
                 # Modify to comply with the new Dependency Graph requirement (at least must have an root elements) 
-                conll_format += '\t%d\t%s\t%s\t%s\t%s\t%s\t%d\t%s\t%s\t%s\n' % (i+1, tokens[i], tokens[i], 'null', 'null', 'null', parse._arcs[i] + 1, 'ROOT', '-', '-')
+                conll_format += '\t%d\t%s\t%s\t%s\t%s\t%s\t%d\t%s\t%s\t%s\n' % (i+1, self._tokens[i], self._tokens[i], 'null', 'null', 'null', heads[i] + 1, 'ROOT', '-', '-')
             dg = DependencyGraph(conll_format)
-#           if self.meets_arity(dg):
             yield dg.tree()
 
 
@@ -241,15 +413,15 @@ class ProjectiveDependencyParser(object):
 #################################################################
 
 
-class ProbabilisticProjectiveDependencyParser(object):
+class ProbabilisticProjectiveDependencyParser(ParserI):
     """A probabilistic, projective dependency parser.
 
     This parser returns the most probable projective parse derived from the
     probabilistic dependency grammar derived from the train() method.  The
     probabilistic model is an implementation of Eisner's (1996) Model C, which
     conditions on head-word, head-tag, child-word, and child-tag.  The decoding
-    uses a bottom-up chart-based span concatenation algorithm that's identical
-    to the one utilized by the rule-based projective parser.
+    uses the same ``EisnerChart`` as the rule-based projective parser to find
+    the parses allowed by the grammar, and ranks them with the model.
 
     Usage example
     -------------
@@ -277,46 +449,29 @@ class ProbabilisticProjectiveDependencyParser(object):
     def parse(self, tokens):
         """
         Parses the list of tokens subject to the projectivity constraint
-        and the productions in the parser's grammar.  This uses a method
-        similar to the span-concatenation algorithm defined in Eisner (1996).
-        It returns the most probable parse derived from the parser's
-        probabilistic dependency grammar.
+        and the productions in the parser's grammar.  The parses allowed
+        by the grammar are found with the chart of Eisner (1996), and
+        returned in order of decreasing probability, under the parser's
+        probabilistic dependency grammar.  Each token is given the first
+        (in sorted order) of the tags it was seen with in training.
         """
         self._tokens = list(tokens)
-        chart = []
-        for i in range(0, len(self._tokens) + 1):
-            chart.append([])
-            for j in range(0, len(self._tokens) + 1):
-                chart[i].append(ChartCell(i,j))
-                if i==j+1:
-                    if tokens[i-1] in self._grammar._tags:
-                        for tag in self._grammar._tags[tokens[i-1]]:
-                            chart[i][j].add(DependencySpan(i-1,i,i-1,[-1], [tag]))
-                    else:
-                        print('No tag found for input token \'%s\', parse is impossible.' % tokens[i-1])
-                        return []
-        for i in range(1,len(self._tokens)+1):
-            for j in range(i-2,-1,-1):
-                for k in range(i-1,j,-1):
-                    for span1 in chart[k][j]._entries:
-                            for span2 in chart[i][k]._entries:
-                                for newspan in self.concatenate(span1, span2):
-                                    chart[i][j].add(newspan)
+        for token in self._tokens:
+            if token not in self._grammar._tags:
+                print('No tag found for input token \'%s\', parse is impossible.' % token)
+                return []
+        tags = [min(self._grammar._tags[token]) for token in self._tokens]
+        chart = EisnerChart(_arc_scores(self._grammar, self._tokens))
         trees = []
-        max_parse = None
-        max_score = 0
-        for parse in chart[len(self._tokens)][0]._entries:
+        for heads in chart.parses():
             conll_format = ""
-            malt_format = ""
-            for i in range(len(tokens)):
-                malt_format += '%s\t%s\t%d\t%s\n' % (tokens[i], 'null', parse._arcs[i] + 1, 'null')
-                #conll_format += '\t%d\t%s\t%s\t%s\t%s\t%s\t%d\t%s\t%s\t%s\n' % (i+1, tokens[i], tokens[i], parse._tags[i], parse._tags[i], 'null', parse._arcs[i] + 1, 'null', '-', '-')
+            for i in range(len(self._tokens)):
                 # Modify to comply with recent change in dependency graph such that there must be a ROOT element. 
-                conll_format += '\t%d\t%s\t%s\t%s\t%s\t%s\t%d\t%s\t%s\t%s\n' % (i+1, tokens[i], tokens[i], parse._tags[i], parse._tags[i], 'null', parse._arcs[i] + 1, 'ROOT', '-', '-')
+                conll_format += '\t%d\t%s\t%s\t%s\t%s\t%s\t%d\t%s\t%s\t%s\n' % (i+1, self._tokens[i], self._tokens[i], tags[i], tags[i], 'null', heads[i] + 1, 'ROOT', '-', '-')
             dg = DependencyGraph(conll_format)
-            score = self.compute_prob(dg)            
+            score = self.compute_prob(dg)
             trees.append((score, dg.tree()))
-        trees.sort()
+        trees.sort(key=lambda tree: tree[0], reverse=True)
         return (tree for (score, tree) in trees)
 
 
@@ -66,7 +66,7 @@ For more information, please consult chapter 5 of the NLTK Book.
 from __future__ import print_function
 
 from nltk.tag.api           import TaggerI
-from nltk.tag.util          import str2tuple, tuple2str, untag
+from nltk.tag.util          import str2tuple, tuple2str, untag, TagScore
 from nltk.tag.sequential    import (SequentialBackoffTagger, ContextTagger,
                                     DefaultTagger, NgramTagger, UnigramTagger,
                                     BigramTagger, TrigramTagger, AffixTagger,
@@ -99,7 +99,10 @@ def _get_tagger(lang=None):
 
 
 def _pos_tag(tokens, tagset, tagger):
-    tagged_tokens = tagger.tag(tokens)
+    return _map_tagset(tagger.tag(tokens), tagset)
+
+
+def _map_tagset(tagged_tokens, tagset):
     if tagset:
         tagged_tokens = [(token, map_tag('en-ptb', tagset, tag)) for (token, tag) in tagged_tokens]
     return tagged_tokens
@@ -134,7 +137,7 @@ def pos_tag(tokens, tagset=None, lang='eng'):
     return _pos_tag(tokens, tagset, tagger)    
 
 
-def pos_tag_sents(sentences, tagset=None, lang='eng'):
+def pos_tag_sents(sentences, tagset=None, lang='eng', n_jobs=1, chunksize=64):
     """
     Use NLTK's currently recommended part of speech tagger to tag the
     given list of sentences, each consisting of a list of tokens.
@@ -145,8 +148,14 @@ def pos_tag_sents(sentences, tagset=None, lang='eng'):
     :type tagset: str
     :param lang: the ISO 639 code of the language, e.g. 'eng' for English, 'rus' for Russian
     :type lang: str
+    :param n_jobs: the number of processes to tag the sentences with;
+        ``None`` for one per CPU (see ``TaggerI.iter_tag_sents()``)
+    :type n_jobs: int
+    :param chunksize: the number of sentences sent to a process at a time
+    :type chunksize: int
     :return: The list of tagged sentences
     :rtype: list(list(tuple(str, str)))
     """
     tagger = _get_tagger(lang)
-    return [_pos_tag(sent, tagset, tagger) for sent in sentences]
+    return [_map_tagset(tagged_tokens, tagset) for tagged_tokens in
+            tagger.iter_tag_sents(sentences, n_jobs, chunksize)]
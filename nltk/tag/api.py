@@ -10,14 +10,16 @@
 Interface for tagging each token in a sentence with supplementary
 information, such as its part of speech.
 """
+import time
 from abc import ABCMeta, abstractmethod
 from six import add_metaclass
-from itertools import chain
+from six.moves import zip
+from itertools import tee, islice
 
 from nltk.internals import overridden
-from nltk.metrics import accuracy
+from nltk.util import parallel_apply
 
-from nltk.tag.util import untag
+from nltk.tag.util import untag, TagScore
 
 
 @add_metaclass(ABCMeta)
@@ -47,15 +49,57 @@ class TaggerI(object):
         if overridden(self.tag_sents):
             return self.tag_sents([tokens])[0]
 
-    def tag_sents(self, sentences):
+    def tag_sents(self, sentences, n_jobs=1, chunksize=64):
         """
         Apply ``self.tag()`` to each element of *sentences*.  I.e.:
 
             return [self.tag(sent) for sent in sentences]
+
+        If ``n_jobs`` is not 1, the sentences are tagged in parallel by
+        that many worker processes; see ``iter_tag_sents()``.
+
+        :param n_jobs: the number of worker processes; ``None`` for
+            one per CPU.
+        :type n_jobs: int
+        :param chunksize: the number of sentences sent to a worker at a
+            time.
+        :type chunksize: int
         """
-        return [self.tag(sent) for sent in sentences]
+        return list(self.iter_tag_sents(sentences, n_jobs, chunksize))
 
-    def evaluate(self, gold):
+    def iter_tag_sents(self, sentences, n_jobs=1, chunksize=64):
+        """
+        Apply ``self.tag()`` to each element of *sentences*, yielding the
+        tagged sentences in order as they become available.  If the
+        tagger defines its own ``tag_sents()``, that is called with
+        batches of ``chunksize`` sentences instead.
+
+        If ``n_jobs`` is not 1, the sentences are distributed over a pool
+        of ``n_jobs`` worker processes (one per CPU if ``n_jobs`` is
+        ``None``).  The tagger is sent to each worker once, when it
+        starts, rather than with every sentence; where worker processes
+        are forked it is not pickled at all.  See
+        ``nltk.util.parallel_apply()``.
+
+        :param n_jobs: the number of worker processes.
+        :type n_jobs: int
+        :param chunksize: the number of sentences sent to a worker at a
+            time.
+        :type chunksize: int
+        :rtype: iter(list(tuple(str, str)))
+        """
+        if overridden(self.tag_sents):
+            return self._iter_tag_batches(sentences, n_jobs, chunksize)
+        return parallel_apply(self, 'tag', sentences, n_jobs, chunksize)
+
+    def _iter_tag_batches(self, sentences, n_jobs, chunksize):
+        sentences = iter(sentences)
+        batches = iter(lambda: list(islice(sentences, chunksize)), [])
+        for tagged_sents in parallel_apply(self, 'tag_sents', batches, n_jobs):
+            for tagged_sent in tagged_sents:
+                yield tagged_sent
+
+    def evaluate(self, gold, n_jobs=1, chunksize=64):
         """
         Score the accuracy of the tagger against the gold standard.
         Strip the tags from the gold standard text, retag it using
@@ -63,13 +107,43 @@ class TaggerI(object):
 
         :type gold: list(list(tuple(str, str)))
         :param gold: The list of tagged sentences to score the tagger on.
+        :param n_jobs: the number of worker processes to tag with; see
+            ``iter_tag_sents()``.
+        :type n_jobs: int
+        :param chunksize: the number of sentences sent to a worker at a
+            time.
+        :type chunksize: int
         :rtype: float
         """
+        return self.evaluate_scores(gold, n_jobs, chunksize).accuracy()
 
-        tagged_sents = self.tag_sents(untag(sent) for sent in gold)
-        gold_tokens = list(chain(*gold))
-        test_tokens = list(chain(*tagged_sents))
-        return accuracy(gold_tokens, test_tokens)
+    def evaluate_scores(self, gold, n_jobs=1, chunksize=64):
+        """
+        Score the tagger against the gold standard, as ``evaluate()``
+        does, and return a ``TagScore`` with its accuracy, the precision
+        and recall of each tag, and the number of tokens tagged per
+        second.  The gold standard sentences are read one at a time, as
+        the tagger (or its worker processes) gets to them, and scored as
+        they are tagged, so *gold* may be a corpus view or an iterator.
+
+        :type gold: iter(list(tuple(str, str)))
+        :param gold: The tagged sentences to score the tagger on.
+        :param n_jobs: the number of worker processes to tag with.
+        :type n_jobs: int
+        :param chunksize: the number of sentences sent to a worker at a
+            time.
+        :type chunksize: int
+        :rtype: TagScore
+        """
+        gold, untagged = tee(gold)
+        tagscore = TagScore()
+        start = time.time()
+        tagged_sents = self.iter_tag_sents((untag(sent) for sent in untagged),
+                                           n_jobs, chunksize)
+        for correct, guessed in zip(gold, tagged_sents):
+            tagscore.score(correct, guessed)
+        tagscore.add_time(time.time() - start)
+        return tagscore
 
     def _check_params(self, train, model):
         if (train and model) or (not train and not model):
@@ -10,6 +10,8 @@
 
 from __future__ import print_function, division
 
+import bisect
+import heapq
 from collections import defaultdict, Counter
 
 from nltk.tag import TaggerI
@@ -223,6 +225,30 @@ class BrillTagger(TaggerI):
         self._initial_tagger = initial_tagger
         self._rules = tuple(rules)
         self._training_stats = training_stats
+        self._index_rules()
+
+    def _index_rules(self):
+        """
+        Build ``_rules_by_tag``, which maps each tag to the (sorted)
+        numbers of the rules that rewrite it, and ``_next_rule``, which
+        maps the number of each rule to the number of the next rule that
+        rewrites the same tag, or None.
+        """
+        self._rules_by_tag = defaultdict(list)
+        for number, rule in enumerate(self._rules):
+            self._rules_by_tag[rule.original_tag].append(number)
+        self._rules_by_tag = dict(self._rules_by_tag)
+        self._next_rule = [None] * len(self._rules)
+        for numbers in self._rules_by_tag.values():
+            for number, next_number in zip(numbers, numbers[1:]):
+                self._next_rule[number] = next_number
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Taggers pickled before rules were indexed by tag don't have
+        # the index.
+        if '_rules_by_tag' not in state:
+            self._index_rules()
 
     def encode_json_obj(self):
         return self._initial_tagger, self._rules, self._training_stats
@@ -268,18 +294,46 @@ class BrillTagger(TaggerI):
         for i, (token, tag) in enumerate(tagged_tokens):
             tag_to_positions[tag].add(i)
 
-        # Apply each rule, in order.  Only try to apply rules at
-        # positions that have the desired original tag.
-        for rule in self._rules:
-            # Find the positions where it might apply
-            positions = tag_to_positions.get(rule.original_tag, [])
+        # Apply the rules, in order, but only those whose original tag
+        # is in the sentence when their turn comes, and only at the
+        # positions that have that tag.  The agenda holds the number of
+        # the next rule to try for each tag that (still) has positions.
+        rules = self._rules
+        rules_by_tag = self._rules_by_tag
+        next_rule = self._next_rule
+        agenda = [rules_by_tag[tag][0]
+                  for tag in tag_to_positions if tag in rules_by_tag]
+        heapq.heapify(agenda)
+        scheduled = set(rules[number].original_tag for number in agenda)
+
+        while agenda:
+            number = heapq.heappop(agenda)
+            rule = rules[number]
+            tag = rule.original_tag
+            positions = tag_to_positions[tag]
+            if not positions:
+                scheduled.discard(tag)
+                continue
             # Apply the rule at those positions.
             changed = rule.apply(tagged_tokens, positions)
             # Update tag_to_positions with the positions of tags that
             # were modified.
-            for i in changed:
-                tag_to_positions[rule.original_tag].remove(i)
-                tag_to_positions[rule.replacement_tag].add(i)
+            if changed:
+                new_tag = rule.replacement_tag
+                new_positions = tag_to_positions[new_tag]
+                for i in changed:
+                    positions.remove(i)
+                    new_positions.add(i)
+                if new_tag not in scheduled and new_tag in rules_by_tag:
+                    numbers = rules_by_tag[new_tag]
+                    index = bisect.bisect_right(numbers, number)
+                    if index < len(numbers):
+                        heapq.heappush(agenda, numbers[index])
+                        scheduled.add(new_tag)
+            if next_rule[number] is None or not positions:
+                scheduled.discard(tag)
+            else:
+                heapq.heappush(agenda, next_rule[number])
 
         return tagged_tokens
 
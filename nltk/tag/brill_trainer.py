@@ -15,6 +15,7 @@ import textwrap
 from collections import defaultdict
 
 from nltk.tag import untag, BrillTagger
+from nltk.util import parallel_apply
 
 ######################################################################
 #  Brill Tagger Trainer
@@ -91,7 +92,8 @@ class BrillTaggerTrainer(object):
 
     # Training
 
-    def train(self, train_sents, max_rules=200, min_score=2, min_acc=None):
+    def train(self, train_sents, max_rules=200, min_score=2, min_acc=None,
+              n_jobs=1):
         """
         Trains the Brill tagger on the corpus *train_sents*,
         producing at most *max_rules* transformations, each of which
@@ -99,6 +101,12 @@ class BrillTaggerTrainer(object):
         *min_score*, and each of which has accuracy not lower than
         *min_acc*.
 
+        With *n_jobs* > 1, the corpus is tagged by the initial tagger,
+        and the initial candidate rules are generated and scored, by
+        *n_jobs* worker processes, each working on a shard of the
+        sentences.  The rule selection that follows, and so the
+        learned rules, are the same as with a single process.
+
         #imports
         >>> from nltk.tbl.template import Template
         >>> from nltk.tag.brill import Pos, Word
@@ -232,6 +240,9 @@ class BrillTaggerTrainer(object):
         :type min_score: int
         :param min_acc: discard any rule with lower accuracy than min_acc
         :type min_acc: float or None
+        :param n_jobs: the number of worker processes (all available CPUs
+            if None or negative)
+        :type n_jobs: int
         :return: the learned tagger
         :rtype: BrillTagger
 
@@ -245,8 +256,13 @@ class BrillTaggerTrainer(object):
         # Create a new copy of the training corpus, and run the
         # initial tagger on it.  We will progressively update this
         # test corpus to look more like the training corpus.
-        test_sents = [list(self._initial_tagger.tag(untag(sent)))
-                      for sent in train_sents]
+        untagged_sents = [untag(sent) for sent in train_sents]
+        if n_jobs == 1:
+            tagged_sents = self._initial_tagger.tag_sents(untagged_sents)
+        else:
+            tagged_sents = self._initial_tagger.iter_tag_sents(
+                untagged_sents, n_jobs)
+        test_sents = [list(sent) for sent in tagged_sents]
 
         # Collect some statistics on the training process
         trainstats = {}
@@ -271,7 +287,7 @@ class BrillTaggerTrainer(object):
         # rules, which are added to the rule mappings.
         if self._trace:
             print("Finding initial useful rules...")
-        self._init_mappings(test_sents, train_sents)
+        self._init_mappings(test_sents, train_sents, n_jobs)
         if self._trace:
             print(("    Found %d useful rules." % len(self._rule_scores)))
 
@@ -320,11 +336,13 @@ class BrillTaggerTrainer(object):
         # Create and return a tagger from the rules we found.
         return BrillTagger(self._initial_tagger, rules, trainstats)
 
-    def _init_mappings(self, test_sents, train_sents):
+    def _init_mappings(self, test_sents, train_sents, n_jobs=1):
         """
         Initialize the tag position mapping & the rule related
         mappings.  For each error in test_sents, find new rules that
-        would correct them, and add them to the rule mappings.
+        would correct them, and add them to the rule mappings.  The
+        rules are found by *n_jobs* processes, each for a shard of the
+        sentences, and their effects are merged here.
         """
         self._tag_positions = defaultdict(list)
         self._rules_by_position = defaultdict(set)
@@ -332,20 +350,66 @@ class BrillTaggerTrainer(object):
         self._rules_by_score = defaultdict(set)
         self._rule_scores = defaultdict(int)
         self._first_unknown_position = defaultdict(int)
-        # Scan through the corpus, initializing the tag_positions
-        # mapping and all the rule-related mappings.
+        # Scan through the corpus, initializing the tag_positions mapping.
         for sentnum, sent in enumerate(test_sents):
             for wordnum, (word, tag) in enumerate(sent):
-
-                # Initialize tag_positions
                 self._tag_positions[tag].append((sentnum, wordnum))
 
-                # If it's an error token, update the rule-related mappings.
-                correct_tag = train_sents[sentnum][wordnum][1]
-                if tag != correct_tag:
-                    for rule in self._find_rules(sent, wordnum, correct_tag):
-                        self._update_rule_applies(rule, sentnum, wordnum,
-                                                  train_sents)
+        # Initialize all the rule-related mappings from the rules found
+        # in each shard.
+        if n_jobs is None or n_jobs < 1:
+            import multiprocessing
+            n_jobs = multiprocessing.cpu_count()
+        if n_jobs == 1:
+            shards = [(0, test_sents, train_sents)]
+        else:
+            size = max(1, -(-len(test_sents) // (4 * n_jobs)))
+            shards = [(start, test_sents[start:start + size],
+                       train_sents[start:start + size])
+                      for start in range(0, len(test_sents), size)]
+        for positions_by_rule in parallel_apply(self, '_find_shard_rules',
+                                                shards, n_jobs):
+            for rule, positions in positions_by_rule.items():
+                self._positions_by_rule[rule].update(positions)
+                self._rule_scores[rule] += sum(positions.values())
+                for pos in positions:
+                    self._rules_by_position[pos].add(rule)
+        # _best_rule() only looks for demoted rules at the scores that are
+        # in _rules_by_score when it starts, so there must be an entry for
+        # every score up to the best one, as when the scores are counted
+        # up one position at a time.
+        for score in range(max(self._rule_scores.values() or [0]) + 1):
+            self._rules_by_score[score]
+        for rule, score in self._rule_scores.items():
+            self._rules_by_score[score].add(rule)
+
+    def _find_shard_rules(self, shard):
+        """
+        For each error in a shard of the corpus, find new rules that would
+        correct it.  Return a mapping from each rule found to the effect
+        it has at each position where it applies, as in _positions_by_rule.
+
+        :param shard: the number of the first sentence of the shard, and
+            the sentences of the shard in test_sents and train_sents
+        :type shard: tuple(int, list, list)
+        """
+        start, test_sents, train_sents = shard
+        positions_by_rule = defaultdict(dict)
+        for sentnum, (sent, train_sent) in enumerate(zip(test_sents, train_sents),
+                                                     start):
+            for wordnum, ((word, tag), (_, correct_tag)) in enumerate(
+                    zip(sent, train_sent)):
+                if tag == correct_tag:
+                    continue
+                for rule in self._find_rules(sent, wordnum, correct_tag):
+                    if rule.replacement_tag == correct_tag:
+                        effect = 1
+                    elif rule.original_tag == correct_tag:
+                        effect = -1
+                    else:  # was wrong, remains wrong
+                        effect = 0
+                    positions_by_rule[rule][sentnum, wordnum] = effect
+        return dict(positions_by_rule)
 
     def _clean(self):
         self._tag_positions = None
@@ -86,7 +86,7 @@ from nltk.probability import (FreqDist, ConditionalFreqDist,
                               LidstoneProbDist, MutableProbDist,
                               MLEProbDist, RandomProbDist)
 from nltk.metrics import accuracy
-from nltk.util import LazyMap, unique_list
+from nltk.util import LazyMap, unique_list, parallel_apply, WorkerPool
 from nltk.compat import python_2_unicode_compatible
 from nltk.tag.api import TaggerI
 
@@ -273,6 +273,35 @@ class HiddenMarkovModelTagger(TaggerI):
         path = self._best_path(unlabeled_sequence)
         return list(zip(unlabeled_sequence, path))
 
+    def iter_tag_sents(self, sentences, n_jobs=1, chunksize=64):
+        """
+        Tags each of the sentences with its highest probability state
+        sequence, yielding the tagged sentences in order.  The sentences
+        are decoded in batches of ``chunksize``, with a single Viterbi
+        pass for each batch, and the batches are distributed over
+        ``n_jobs`` worker processes if ``n_jobs`` is not 1 (see
+        ``TaggerI.iter_tag_sents()``).
+
+        :param sentences: the sentences of unlabeled symbols
+        :type sentences: iter(list)
+        :param n_jobs: the number of worker processes
+        :type n_jobs: int
+        :param chunksize: the number of sentences decoded at a time
+        :type chunksize: int
+        :rtype: iter(list)
+        """
+        sentences = iter(sentences)
+        batches = iter(lambda: list(itertools.islice(sentences, chunksize)), [])
+        for tagged_sents in parallel_apply(self, '_tag_batch', batches, n_jobs):
+            for tagged_sent in tagged_sents:
+                yield tagged_sent
+
+    def _tag_batch(self, sentences):
+        sequences = [self._transform(sent) for sent in sentences]
+        paths = self._best_paths(sequences)
+        return [list(zip(sequence, path))
+                for sequence, path in zip(sequences, paths)]
+
     def _output_logprob(self, state, symbol):
         """
         :return: the log probability of the symbol being observed in the given
@@ -324,30 +353,28 @@ class HiddenMarkovModelTagger(TaggerI):
     def _update_cache(self, symbols):
         # add new symbols to the symbol table and repopulate the output
         # probabilities and symbol table mapping
-        if symbols:
-            self._create_cache()
-            P, O, X, S = self._cache
-            for symbol in symbols:
-                if symbol not in self._symbols:
-                    self._cache = None
-                    self._symbols.append(symbol)
-            # don't bother with the work if there aren't any new symbols
-            if not self._cache:
-                N = len(self._states)
-                M = len(self._symbols)
-                Q = O.shape[1]
-                # add new columns to the output probability table without
-                # destroying the old probabilities
-                O = np.hstack([O, np.zeros((N, M - Q), np.float32)])
-                for i in range(N):
-                    si = self._states[i]
-                    # only calculate probabilities for new symbols
-                    for k in range(Q, M):
-                        O[i, k] = self._output_logprob(si, self._symbols[k])
-                # only create symbol mappings for new symbols
+        self._create_cache()
+        P, O, X, S = self._cache
+        new_symbols = unique_list(symbol for symbol in symbols
+                                  if symbol not in S)
+        # don't bother with the work if there aren't any new symbols
+        if new_symbols:
+            N = len(self._states)
+            Q = O.shape[1]
+            self._symbols.extend(new_symbols)
+            M = len(self._symbols)
+            # add new columns to the output probability table without
+            # destroying the old probabilities
+            O = np.hstack([O, np.zeros((N, M - Q), np.float32)])
+            for i in range(N):
+                si = self._states[i]
+                # only calculate probabilities for new symbols
                 for k in range(Q, M):
-                    S[self._symbols[k]] = k
-                self._cache = (P, O, X, S)
+                    O[i, k] = self._output_logprob(si, self._symbols[k])
+            # only create symbol mappings for new symbols
+            for k in range(Q, M):
+                S[self._symbols[k]] = k
+            self._cache = (P, O, X, S)
 
     def reset_cache(self):
         self._cache = None
@@ -367,32 +394,62 @@ class HiddenMarkovModelTagger(TaggerI):
         return self._best_path(unlabeled_sequence)
 
     def _best_path(self, unlabeled_sequence):
-        T = len(unlabeled_sequence)
-        N = len(self._states)
-        self._create_cache()
-        self._update_cache(unlabeled_sequence)
-        P, O, X, S = self._cache
+        return self._best_paths([unlabeled_sequence])[0]
 
-        V = np.zeros((T, N), np.float32)
-        B = -np.ones((T, N), np.int)
+    def _best_paths(self, unlabeled_sequences):
+        """
+        Find the Viterbi path of each of the sequences, decoding them all
+        at once: at each time step, the best predecessor of every state
+        is found for all of the sequences that are at least that long
+        with a single array operation.
+        """
+        self._update_cache([symbol for sequence in unlabeled_sequences
+                            for symbol in sequence])
+        P, O, X, S = self._cache
+        N = len(self._states)
 
-        V[0] = P + O[:, S[unlabeled_sequence[0]]]
+        # Order the sequences by decreasing length, so that the sequences
+        # still being decoded at time t are always the first ones.
+        order = sorted(range(len(unlabeled_sequences)),
+                       key=lambda i: -len(unlabeled_sequences[i]))
+        lengths = np.array([len(unlabeled_sequences[i]) for i in order],
+                           np.intp)
+        paths = [[] for sequence in unlabeled_sequences]
+        if not len(lengths) or not lengths[0]:
+            return paths
+        T = lengths[0]
+        symbols = np.zeros((len(order), T), np.intp)
+        for row, i in enumerate(order):
+            symbols[row, :lengths[row]] = [S[symbol] for symbol in
+                                           unlabeled_sequences[i]]
+        # The number of sequences longer than t, for each t.
+        active = np.searchsorted(-lengths, -np.arange(T), side='left')
+
+        states = np.arange(N)
+        V = P + O[:, symbols[:, 0]].T
+        B = np.zeros((T, len(order), N), np.intp)
         for t in range(1, T):
-            for j in range(N):
-                vs = V[t-1, :] + X[:, j]
-                best = np.argmax(vs)
-                V[t, j] = vs[best] + O[j, S[unlabeled_sequence[t]]]
-                B[t, j] = best
-
-        current = np.argmax(V[T-1,:])
-        sequence = [current]
-        for t in range(T-1, 0, -1):
-            last = B[t, current]
-            sequence.append(last)
-            current = last
-
-        sequence.reverse()
-        return list(map(self._states.__getitem__, sequence))
+            n = active[t]
+            vs = V[:n, :, np.newaxis] + X
+            best = vs.argmax(axis=1)
+            B[t, :n] = best
+            V[:n] = (vs[np.arange(n)[:, np.newaxis], best, states] +
+                     O[:, symbols[:n, t]].T)
+
+        # V now holds the final scores of each sequence; follow the
+        # back-pointers from the best final state.
+        best_paths = np.zeros((len(order), T), np.intp)
+        current = V.argmax(axis=1)
+        for t in range(T-1, -1, -1):
+            n = active[t]
+            best_paths[:n, t] = current[:n]
+            if t:
+                current[:n] = B[t, np.arange(n), current[:n]]
+
+        for row, i in enumerate(order):
+            paths[i] = [self._states[state]
+                        for state in best_paths[row, :lengths[row]]]
+        return paths
 
     def best_path_simple(self, unlabeled_sequence):
         """
@@ -780,7 +837,10 @@ class HiddenMarkovModelTagger(TaggerI):
             return list(itertools.chain(*seq))
 
         test_sequence = self._transform(test_sequence)
-        predicted_sequence = list(map(self._tag, map(words, test_sequence)))
+        unlabeled_sequence = list(map(words, test_sequence))
+        predicted_sequence = [list(zip(sequence, path)) for sequence, path in
+                              zip(unlabeled_sequence,
+                                  self._best_paths(unlabeled_sequence))]
 
         if verbose:
             for test_sent, predicted_sent in zip(test_sequence, predicted_sequence):
@@ -860,48 +920,6 @@ class HiddenMarkovModelTrainer(object):
         return model
 
 
-    def _baum_welch_step(self, sequence, model, symbol_to_number):
-
-        N = len(model._states)
-        M = len(model._symbols)
-        T = len(sequence)
-
-        # compute forward and backward probabilities
-        alpha = model._forward_probability(sequence)
-        beta = model._backward_probability(sequence)
-
-        # find the log probability of the sequence
-        lpk = logsumexp2(alpha[T-1])
-
-        A_numer = _ninf_array((N, N))
-        B_numer = _ninf_array((N, M))
-        A_denom = _ninf_array(N)
-        B_denom = _ninf_array(N)
-
-        transitions_logprob = model._transitions_matrix().T
-
-        for t in range(T):
-            symbol = sequence[t][_TEXT]  # not found? FIXME
-            next_symbol = None
-            if t < T - 1:
-                next_symbol = sequence[t+1][_TEXT]  # not found? FIXME
-            xi = symbol_to_number[symbol]
-
-            next_outputs_logprob = model._outputs_vector(next_symbol)
-            alpha_plus_beta = alpha[t] + beta[t]
-
-            if t < T - 1:
-                numer_add = transitions_logprob + next_outputs_logprob + \
-                            beta[t+1] + alpha[t].reshape(N, 1)
-                A_numer = np.logaddexp2(A_numer, numer_add)
-                A_denom = np.logaddexp2(A_denom, alpha_plus_beta)
-            else:
-                B_denom = np.logaddexp2(A_denom, alpha_plus_beta)
-
-            B_numer[:,xi] = np.logaddexp2(B_numer[:,xi], alpha_plus_beta)
-
-        return lpk, A_numer, A_denom, B_numer, B_denom
-
     def train_unsupervised(self, unlabeled_sequences, update_outputs=True,
                            **kwargs):
         """
@@ -925,6 +943,11 @@ class HiddenMarkovModelTrainer(object):
         :param max_iterations: the maximum number of EM iterations
         :param convergence_logprob: the maximum change in log probability to
             allow convergence
+        :param n_jobs: the number of processes to compute the expected
+            counts with (one per CPU if ``None``), each taking a shard of
+            the sequences
+        :param batch_size: the number of sequences whose forward and
+            backward probabilities are computed at a time
         """
 
         # create a uniform HMM, which will be iteratively refined, unless
@@ -962,6 +985,33 @@ class HiddenMarkovModelTrainer(object):
 
         model.reset_cache()
 
+        # The log probabilities of the model, as arrays: the priors, the
+        # transitions (from the state of the row to the state of the
+        # column) and the outputs (of the symbol of the column).
+        priors = np.fromiter((model._priors.logprob(s) for s in self._states),
+                             dtype=np.float64)
+        transitions = model._transitions_matrix().T
+        outputs = np.fromiter((model._output_logprob(s, sym)
+                               for s in self._states for sym in self._symbols),
+                              dtype=np.float64).reshape(N, M)
+
+        # The sequences as arrays of symbol numbers, ordered by decreasing
+        # length so that the sequences of a batch are of similar lengths;
+        # the batches are dealt out to the shards in turn.
+        sequences = [np.array([symbol_numbers[token[_TEXT]] for token in sequence],
+                              dtype=np.intp)
+                     for sequence in unlabeled_sequences]
+        sequences = sorted((seq for seq in sequences if len(seq)),
+                           key=len, reverse=True)
+        n_jobs = kwargs.get('n_jobs', 1)
+        if n_jobs is None or n_jobs < 1:
+            import multiprocessing
+            n_jobs = multiprocessing.cpu_count()
+        batch_size = kwargs.get('batch_size', 256)
+        batches = [(start, min(start + batch_size, len(sequences)))
+                   for start in range(0, len(sequences), batch_size)]
+        shards = [batches[k::n_jobs] for k in range(min(n_jobs, len(batches)))]
+
         # iterate until convergence
         converged = False
         last_logprob = None
@@ -969,67 +1019,72 @@ class HiddenMarkovModelTrainer(object):
         max_iterations = kwargs.get('max_iterations', 1000)
         epsilon = kwargs.get('convergence_logprob', 1e-6)
 
-        while not converged and iteration < max_iterations:
-            A_numer = _ninf_array((N, N))
-            B_numer = _ninf_array((N, M))
-            A_denom = _ninf_array(N)
-            B_denom = _ninf_array(N)
-
-            logprob = 0
-            for sequence in unlabeled_sequences:
-                sequence = list(sequence)
-                if not sequence:
-                    continue
-
-                (lpk, seq_A_numer, seq_A_denom,
-                seq_B_numer, seq_B_denom) = self._baum_welch_step(sequence, model, symbol_numbers)
-
-                # add these sums to the global A and B values
-                for i in range(N):
-                    A_numer[i] = np.logaddexp2(A_numer[i], seq_A_numer[i]-lpk)
-                    B_numer[i] = np.logaddexp2(B_numer[i], seq_B_numer[i]-lpk)
-
-                A_denom = np.logaddexp2(A_denom, seq_A_denom-lpk)
-                B_denom = np.logaddexp2(B_denom, seq_B_denom-lpk)
-
-                logprob += lpk
-
-            # use the calculated values to update the transition and output
-            # probability values
-            for i in range(N):
-                logprob_Ai = A_numer[i] - A_denom[i]
-                logprob_Bi = B_numer[i] - B_denom[i]
+        # The sequences are shipped to the worker processes once; only the
+        # current log probabilities are sent with each iteration's shards.
+        pool = WorkerPool(_BaumWelchCounts(sequences), n_jobs)
+        try:
+            while not converged and iteration < max_iterations:
+                # compute the expected counts of transitions and outputs
+                logprob = 0
+                A_numer = np.zeros((N, N))
+                B_numer = np.zeros((N, M))
+                A_denom = np.zeros(N)
+                B_denom = np.zeros(N)
+                tasks = [(priors, transitions, outputs, shard)
+                         for shard in shards]
+                for shard_counts in pool.map('shard_counts', tasks):
+                    logprob += shard_counts[0]
+                    A_numer += shard_counts[1]
+                    A_denom += shard_counts[2]
+                    B_numer += shard_counts[3]
+                    B_denom += shard_counts[4]
+
+                # use the calculated values to update the transition and output
+                # probability values
+                with np.errstate(divide='ignore'):
+                    logprob_A = (np.log2(A_numer) -
+                                 np.log2(A_denom)[:, np.newaxis])
+                    logprob_B = (np.log2(B_numer) -
+                                 np.log2(B_denom)[:, np.newaxis])
 
                 # We should normalize all probabilities (see p.391 Huang et al)
                 # Let sum(P) be K.
                 # We can divide each Pi by K to make sum(P) == 1.
                 #   Pi' = Pi/K
                 #   log2(Pi') = log2(Pi) - log2(K)
-                logprob_Ai -= logsumexp2(logprob_Ai)
-                logprob_Bi -= logsumexp2(logprob_Bi)
+                logprob_A -= _logsumexp2(logprob_A, axis=1)[:, np.newaxis]
+                logprob_B -= _logsumexp2(logprob_B, axis=1)[:, np.newaxis]
 
-                # update output and transition probabilities
-                si = self._states[i]
+                for i in range(N):
+                    # update output and transition probabilities
+                    si = self._states[i]
 
-                for j in range(N):
-                    sj = self._states[j]
-                    model._transitions[si].update(sj, logprob_Ai[j])
+                    for j in range(N):
+                        sj = self._states[j]
+                        model._transitions[si].update(sj, logprob_A[i, j])
 
-                if update_outputs:
-                    for k in range(M):
-                        ok = self._symbols[k]
-                        model._outputs[si].update(ok, logprob_Bi[k])
+                    if update_outputs:
+                        for k in range(M):
+                            ok = self._symbols[k]
+                            model._outputs[si].update(ok, logprob_B[i, k])
 
-                # Rabiner says the priors don't need to be updated. I don't
-                # believe him. FIXME
+                    # Rabiner says the priors don't need to be updated. I don't
+                    # believe him. FIXME
 
-            # test for convergence
-            if iteration > 0 and abs(logprob - last_logprob) < epsilon:
-                converged = True
+                transitions = logprob_A
+                if update_outputs:
+                    outputs = logprob_B
+                model.reset_cache()
 
-            print('iteration', iteration, 'logprob', logprob)
-            iteration += 1
-            last_logprob = logprob
+                # test for convergence
+                if iteration > 0 and abs(logprob - last_logprob) < epsilon:
+                    converged = True
+
+                print('iteration', iteration, 'logprob', logprob)
+                iteration += 1
+                last_logprob = logprob
+        finally:
+            pool.close()
 
         return model
 
@@ -1105,6 +1160,118 @@ def logsumexp2(arr):
     return np.log2(np.sum(2**(arr - max_))) + max_
 
 
+def _logsumexp2(arr, axis):
+    """
+    Return the base 2 log of the sum of 2 to the power of ``arr`` along
+    ``axis``; this is -inf where all the values are -inf.
+    """
+    max_ = arr.max(axis=axis, keepdims=True)
+    max_[~np.isfinite(max_)] = 0
+    with np.errstate(divide='ignore'):
+        return (np.log2(np.sum(np.exp2(arr - max_), axis=axis)) +
+                np.squeeze(max_, axis=axis))
+
+
+class _BaumWelchCounts(object):
+    """
+    The E-step of Baum-Welch training: computes the expected numbers of
+    transitions and outputs of each state in a shard of the training
+    sequences, given the current log probabilities of the model.  The
+    forward and backward probabilities of a batch of sequences are
+    computed together, in log space; the expected counts are computed from
+    them as probabilities, and summed as arrays.
+
+    :param sequences: the training sequences, as arrays of symbol numbers,
+        in order of decreasing length
+    """
+    def __init__(self, sequences):
+        self._sequences = sequences
+
+    def shard_counts(self, task):
+        """
+        Return the total log probability of the sequences in the given
+        batches ``(start, end)``, and the expected counts of transitions
+        and outputs ``(logprob, A_numer, A_denom, B_numer, B_denom)``.
+
+        :param task: ``(priors, transitions, outputs, shard)``, where
+            ``priors`` are the log probabilities of starting in each state,
+            ``transitions[i, j]`` is the log probability of a transition
+            from state i to state j, ``outputs[i, k]`` is the log
+            probability of state i emitting symbol k, and ``shard`` is the
+            list of batches
+        """
+        self._priors, self._transitions, self._outputs, shard = task
+        N, M = self._outputs.shape
+        logprob = 0.0
+        A_numer = np.zeros((N, N))
+        B_numer = np.zeros((N, M))
+        A_denom = np.zeros(N)
+        B_denom = np.zeros(N)
+        for start, end in shard:
+            lpk, a_numer, a_denom = self._batch_counts(
+                self._sequences[start:end], B_numer, B_denom)
+            logprob += lpk
+            A_numer += a_numer
+            A_denom += a_denom
+        return logprob, A_numer, A_denom, B_numer, B_denom
+
+    def _batch_counts(self, sequences, B_numer, B_denom):
+        X = self._transitions
+        n = len(sequences)
+        N = len(self._priors)
+        lengths = np.array([len(seq) for seq in sequences], np.intp)
+        T = lengths[0]
+        symbols = np.zeros((n, T), np.intp)
+        for row, seq in enumerate(sequences):
+            symbols[row, :lengths[row]] = seq
+        # The number of sequences longer than t, for each t.
+        active = np.searchsorted(-lengths, -np.arange(T), side='left')
+        outputs = self._outputs[:, symbols].transpose(1, 2, 0)
+
+        alpha = np.empty((T, n, N))
+        alpha.fill(-np.inf)
+        alpha[0] = self._priors + outputs[:, 0]
+        for t in range(1, T):
+            k = active[t]
+            alpha[t, :k] = (_logsumexp2(alpha[t-1, :k, :, np.newaxis] + X, axis=1)
+                            + outputs[:k, t])
+
+        # "1" is an arbitrarily chosen value from Rabiner tutorial
+        beta = np.zeros((T, n, N))
+        for t in range(T-2, -1, -1):
+            k = active[t+1]
+            beta[t, :k] = _logsumexp2(
+                X + (outputs[:k, t+1] + beta[t+1, :k])[:, np.newaxis, :], axis=2)
+
+        rows = np.arange(n)
+        lpk = _logsumexp2(alpha[lengths - 1, rows], axis=1)
+
+        # the probabilities of being in each state at each time step
+        gamma = np.exp2(alpha + beta - lpk[:, np.newaxis])
+        B_denom += gamma.sum(axis=(0, 1))
+        before_last = np.arange(T)[:, np.newaxis] < lengths - 1
+        A_denom = gamma[before_last].sum(axis=0)
+
+        # sum the state probabilities of each distinct symbol
+        valid = np.arange(T)[:, np.newaxis] < lengths
+        keys = symbols.T[valid]
+        order = np.argsort(keys, kind='mergesort')
+        keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        B_numer[:, keys[starts]] += np.add.reduceat(gamma[valid][order],
+                                                    starts, axis=0).T
+
+        # the probabilities of each transition at each time step
+        A_numer = np.zeros((N, N))
+        for t in range(T-1):
+            k = active[t+1]
+            A_numer += np.exp2(alpha[t, :k, :, np.newaxis] + X
+                               + (outputs[:k, t+1] + beta[t+1, :k])[:, np.newaxis, :]
+                               - lpk[:k, np.newaxis, np.newaxis]).sum(axis=0)
+
+        return lpk.sum(), A_numer, A_denom
+
+
 def _log_add(*values):
     """
     Adds the logged values, returning the logarithm of the addition.
@@ -12,16 +12,27 @@
 from __future__ import absolute_import
 from __future__ import print_function, division
 
+import hashlib
+import json
+import mmap
 import random
+import struct
 from collections import defaultdict
 import pickle
 import logging
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from nltk.tag.api import TaggerI
 from nltk.data import find, load
 from nltk.compat import python_2_unicode_compatible
+from nltk.util import WorkerPool
 
 PICKLE = "averaged_perceptron_tagger.pickle"
+BINARY = "averaged_perceptron_tagger.bin"
 
 class AveragedPerceptron(object):
 
@@ -44,6 +55,20 @@ class AveragedPerceptron(object):
         self._tstamps = defaultdict(int)
         # Number of instances seen
         self.i = 0
+        # The sparse matrix form of the weights used for tagging, built
+        # when first needed (see ``compiled()``)
+        self._compiled = None
+
+    def compiled(self):
+        '''Return the weights as a ``SparseWeights`` matrix, building it if
+        the weights have changed since it was last built.  Returns None if
+        numpy is not available.'''
+        if np is None:
+            return None
+        if (self._compiled is None or self._compiled.weights is not self.weights
+                or self._compiled.classes != self.classes):
+            self._compiled = SparseWeights(self.weights, self.classes)
+        return self._compiled
 
     def predict(self, features):
         '''Dot-product the features and current weights and return the best label.'''
@@ -68,6 +93,7 @@ class AveragedPerceptron(object):
         self.i += 1
         if truth == guess:
             return None
+        self._compiled = None
         for f in features:
             weights = self.weights.setdefault(f, {})
             upd_feat(truth, f, weights.get(truth, 0.0), 1.0)
@@ -85,6 +111,35 @@ class AveragedPerceptron(object):
                 if averaged:
                     new_feat_weights[clas] = averaged
             self.weights[feat] = new_feat_weights
+        self._compiled = None
+
+    def mix(self, steps, updates):
+        '''
+        Add the results of training copies of this model in parallel, on
+        ``steps`` instances in all, to the model: the weights become the
+        mean of the weights of the copies (iterative parameter mixing), and
+        the totals for averaging include the weights of each copy at each
+        of its steps.
+
+        :param steps: The number of instances seen by all the copies.
+        :param updates: For each copy, a dict mapping each (feature, class)
+            pair it updated to its change in weight and the sum over its
+            steps of that change.
+        '''
+        self.i += steps
+        changes = defaultdict(float)
+        for update in updates:
+            for param, (change, total) in update.items():
+                changes[param] += change / len(updates)
+                self._totals[param] += total
+        for param, change in changes.items():
+            feat, clas = param
+            weights = self.weights.setdefault(feat, {})
+            weight = weights.get(clas, 0.0)
+            self._totals[param] += (self.i - self._tstamps[param]) * weight
+            self._tstamps[param] = self.i
+            weights[clas] = weight + change
+        self._compiled = None
 
     def save(self, path):
         '''Save the pickled model weights.'''
@@ -95,6 +150,361 @@ class AveragedPerceptron(object):
         '''Load the pickled model weights.'''
         self.weights = load(path)
 
+
+def _expand_ranges(starts, lengths):
+    '''Return the concatenation of ``range(start, start + length)`` for
+    each of ``starts`` and ``lengths``.'''
+    ends = np.cumsum(lengths)
+    return np.arange(ends[-1]) + np.repeat(starts - ends + lengths, lengths)
+
+
+# The relative difference below which two compiled scores are treated
+# as a tie, and recomputed by ``AveragedPerceptron.predict()``.
+_TIE_TOLERANCE = 1e-9
+
+
+class SparseWeights(object):
+
+    '''The weights of an ``AveragedPerceptron`` in compressed sparse row
+    form: each feature string is mapped to a row id, and the nonzero
+    weights of row ``r`` are ``data[indptr[r]:indptr[r+1]]``, for the
+    classes in the corresponding slice of ``indices``.  Scoring a set of
+    features is then a sum of gathered rows, and scoring the features of
+    every token in a sentence can be done in one pass.
+
+    Class columns are sorted in reverse, so that taking the first highest
+    score breaks ties in favour of the greatest label, as
+    ``AveragedPerceptron.predict()`` does.  The weights are summed in a
+    different order than by ``predict()``, so scores may differ in their
+    last bits; callers should settle near ties with ``predict()``.
+    '''
+
+    def __init__(self, weights, classes):
+        self.weights = weights
+        self.classes = set(classes)
+        self.labels = sorted(classes, reverse=True)
+        class_ids = dict((label, i) for i, label in enumerate(self.labels))
+
+        self.feature_ids = {}
+        indptr, indices, data = [0], [], []
+        for feat, feat_weights in weights.items():
+            row = [(class_ids[label], weight)
+                   for label, weight in feat_weights.items()
+                   if weight and label in class_ids]
+            if not row:
+                continue
+            self.feature_ids[feat] = len(self.feature_ids)
+            for class_id, weight in sorted(row):
+                indices.append(class_id)
+                data.append(weight)
+            indptr.append(len(indices))
+        self.indptr = np.array(indptr, dtype=np.intp)
+        self.indices = np.array(indices, dtype=np.intp)
+        self.data = np.array(data, dtype=np.float64)
+        self._cache = {}
+
+    def row(self, feat):
+        '''Return the row id of ``feat``, or -1 if it has no weights.'''
+        return self.feature_ids.get(feat, -1)
+
+    def rows(self, features):
+        '''Return an array of the row ids of ``features``, with -1 for the
+        features that have no weights.'''
+        get = self.feature_ids.get
+        return np.array([get(feat, -1) for feat in features], dtype=np.intp)
+
+    def scores(self, feature_lists):
+        '''Return an array with a row of class scores for each list of
+        features in ``feature_lists``; columns are in ``labels`` order.'''
+        features, owners = [], []
+        for owner, feature_list in enumerate(feature_lists):
+            features.extend(feature_list)
+            owners.extend([owner] * len(feature_list))
+        rows = self.rows(features)
+        known = rows >= 0
+        rows = rows[known]
+
+        nclasses = len(self.labels)
+        size = len(feature_lists) * nclasses
+        if not len(rows):
+            return np.zeros((len(feature_lists), nclasses))
+        owners = np.array(owners, dtype=np.intp)[known]
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        # The positions in ``data`` of every weight in the gathered rows.
+        positions = _expand_ranges(starts, lengths)
+        keys = np.repeat(owners * nclasses, lengths) + self.indices[positions]
+        scores = np.bincount(keys, weights=self.data[positions],
+                             minlength=size)
+        return scores.reshape(len(feature_lists), nclasses)
+
+    def cached_scores(self, features):
+        '''Return the class scores of ``features``, which are kept for
+        the next call with the same features.'''
+        features = tuple(features)
+        if features not in self._cache:
+            self._cache[features] = self.scores([features])[0]
+        return self._cache[features]
+
+    def add_row(self, scores, feat):
+        '''Add the weights of feature ``feat`` to the array ``scores``.'''
+        row = self.row(feat)
+        if row >= 0:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            scores[self.indices[start:end]] += self.data[start:end]
+
+
+######################################################################
+#{ Binary Model Format
+######################################################################
+
+# A binary model file starts with BINARY_MAGIC and the length of a JSON
+# header, which lists the classes and the dtype, offset and length of
+# each of the arrays that follow it.  Each array starts on an 8 byte
+# boundary, so that they can all be used directly from a memory map.
+# The arrays are:
+#
+#   - keys: the sorted 64 bit hashes (see _feature_keys()) of the
+#     features, which must all be distinct; the row id of a feature is
+#     its position in ``keys``
+#   - strings, offsets: the UTF-8 encoded feature strings, row by row,
+#     and the offsets of each of them in ``strings``
+#   - indptr, indices, data: the weights, as in SparseWeights
+#   - tagdict_strings, tagdict_offsets, tagdict_tags: the words of the
+#     tag dictionary, and the class ids of their tags
+
+BINARY_MAGIC = b'NLTKAPT1'
+
+def _feature_keys(features):
+    '''Return an array of 64 bit hashes of the UTF-8 encoded ``features``,
+    which (unlike ``hash()``) do not vary between processes.'''
+    digests = b''.join(hashlib.md5(feat).digest()[:8] for feat in features)
+    return np.frombuffer(digests, dtype='<u8')
+
+
+def _pack_strings(strings):
+    encoded = [string.encode('utf8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def save_binary(path, weights, tagdict, classes, dtype='<f4'):
+    '''
+    Save the weights, tag dictionary and classes of a perceptron tagger in
+    the binary format read by ``MappedWeights``.
+
+    :param path: The file to write.
+    :param weights: The model weights, as a dict of dicts.
+    :param tagdict: The dictionary of words with a single tag.
+    :param classes: The set of tags.
+    :param dtype: The numpy dtype of the stored weights.
+    '''
+    labels = sorted(classes, reverse=True)
+    class_ids = dict((label, i) for i, label in enumerate(labels))
+
+    rows = []
+    for feat, feat_weights in weights.items():
+        row = sorted((class_ids[label], weight)
+                     for label, weight in feat_weights.items()
+                     if weight and label in class_ids)
+        if row:
+            rows.append((feat, row))
+    keys = _feature_keys([feat.encode('utf8') for feat, row in rows]).tolist()
+    rows = sorted((key, feat, row) for key, (feat, row) in zip(keys, rows))
+    for (key1, feat1, row1), (key2, feat2, row2) in zip(rows, rows[1:]):
+        if key1 == key2:
+            raise ValueError('The features %r and %r have the same key'
+                             % (feat1, feat2))
+
+    arrays = {}
+    arrays['keys'] = np.array([key for key, feat, row in rows], dtype='<u8')
+    arrays['strings'], arrays['offsets'] = _pack_strings(
+        feat for key, feat, row in rows)
+    indptr = np.zeros(len(rows) + 1, dtype='<i8')
+    np.cumsum([len(row) for key, feat, row in rows], out=indptr[1:])
+    arrays['indptr'] = indptr
+    arrays['indices'] = np.array([class_id for key, feat, row in rows
+                                  for class_id, weight in row], dtype='<i4')
+    arrays['data'] = np.array([weight for key, feat, row in rows
+                               for class_id, weight in row], dtype=dtype)
+    words = sorted(word for word in tagdict if tagdict[word] in class_ids)
+    arrays['tagdict_strings'], arrays['tagdict_offsets'] = _pack_strings(words)
+    arrays['tagdict_tags'] = np.array([class_ids[tagdict[word]] for word in words],
+                                      dtype='<i4')
+
+    layout, offset = {}, 0
+    for name in sorted(arrays):
+        layout[name] = (arrays[name].dtype.str, offset, len(arrays[name]))
+        offset += -(-arrays[name].nbytes // 8) * 8
+    header = json.dumps({'classes': labels, 'arrays': layout}).encode('utf8')
+    header += b' ' * (-len(header) % 8)
+
+    with open(path, 'wb') as fout:
+        fout.write(BINARY_MAGIC)
+        fout.write(struct.pack('<Q', len(header)))
+        fout.write(header)
+        for name in sorted(arrays):
+            data = arrays[name].tobytes()
+            fout.write(data)
+            fout.write(b'\0' * (-len(data) % 8))
+
+
+def convert_pickle(pickle_loc, path, dtype='<f4'):
+    '''
+    Convert a pickled perceptron tagger model, such as
+    ``averaged_perceptron_tagger.pickle``, to the binary format.
+
+    :param pickle_loc: The location of the pickle, as accepted by
+        ``nltk.data.load()``.
+    :param path: The binary file to write.
+    '''
+    weights, tagdict, classes = load(pickle_loc)
+    save_binary(path, weights, tagdict, classes, dtype)
+
+
+class MappedWeights(SparseWeights):
+
+    '''
+    The weights of a perceptron tagger read from a binary model file
+    (see ``save_binary()``).  The arrays are used directly from a memory
+    map of the file, so loading takes no time, and processes that load
+    the same file, or are forked after loading it, share its pages.
+
+    Features are looked up by binary search in the sorted array of their
+    hashes, and then compared with the stored feature string.  ``weights``
+    is a read-only mapping view of the same data, in the format of
+    ``AveragedPerceptron.weights``.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fin:
+            if fin.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                raise ValueError('%s is not a perceptron tagger model' % path)
+            self._map = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        start = len(BINARY_MAGIC) + 8
+        header_len, = struct.unpack('<Q', self._map[len(BINARY_MAGIC):start])
+        header = json.loads(self._map[start:start + header_len].decode('utf8'))
+        start += header_len
+
+        arrays = {}
+        for name, (dtype, offset, length) in header['arrays'].items():
+            arrays[name] = np.frombuffer(self._map, dtype=dtype, count=length,
+                                         offset=start + offset)
+        self.labels = header['classes']
+        self.classes = set(self.labels)
+        self._keys = arrays['keys']
+        self._strings = arrays['strings']
+        self._offsets = arrays['offsets']
+        self.indptr = arrays['indptr']
+        self.indices = arrays['indices']
+        self.data = arrays['data']
+        self._tagdict = arrays['tagdict_strings'], arrays['tagdict_offsets'], \
+            arrays['tagdict_tags']
+        self.weights = _MappedWeightsView(self)
+        self._cache = {}
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def tagdict(self):
+        '''Return the tag dictionary stored in the model file.'''
+        strings, offsets, tags = self._tagdict
+        strings = strings.tobytes()
+        return dict((strings[offsets[i]:offsets[i + 1]].decode('utf8'),
+                     self.labels[tags[i]]) for i in range(len(tags)))
+
+    def feature(self, row):
+        '''Return the feature string of row ``row``.'''
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return self._strings[start:end].tobytes().decode('utf8')
+
+    def row(self, feat):
+        encoded = feat.encode('utf8')
+        key = _feature_keys([encoded])[0]
+        row = int(self._keys.searchsorted(key))
+        if row == len(self._keys) or self._keys[row] != key:
+            return -1
+        start, end = self._offsets[row], self._offsets[row + 1]
+        if self._strings[start:end].tobytes() != encoded:
+            return -1
+        return row
+
+    def rows(self, features):
+        encoded = [feat.encode('utf8') for feat in features]
+        keys = _feature_keys(encoded)
+        nrows = len(self._keys)
+        if not nrows or not len(keys):
+            return np.full(len(keys), -1, dtype=np.intp)
+        rows = np.searchsorted(self._keys, keys)
+        rows[rows == nrows] = 0
+        lengths = np.array([len(feat) for feat in encoded], dtype=np.intp)
+        starts = self._offsets[rows]
+        found = ((self._keys[rows] == keys) &
+                 (self._offsets[rows + 1] - starts == lengths))
+
+        # Compare the strings of the features with the same key, in case
+        # of a feature that is not in the model colliding with one that is.
+        candidates = np.flatnonzero(found & (lengths > 0))
+        if len(candidates):
+            query = np.frombuffer(b''.join(encoded[i] for i in candidates),
+                                  dtype=np.uint8)
+            lengths = lengths[candidates]
+            equal = (self._strings[_expand_ranges(starts[candidates], lengths)]
+                     == query)
+            ends = np.cumsum(lengths)
+            found[candidates] = np.logical_and.reduceat(equal, ends - lengths)
+        return np.where(found, rows, -1)
+
+
+class _MappedWeightsView(object):
+
+    '''A read-only dict-of-dicts view of the weights in a ``MappedWeights``.'''
+
+    def __init__(self, weights):
+        self._weights = weights
+
+    def __reduce__(self):
+        # Unpickle as the view of the unpickled ``MappedWeights``, so that
+        # a model's weights are still those of its compiled matrix.
+        return getattr, (self._weights, 'weights')
+
+    def get(self, feat, default=None):
+        row = self._weights.row(feat)
+        if row < 0:
+            return default
+        weights = self._weights
+        start, end = weights.indptr[row], weights.indptr[row + 1]
+        return dict((weights.labels[class_id], float(weight))
+                    for class_id, weight in zip(weights.indices[start:end],
+                                                weights.data[start:end]))
+
+    def __getitem__(self, feat):
+        feat_weights = self.get(feat)
+        if feat_weights is None:
+            raise KeyError(feat)
+        return feat_weights
+
+    def __contains__(self, feat):
+        return self._weights.row(feat) >= 0
+
+    def __len__(self):
+        return len(self._weights._keys)
+
+    def keys(self):
+        return [self._weights.feature(row) for row in range(len(self))]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        return [(feat, self[feat]) for feat in self.keys()]
+
+
 @python_2_unicode_compatible
 class PerceptronTagger(TaggerI):
 
@@ -137,8 +547,16 @@ class PerceptronTagger(TaggerI):
         self.tagdict = {}
         self.classes = set()
         if load:
-            AP_MODEL_LOC = 'file:'+str(find('taggers/averaged_perceptron_tagger/'+PICKLE))
-            self.load(AP_MODEL_LOC)
+            # Prefer the binary model, which needs numpy, if it is installed.
+            try:
+                binary_loc = find('taggers/averaged_perceptron_tagger/'+BINARY)
+            except LookupError:
+                binary_loc = None
+            if binary_loc is not None and np is not None:
+                self.load_binary(str(binary_loc))
+            else:
+                AP_MODEL_LOC = 'file:'+str(find('taggers/averaged_perceptron_tagger/'+PICKLE))
+                self.load(AP_MODEL_LOC)
 
     def tag(self, tokens):
         '''
@@ -150,6 +568,9 @@ class PerceptronTagger(TaggerI):
         output = []
         
         context = self.START + [self.normalize(w) for w in tokens] + self.END
+        weights = self.model.compiled()
+        if weights is not None:
+            return self._tag_compiled(tokens, context, weights)
         for i, word in enumerate(tokens):
             tag = self.tagdict.get(word)
             if not tag:
@@ -161,14 +582,61 @@ class PerceptronTagger(TaggerI):
 
         return output
 
-    def train(self, sentences, save_loc=None, nr_iter=5):
+    def _tag_compiled(self, tokens, context, weights):
+        '''
+        Tag a sentence using the model's ``SparseWeights``.  The features
+        that depend only on the words are scored for the whole sentence at
+        once; the features of the preceding tags are added one token at a
+        time, and the scores of those that depend on the tags alone are
+        cached.  Tokens whose best scores are too close to be told apart
+        by the order of summation are tagged by ``predict()``, so the tags
+        are the same as those of the dict-based path.
+        '''
+        untagged = [i for i, word in enumerate(tokens)
+                    if not self.tagdict.get(word)]
+        static = weights.scores([self._context_features(i, tokens[i], context)
+                                 for i in untagged])
+        static = dict(zip(untagged, static))
+
+        prev, prev2 = self.START
+        output = []
+        for i, word in enumerate(tokens):
+            tag = self.tagdict.get(word)
+            if not tag:
+                scores = static[i] + weights.cached_scores(
+                    self._tag_features(prev, prev2))
+                weights.add_row(scores, self._tag_word_feature(i, context, prev))
+                best = scores.argmax()
+                if (scores >= scores[best] - _TIE_TOLERANCE *
+                        max(1.0, abs(scores[best]))).sum() > 1:
+                    features = self._get_features(i, word, context, prev,
+                                                  prev2)
+                    tag = self.model.predict(features)
+                else:
+                    tag = weights.labels[best]
+            output.append((word, tag))
+            prev2 = prev
+            prev = tag
+
+        return output
+
+    def train(self, sentences, save_loc=None, nr_iter=5, n_jobs=1):
         '''Train a model from sentences, and save it at ``save_loc``. ``nr_iter``
         controls the number of Perceptron training iterations.
 
+        If ``n_jobs`` is not 1, each iteration is run in parallel by
+        iterative parameter mixing (McDonald, Hall and Mann, 2010): the
+        shuffled sentences are split into ``n_jobs`` shards, a copy of the
+        model is trained on each shard by a worker process, and the model
+        weights are set to the mean of the weights of the copies.  The
+        final weights are averaged over every training step of every
+        worker, as in serial training.
+
         :param sentences: A list or iterator of sentences, where each sentence
             is a list of (words, tags) tuples.
         :param save_loc: If not ``None``, saves a pickled model in this location.
         :param nr_iter: Number of training iterations.
+        :param n_jobs: Number of worker processes; ``None`` for one per CPU.
         '''
         # We'd like to allow ``sentences`` to be either a list or an iterator,
         # the latter being especially important for a large training dataset.
@@ -180,27 +648,28 @@ class PerceptronTagger(TaggerI):
         self._sentences = list()  # to be populated by self._make_tagdict...
         self._make_tagdict(sentences)
         self.model.classes = self.classes
-        for iter_ in range(nr_iter):
-            c = 0
-            n = 0
-            for sentence in self._sentences:
-                words, tags = zip(*sentence)
-                
-                prev, prev2 = self.START
-                context = self.START + [self.normalize(w) for w in words] \
-                                                                    + self.END
-                for i, word in enumerate(words):
-                    guess = self.tagdict.get(word)
-                    if not guess:
-                        feats = self._get_features(i, word, context, prev, prev2)
-                        guess = self.model.predict(feats)
-                        self.model.update(tags[i], guess, feats)
-                    prev2 = prev
-                    prev = guess
-                    c += guess == tags[i]
-                    n += 1
-            random.shuffle(self._sentences)
-            logging.info("Iter {0}: {1}/{2}={3}".format(iter_, c, n, _pc(c, n)))
+        if n_jobs is None or n_jobs < 1:
+            import multiprocessing
+            n_jobs = multiprocessing.cpu_count()
+        if n_jobs == 1:
+            for iter_ in range(nr_iter):
+                c, n = self._train_pass(self.model, self._sentences)
+                random.shuffle(self._sentences)
+                logging.info("Iter {0}: {1}/{2}={3}".format(iter_, c, n, _pc(c, n)))
+        else:
+            # The tagger and its training sentences are sent to the worker
+            # processes once; the sentences are then shuffled by shuffling
+            # their indices, in the same order as in serial training.
+            order = list(range(len(self._sentences)))
+            pool = WorkerPool(self, n_jobs)
+            try:
+                for iter_ in range(nr_iter):
+                    c, n = self._train_parallel_pass(pool, order)
+                    random.shuffle(order)
+                    logging.info("Iter {0}: {1}/{2}={3}".format(
+                        iter_, c, n, _pc(c, n)))
+            finally:
+                pool.close()
 
         # We don't need the training sentences anymore, and we don't want to
         # waste space on them when we pickle the trained tagger.
@@ -212,7 +681,66 @@ class PerceptronTagger(TaggerI):
             with open(save_loc, 'wb') as fout:
                 # changed protocol from -1 to 2 to make pickling Python 2 compatible
                 pickle.dump((self.model.weights, self.tagdict, self.classes), fout, 2)
-        
+
+    def _train_pass(self, model, sentences):
+        '''Train ``model`` on each of ``sentences``, and return the number
+        of tokens that were tagged correctly, and the number of tokens.'''
+        c = 0
+        n = 0
+        for sentence in sentences:
+            words, tags = zip(*sentence)
+
+            prev, prev2 = self.START
+            context = self.START + [self.normalize(w) for w in words] \
+                                                                + self.END
+            for i, word in enumerate(words):
+                guess = self.tagdict.get(word)
+                if not guess:
+                    feats = self._get_features(i, word, context, prev, prev2)
+                    guess = model.predict(feats)
+                    model.update(tags[i], guess, feats)
+                prev2 = prev
+                prev = guess
+                c += guess == tags[i]
+                n += 1
+        return c, n
+
+    def _train_parallel_pass(self, pool, order):
+        '''Run a training iteration on the sentences in ``order`` with the
+        worker processes of ``pool``, and mix their results into the
+        model.'''
+        size = -(-len(order) // pool.n_jobs)
+        # Only the current weights and the indices of the sentences of each
+        # shard are sent as tasks.
+        shards = [(self.model.weights, order[start:start + size])
+                  for start in range(0, len(order), size)]
+        results = pool.map('_train_shard', shards)
+        self.model.mix(sum(steps for c, n, steps, update in results),
+                       [update for c, n, steps, update in results])
+        return (sum(c for c, n, steps, update in results),
+                sum(n for c, n, steps, update in results))
+
+    def _train_shard(self, shard):
+        '''Train a copy of the weights ``base`` on the training sentences
+        with the given indices, where ``shard`` is ``(base, indices)``,
+        returning the counts of ``_train_pass()``, the number of training
+        steps, and the update to the model, in the format of
+        ``AveragedPerceptron.mix()``.'''
+        base, indices = shard
+        model = AveragedPerceptron()
+        model.weights = dict((feat, dict(weights))
+                             for feat, weights in base.items())
+        model.classes = self.classes
+        c, n = self._train_pass(model, [self._sentences[i] for i in indices])
+
+        update = {}
+        for param in model._tstamps:
+            feat, clas = param
+            weight = model.weights[feat].get(clas, 0.0)
+            base_weight = base.get(feat, {}).get(clas, 0.0)
+            total = model._totals[param] + (model.i - model._tstamps[param]) * weight
+            update[param] = (weight - base_weight, total - model.i * base_weight)
+        return c, n, model.i, update
 
     def load(self, loc):
         '''
@@ -222,7 +750,37 @@ class PerceptronTagger(TaggerI):
 
         self.model.weights, self.tagdict, self.classes = load(loc)
         self.model.classes = self.classes
-        
+        self.model._compiled = None
+
+    def save_binary(self, path, dtype='<f4'):
+        '''
+        Save the model in the binary format read by ``load_binary()``.
+
+        :param path: The file to write.
+        :type path: str
+        :param dtype: The numpy dtype of the stored weights; the default,
+            single precision, halves the size of the file.
+        '''
+        save_binary(path, self.model.weights, self.tagdict, self.classes, dtype)
+
+    def load_binary(self, path):
+        '''
+        Load a model saved by ``save_binary()`` or ``convert_pickle()``.
+        The weights are memory mapped rather than read; the model's
+        ``weights`` become a read-only view of them, so to train the model
+        further, first copy them with
+        ``tagger.model.weights = dict(tagger.model.weights)``.
+
+        :param path: The binary model file.
+        :type path: str
+        '''
+        mapped = MappedWeights(path)
+        self.tagdict = mapped.tagdict()
+        self.classes = set(mapped.labels)
+        self.model.weights = mapped.weights
+        self.model.classes = self.classes
+        self.model._compiled = mapped
+
 
     def normalize(self, word):
         '''
@@ -247,27 +805,43 @@ class PerceptronTagger(TaggerI):
         {hashable: int} dict. If the features change, a new model must be
         trained.
         '''
+        features = defaultdict(int)
+        for feature in self._context_features(i, word, context):
+            features[feature] += 1
+        for feature in self._tag_features(prev, prev2):
+            features[feature] += 1
+        features[self._tag_word_feature(i, context, prev)] += 1
+        return features
+
+    def _context_features(self, i, word, context):
+        '''Return the features of the token at ``i`` that depend only on
+        the words of the sentence, and not on the tags assigned so far.
+        '''
         def add(name, *args):
-            features[' '.join((name,) + tuple(args))] += 1
+            return ' '.join((name,) + tuple(args))
 
         i += len(self.START)
-        features = defaultdict(int)
         # It's useful to have a constant feature, which acts sort of like a prior
-        add('bias')
-        add('i suffix', word[-3:])
-        add('i pref1', word[0])
-        add('i-1 tag', prev)
-        add('i-2 tag', prev2)
-        add('i tag+i-2 tag', prev, prev2)
-        add('i word', context[i])
-        add('i-1 tag+i word', prev, context[i])
-        add('i-1 word', context[i-1])
-        add('i-1 suffix', context[i-1][-3:])
-        add('i-2 word', context[i-2])
-        add('i+1 word', context[i+1])
-        add('i+1 suffix', context[i+1][-3:])
-        add('i+2 word', context[i+2])
-        return features
+        return [add('bias'),
+                add('i suffix', word[-3:]),
+                add('i pref1', word[0]),
+                add('i word', context[i]),
+                add('i-1 word', context[i-1]),
+                add('i-1 suffix', context[i-1][-3:]),
+                add('i-2 word', context[i-2]),
+                add('i+1 word', context[i+1]),
+                add('i+1 suffix', context[i+1][-3:]),
+                add('i+2 word', context[i+2])]
+
+    def _tag_features(self, prev, prev2):
+        '''Return the features that depend only on the previous two tags.'''
+        return [' '.join(('i-1 tag', prev)),
+                ' '.join(('i-2 tag', prev2)),
+                ' '.join(('i tag+i-2 tag', prev, prev2))]
+
+    def _tag_word_feature(self, i, context, prev):
+        '''Return the feature combining the previous tag and the word.'''
+        return ' '.join(('i-1 tag+i word', prev, context[i + len(self.START)]))
 
     def _make_tagdict(self, sentences):
         '''
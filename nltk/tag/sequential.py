@@ -20,11 +20,20 @@ backoff tagger for any other SequentialBackoffTagger.
 from __future__ import print_function, unicode_literals
 from abc import abstractmethod
 
+import itertools
 import re
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+from six import get_unbound_function
 
 from nltk.probability import ConditionalFreqDist
 from nltk.classify import NaiveBayesClassifier
+from nltk.collections import LazyConcatenation, LazyMap
 from nltk.compat import python_2_unicode_compatible
+from nltk.util import parallel_apply
 
 from nltk.tag.api import TaggerI, FeaturesetTaggerI
 
@@ -58,11 +67,86 @@ class SequentialBackoffTagger(TaggerI):
 
     def tag(self, tokens):
         # docs inherited from TaggerI
+        levels = [tagger._compiled_level() for tagger in self._taggers]
+        if any(level is not None for level in levels):
+            return self._tag_compiled(tokens, levels)
         tags = []
         for i in range(len(tokens)):
             tags.append(self.tag_one(tokens, i, tags))
         return list(zip(tokens, tags))
 
+    def _compiled_level(self):
+        """
+        Return a representation of this tagger for ``_tag_compiled()``, or
+        None if its tags can only be found with ``choose_tag()``.  This is
+        either ``(_CONSTANT, tag)``, ``(_WORDS, table)`` for a dictionary
+        mapping words to tags, or ``(_NGRAMS, table)`` for an
+        ``_NgramTable``.
+        """
+        return None
+
+    def _tag_compiled(self, tokens, levels):
+        """
+        Tag ``tokens``, looking up the tag of each token in the tables of
+        the backoff chain in turn, without calling the taggers that have
+        a compiled level.  For the n-gram tables, the code of the tags
+        before the current token is kept up to date as tags are chosen,
+        along with the number of tokens for which an unknown tag is still
+        part of the context.
+        """
+        steps = []
+        ngrams = []
+        for tagger, level in zip(self._taggers, levels):
+            if level is None:
+                steps.append((None, tagger, None, None, None))
+            elif level[0] == _NGRAMS:
+                table = level[1]
+                # The state of an n-gram table: the code of the tags in its
+                # window, and how long an unknown tag stays in the window.
+                state = [0, 0]
+                steps.append((_NGRAMS, table._words, table._table,
+                              table._span, (table._tags, state)))
+                ngrams.append((state, table._tag_ids, table._base,
+                               table._span, table._n - 1))
+            else:
+                steps.append((level[0], level[1], None, None, None))
+
+        tags = []
+        for index, token in enumerate(tokens):
+            tag = None
+            for kind, obj, table, span, extra in steps:
+                if kind == _NGRAMS:
+                    state = extra[1]
+                    if state[1]:
+                        continue
+                    word_id = obj.get(token)
+                    if word_id is None:
+                        continue
+                    tag_id = table.get(word_id * span + state[0])
+                    if tag_id is None:
+                        continue
+                    tag = extra[0][tag_id]
+                elif kind == _WORDS:
+                    tag = obj.get(token)
+                elif kind == _CONSTANT:
+                    tag = obj
+                else:
+                    tag = obj.choose_tag(tokens, index, tags)
+                if tag is not None:
+                    break
+            tags.append(tag)
+
+            for state, tag_ids, base, span, width in ngrams:
+                tag_id = tag_ids.get(tag)
+                if tag_id is None:
+                    tag_id = 0
+                    state[1] = width
+                elif state[1]:
+                    state[1] -= 1
+                state[0] = (state[0] * base + tag_id) % span
+
+        return list(zip(tokens, tags))
+
     def tag_one(self, tokens, index, history):
         """
         Determine an appropriate tag for the specified token, and
@@ -170,6 +254,7 @@ class ContextTagger(SequentialBackoffTagger):
         """
 
         token_count = hit_count = 0
+        context_to_tag = {}
 
         # A context is considered 'useful' if it's not already tagged
         # perfectly by the backoff tagger.
@@ -199,12 +284,13 @@ class ContextTagger(SequentialBackoffTagger):
             best_tag = fd[context].max()
             hits = fd[context][best_tag]
             if hits > cutoff:
-                self._context_to_tag[context] = best_tag
+                context_to_tag[context] = best_tag
                 hit_count += hits
+        self._context_to_tag = context_to_tag
 
         # Display some stats, if requested.
         if verbose:
-            size = len(self._context_to_tag)
+            size = self.size()
             backoff = 100 - (hit_count * 100.0) / token_count
             pruning = 100 - (size * 100.0) / len(fd.conditions())
             print("[Trained Unigram tagger:", end=' ')
@@ -212,6 +298,113 @@ class ContextTagger(SequentialBackoffTagger):
                 size, backoff, pruning))
 
 
+# The kinds of compiled levels of a backoff chain; see
+# SequentialBackoffTagger._compiled_level().
+_CONSTANT, _WORDS, _NGRAMS = range(3)
+
+
+_inherited = {}
+
+
+def _is_inherited(obj, name, cls):
+    """Return True if ``obj`` uses the definition of method ``name``
+    in ``cls``."""
+    key = (type(obj), name, cls)
+    if key not in _inherited:
+        _inherited[key] = (get_unbound_function(getattr(type(obj), name)) is
+                           get_unbound_function(getattr(cls, name)))
+    return _inherited[key]
+
+
+class _NgramTable(Mapping):
+    """
+    The context-to-tag table of an ``NgramTagger``, in a compact form.
+    A context ``(tags, word)`` with fewer than ``n`` tags is stored as
+    a single integer, combining the number of the word with the numbers
+    of the tags, and the tag it maps to is stored as a number.  Any other
+    contexts are stored unchanged.  The table is a read-only mapping.
+    """
+    def __init__(self, n, context_to_tag):
+        self._n = n
+        self._tags = [None]
+        self._tag_ids = {}
+        self._words = {}
+        self._table = {}
+        self._other = {}
+
+        # Number the tags first: the range of the tag codes depends on it.
+        for context, tag in context_to_tag.items():
+            if self._is_ngram(context):
+                for history_tag in context[0]:
+                    self._tag_id(history_tag)
+                self._tag_id(tag)
+        self._base = len(self._tags)
+        self._span = self._base ** (n - 1)
+
+        for context, tag in context_to_tag.items():
+            if self._is_ngram(context):
+                word_id = self._words.setdefault(context[1], len(self._words))
+                key = word_id * self._span + self._code(context[0])
+                self._table[key] = self._tag_ids[tag]
+            else:
+                self._other[context] = tag
+
+    def _is_ngram(self, context):
+        return (isinstance(context, tuple) and len(context) == 2 and
+                isinstance(context[0], tuple) and len(context[0]) < self._n)
+
+    def _tag_id(self, tag):
+        if tag not in self._tag_ids:
+            self._tag_ids[tag] = len(self._tags)
+            self._tags.append(tag)
+        return self._tag_ids[tag]
+
+    def _code(self, history):
+        code = 0
+        for tag in history:
+            code = code * self._base + self._tag_ids[tag]
+        return code
+
+    def get(self, context, default=None):
+        """Return the tag for ``context``, or ``default``."""
+        if not self._is_ngram(context):
+            return self._other.get(context, default)
+        history, word = context
+        word_id = self._words.get(word)
+        if word_id is None or any(tag not in self._tag_ids for tag in history):
+            return default
+        tag_id = self._table.get(word_id * self._span + self._code(history))
+        return self._tags[tag_id] if tag_id is not None else default
+
+    def __getitem__(self, context):
+        tag = self.get(context, self)
+        if tag is self:
+            raise KeyError(context)
+        return tag
+
+    def __iter__(self):
+        return (context for context, tag in self.items())
+
+    def items(self):
+        """Return a list of the (context, tag) pairs in the table."""
+        words = [None] * len(self._words)
+        for word, word_id in self._words.items():
+            words[word_id] = word
+        items = list(self._other.items())
+        for key, tag_id in self._table.items():
+            word_id, code = divmod(key, self._span)
+            history = []
+            while code:
+                code, tag_id_ = divmod(code, self._base)
+                history.append(self._tags[tag_id_])
+            items.append(((tuple(reversed(history)), words[word_id]),
+                          self._tags[tag_id]))
+        return items
+
+    def __len__(self):
+        return len(self._table) + len(self._other)
+
+
 ######################################################################
 # Tagger Classes
 ######################################################################
@@ -251,6 +444,11 @@ class DefaultTagger(SequentialBackoffTagger):
     def choose_tag(self, tokens, index, history):
         return self._tag  # ignore token and history
 
+    def _compiled_level(self):
+        if _is_inherited(self, 'choose_tag', DefaultTagger):
+            return _CONSTANT, self._tag
+        return None
+
     def __repr__(self):
         return '<DefaultTagger: tag=%s>' % self._tag
 
@@ -271,6 +469,12 @@ class NgramTagger(ContextTagger):
     contexts that are already tagged perfectly by the backoff
     tagger.
 
+    The table is kept in a compact form, with each context encoded as
+    a single integer; ``_context_to_tag`` is a read-only view of it.
+    When a chain of n-gram taggers (ending, typically, with a
+    ``DefaultTagger``) tags a sentence, the tag of each token is looked
+    up directly in the table of each tagger of the chain in turn.
+
     :param train: A tagged corpus consisting of a list of tagged
         sentences, where each sentence is a list of (word, tag) tuples.
     :param backoff: A backoff tagger, to be used by the new
@@ -291,8 +495,25 @@ class NgramTagger(ContextTagger):
         if train:
             self._train(train, cutoff, verbose)
 
+    @property
+    def _context_to_tag(self):
+        """A read-only mapping from contexts to tags."""
+        return self._table
+
+    @_context_to_tag.setter
+    def _context_to_tag(self, context_to_tag):
+        self._table = _NgramTable(self._n, context_to_tag)
+
+    def __setstate__(self, state):
+        # Taggers pickled before the table was compacted store it as
+        # a dictionary.
+        context_to_tag = state.pop('_context_to_tag', None)
+        self.__dict__.update(state)
+        if context_to_tag is not None:
+            self._context_to_tag = context_to_tag
+
     def encode_json_obj(self):
-        return self._n, self._context_to_tag, self.backoff
+        return self._n, dict(self._context_to_tag), self.backoff
 
     @classmethod
     def decode_json_obj(cls, obj):
@@ -303,6 +524,21 @@ class NgramTagger(ContextTagger):
         tag_context = tuple(history[max(0, index-self._n+1):index])
         return tag_context, tokens[index]
 
+    def choose_tag(self, tokens, index, history):
+        return self._table.get(self.context(tokens, index, history))
+
+    def size(self):
+        return len(self._table)
+
+    def _compiled_level(self):
+        if not _is_inherited(self, 'choose_tag', NgramTagger):
+            return None
+        if _is_inherited(self, 'context', NgramTagger):
+            return _NGRAMS, self._table
+        if _is_inherited(self, 'context', UnigramTagger):
+            return _WORDS, self._table._other
+        return None
+
 
 @jsontags.register_tag
 class UnigramTagger(NgramTagger):
@@ -599,11 +835,26 @@ class ClassifierBasedTagger(SequentialBackoffTagger, FeaturesetTaggerI):
     :param cutoff_prob: If specified, then this tagger will fall
         back on its backoff tagger if the probability of the most
         likely tag is less than *cutoff_prob*.
+
+    :param cache_size: The maximum number of tags cached by local
+        context (see ``feature_context()``); 0 disables the cache.
+
+    Sentences are tagged in batches by ``tag_sents()``: the tokens at
+    each position of all the sentences of a batch are classified with
+    a single call to the classifier's ``classify_many()``.  If the
+    featureset of a token only depends on a local context, as given by
+    ``feature_context()``, the tag chosen for each context is cached,
+    and tokens in a context seen before are not classified again.
+
+    The training featuresets are generated lazily, as the classifier
+    builder reads them, rather than being all built up front; if the
+    builder makes more than one pass over them, *train* should be a
+    sequence (such as a corpus view) rather than an iterator.
     """
     def __init__(self, feature_detector=None, train=None,
                  classifier_builder=NaiveBayesClassifier.train,
                  classifier=None, backoff=None,
-                 cutoff_prob=None, verbose=False):
+                 cutoff_prob=None, verbose=False, cache_size=100000):
         self._check_params(train, classifier)
 
         SequentialBackoffTagger.__init__(self, backoff)
@@ -624,46 +875,166 @@ class ClassifierBasedTagger(SequentialBackoffTagger, FeaturesetTaggerI):
         self._classifier = classifier
         """The classifier used to choose a tag for each token."""
 
+        self._cache_size = cache_size
+        self._cache = {}
+        """Mapping from local contexts to the tags chosen for them."""
+
         if train:
             self._train(train, classifier_builder, verbose)
 
     def choose_tag(self, tokens, index, history):
-        # Use our feature detector to get the featureset.
-        featureset = self.feature_detector(tokens, index, history)
+        return self._choose_tags([(tokens, index, history)])[0]
 
-        # Use the classifier to pick a tag.  If a cutoff probability
-        # was specified, then check that the tag's probability is
-        # higher than that cutoff first; otherwise, return None.
+    def _choose_tags(self, contexts):
+        """
+        Return the tags that the classifier chooses for each of
+        ``contexts``, a list of ``(tokens, index, history)`` tuples, or
+        None for those where the most likely tag's probability is below
+        the cutoff.  Contexts whose tag is cached are not classified.
+        """
+        tags = [None] * len(contexts)
+        keys = [None] * len(contexts)
+        new = []
+        for i, (tokens, index, history) in enumerate(contexts):
+            if self._cache_size:
+                keys[i] = self.feature_context(tokens, index, history)
+                if keys[i] is not None and keys[i] in self._cache:
+                    tags[i] = self._cache[keys[i]]
+                    continue
+            new.append(i)
+        if not new:
+            return tags
+
+        # Use our feature detector to get the featuresets.
+        featuresets = [self.feature_detector(*contexts[i]) for i in new]
+
+        # Use the classifier to pick the tags.  If a cutoff probability
+        # was specified, then check that each tag's probability is
+        # higher than that cutoff first; otherwise, use None.
         if self._cutoff_prob is None:
-            return self._classifier.classify(featureset)
+            new_tags = self._classifier.classify_many(featuresets)
+        else:
+            new_tags = []
+            for pdist in self._classifier.prob_classify_many(featuresets):
+                tag = pdist.max()
+                new_tags.append(tag if pdist.prob(tag) >= self._cutoff_prob
+                                else None)
+
+        for i, tag in zip(new, new_tags):
+            tags[i] = tag
+            if keys[i] is not None:
+                if len(self._cache) >= self._cache_size:
+                    self._cache.clear()
+                self._cache[keys[i]] = tag
+        return tags
+
+    def feature_context(self, tokens, index, history):
+        """
+        Return a hashable key for the parts of *tokens* and *history*
+        that the featureset of ``tokens[index]`` depends on, or None if
+        the featureset is not determined by a local context.  Tokens
+        with the same key must have the same featureset, since the tag
+        chosen for a key is cached.  The default is None, which
+        disables the cache.
+        """
+        return None
 
-        pdist = self._classifier.prob_classify(featureset)
-        tag = pdist.max()
-        return tag if pdist.prob(tag) >= self._cutoff_prob else None
+    def tag(self, tokens):
+        # docs inherited from TaggerI
+        return self._tag_batch([tokens])[0]
+
+    def iter_tag_sents(self, sentences, n_jobs=1, chunksize=64):
+        """
+        Tag each of the sentences, yielding the tagged sentences in order.
+        The sentences are tagged in batches of ``chunksize``, classifying
+        the tokens at each position of the batch at once, and the batches
+        are distributed over ``n_jobs`` worker processes if ``n_jobs`` is
+        not 1 (see ``TaggerI.iter_tag_sents()``).
+
+        :param n_jobs: the number of worker processes
+        :type n_jobs: int
+        :param chunksize: the number of sentences tagged at a time
+        :type chunksize: int
+        :rtype: iter(list(tuple(str, str)))
+        """
+        sentences = iter(sentences)
+        batches = iter(lambda: list(itertools.islice(sentences, chunksize)), [])
+        for tagged_sents in parallel_apply(self, '_tag_batch', batches, n_jobs):
+            for tagged_sent in tagged_sents:
+                yield tagged_sent
+
+    def _tag_batch(self, sentences):
+        """
+        Tag each of ``sentences``, choosing the tags of the tokens at each
+        position of all the sentences together; tokens for which the
+        classifier gives no tag are tagged by the backoff tagger.
+        """
+        sentences = [list(tokens) for tokens in sentences]
+        histories = [[] for tokens in sentences]
+        for index in range(max([len(tokens) for tokens in sentences] or [0])):
+            active = [i for i, tokens in enumerate(sentences)
+                      if index < len(tokens)]
+            tags = self._choose_tags([(sentences[i], index, histories[i])
+                                      for i in active])
+            for i, tag in zip(active, tags):
+                if tag is None and self.backoff is not None:
+                    tag = self.backoff.tag_one(sentences[i], index,
+                                               histories[i])
+                histories[i].append(tag)
+        return [list(zip(tokens, history))
+                for tokens, history in zip(sentences, histories)]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Taggers pickled before tags were cached.
+        if '_cache' not in state:
+            self._cache_size = 0
+            self._cache = {}
 
     def _train(self, tagged_corpus, classifier_builder, verbose):
         """
         Build a new classifier, based on the given training data
-        *tagged_corpus*.
+        *tagged_corpus*.  If *tagged_corpus* is a sequence, such as a
+        corpus view, the training corpus for the classifier is a lazy
+        sequence, whose featuresets are generated as it is read;
+        otherwise it is a list.
         """
-
-        classifier_corpus = []
         if verbose:
             print('Constructing training corpus for classifier.')
 
-        for sentence in tagged_corpus:
-            history = []
-            untagged_sentence, tags = zip(*sentence)
-            for index in range(len(sentence)):
-                featureset = self.feature_detector(untagged_sentence,
-                                                   index, history)
-                classifier_corpus.append((featureset, tags[index]))
-                history.append(tags[index])
+        if (hasattr(tagged_corpus, '__getitem__') and
+                hasattr(tagged_corpus, '__len__')):
+            classifier_corpus = LazyConcatenation(
+                LazyMap(self._sentence_featuresets, tagged_corpus))
+        else:
+            # The classifier builder may read its corpus more than once.
+            classifier_corpus = list(itertools.chain.from_iterable(
+                map(self._sentence_featuresets, tagged_corpus)))
 
         if verbose:
             print('Training classifier (%d instances)' % len(classifier_corpus))
         self._classifier = classifier_builder(classifier_corpus)
 
+    def _sentence_featuresets(self, sentence):
+        """
+        Return the list of labeled featuresets for the tokens of the
+        tagged sentence *sentence*.
+        """
+        featuresets = []
+        history = []
+        untagged_sentence, tags = zip(*sentence) if sentence else ((), ())
+        for index in range(len(sentence)):
+            featureset = self.feature_detector(untagged_sentence,
+                                               index, history)
+            featuresets.append((featureset, tags[index]))
+            history.append(tags[index])
+        return featuresets
+
     def __repr__(self):
         return '<ClassifierBasedTagger: %r>' % self._classifier
 
@@ -693,6 +1064,14 @@ class ClassifierBasedPOSTagger(ClassifierBasedTagger):
     """
     A classifier based part of speech tagger.
     """
+    def feature_context(self, tokens, index, history):
+        # The featureset depends on the word, the two words before it,
+        # and their tags -- unless a subclass has its own features.
+        if not _is_inherited(self, 'feature_detector', ClassifierBasedPOSTagger):
+            return None
+        return (tuple(tokens[max(0, index-2):index+1]),
+                tuple(history[max(0, index-2):index]))
+
     def feature_detector(self, tokens, index, history):
         word = tokens[index]
         if index == 0:
@@ -15,8 +15,6 @@ http://acl.ldc.upenn.edu/A/A00/A00-1031.pdf
 from __future__ import print_function, division
 from math import log
 
-from operator import itemgetter
-
 from nltk.probability import FreqDist, ConditionalFreqDist
 from nltk.tag.api import TaggerI
 
@@ -75,14 +73,23 @@ class TnT(TaggerI):
     A beam search is used to limit the memory usage of the algorithm.
     The degree of the beam can be changed using N in the initialization.
     N represents the maximum number of possible solutions to maintain
-    while tagging.
+    while tagging.  Solutions that end with the same two tags are
+    merged, keeping the most probable one, since they are extended in
+    the same way by the rest of the sentence.
+
+    The interpolated transition probabilities, the word probabilities,
+    and the tags of unknown words are cached as they are computed, so
+    that tagging many sentences with tagdata() gets faster as it goes.
+    The caches of words are emptied whenever they hold ``cache_size``
+    words.
 
     It is possible to differentiate the tags which are assigned to
     capitalized words. However this does not result in a significant
     gain in the accuracy of the results.
     '''
 
-    def __init__(self, unk=None, Trained=False, N=1000, C=False):
+    def __init__(self, unk=None, Trained=False, N=1000, C=False,
+                 cache_size=100000):
         '''
         Construct a TnT statistical tagger. Tagger must be trained
         before being used to tag input.
@@ -95,6 +102,9 @@ class TnT(TaggerI):
         :type  N:(int)
         :param C: Capitalization flag
         :type  C: boolean
+        :param cache_size: The maximum number of words whose tags and
+            probabilities are cached; 0 disables these caches
+        :type  cache_size: int
 
         Initializer, creates frequency distributions to be used
         for tagging
@@ -125,11 +135,32 @@ class TnT(TaggerI):
         self._T    = Trained
 
         self._unk = unk
+        self._cache_size = cache_size
 
         # statistical tools (ignore or delete me)
         self.unknown = 0
         self.known = 0
 
+        self._clear_caches()
+
+    def _clear_caches(self):
+        '''
+        Empty the caches of the transition log probabilities (by history
+        and tag), of the tags and log probabilities of known words (by
+        word and capitalization flag), and of the tags of unknown words.
+        '''
+        self._transition_cache = {}
+        self._word_cache = {}
+        self._unk_cache = {}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Taggers pickled before the caches were added.
+        if '_transition_cache' not in state:
+            self._clear_caches()
+        if '_cache_size' not in state:
+            self._cache_size = 100000
+
     def train(self, data):
         '''
         Uses a set of tagged data to train the tagger.
@@ -142,6 +173,7 @@ class TnT(TaggerI):
 
         # Ensure that local C flag is initialized before use
         C = False
+        self._clear_caches()
 
         if self._unk is not None and self._T == False:
             self._unk.train(data)
@@ -270,23 +302,23 @@ class TnT(TaggerI):
         else:
             return v1 / v2
 
-    def tagdata(self, data):
+    def tagdata(self, data, n_jobs=1):
         '''
         Tags each sentence in a list of sentences
 
         :param data:list of list of words
         :type data: [[string,],]
+        :param n_jobs: the number of processes to tag with (see
+            ``TaggerI.tag_sents``); with more than one, the ``known``
+            and ``unknown`` counts are not updated
+        :type n_jobs: int
         :return: list of list of (word, tag) tuples
 
         Invokes tag(sent) function for each sentence
         compiles the results into a list of tagged sentences
         each tagged sentence is a list of (word, tag) tuples
         '''
-        res = []
-        for sent in data:
-            res1 = self.tag(sent)
-            res.append(res1)
-        return res
+        return self.tag_sents(data, n_jobs=n_jobs)
 
 
     def tag(self, data):
@@ -298,8 +330,9 @@ class TnT(TaggerI):
 
         :return: [(word, tag),]
 
-        Calls recursive function '_tagword'
-        to produce a list of tags
+        Calls function '_tagword' for each word, to
+        extend the possible tag sequences of the sentence
+        so far, and takes the tags of the most probable one
 
         Associates the sequence of returned tags
         with the correct words in the input sequence
@@ -307,48 +340,42 @@ class TnT(TaggerI):
         returns a list of (word, tag) tuples
         '''
 
-        current_state = [(['BOS', 'BOS'], 0.0)]
+        # each state is (logprob, (t_i-1, t_i), tags), where tags is
+        # the tag sequence, as nested (tag, previous tags) pairs
+        current_states = [(0.0, ('BOS', 'BOS'), None)]
 
         sent = list(data)
 
-        tags = self._tagword(sent, current_state)
+        for word in sent:
+            current_states = self._tagword(word, current_states)
 
-        res = []
-        for i in range(len(sent)):
+        tags = []
+        (logp, h, path) = current_states[0]
+        while path is not None:
             # unpack and discard the C flags
-            (t,C) = tags[i+2]
-            res.append((sent[i], t))
+            ((t, C), path) = path
+            tags.append(t)
+        tags.reverse()
 
-        return res
+        return list(zip(sent, tags))
 
 
-    def _tagword(self, sent, current_states):
+    def _tagword(self, word, current_states):
         '''
-        :param sent : List of words remaining in the sentence
-        :type sent  : [word,]
+        :param word : The next word of the sentence
+        :type word  : str
         :param current_states : List of possible tag combinations for
                                 the sentence so far, and the log probability
-                                associated with each tag combination
-        :type current_states  : [([tag, ], logprob), ]
-
-        Tags the first word in the sentence and
-        recursively tags the reminder of sentence
+                                associated with each tag combination,
+                                ordered greatest to least log probability
+        :type current_states  : [(logprob, (tag, tag), tags), ]
+        :return: the states extended with a tag for ``word``, in the
+                 same form
 
         Uses formula specified above to calculate the probability
         of a particular tag
         '''
 
-        # if this word marks the end of the sentance,
-        # return the most probable tag
-        if sent == []:
-            (h, logp) = current_states[0]
-            return h
-
-        # otherwise there are more words to be tagged
-        word = sent[0]
-        sent = sent[1:]
-        new_states = []
-
         # if the Capitalisation is requested,
         # initalise the flag for this word
         C = False
@@ -359,22 +386,27 @@ class TnT(TaggerI):
         # and their associated log probabilities
         if word in self._wd:
             self.known += 1
-
-            for (history, curr_sent_logprob) in current_states:
-                logprobs = []
-
-                for t in self._wd[word].keys():
-                    tC = (t,C)
-                    p_uni = self._uni.freq(tC)
-                    p_bi = self._bi[history[-1]].freq(tC)
-                    p_tri = self._tri[tuple(history[-2:])].freq(tC)
-                    p_wd = self._wd[word][t] / self._uni[tC]
-                    p = self._l1 *p_uni + self._l2 *p_bi + self._l3 *p_tri
-                    p2 = log(p, 2) + log(p_wd, 2)
-
-                    # compute the result of appending each tag to this history
-                    new_states.append((history + [tC],
-                                       curr_sent_logprob + p2))
+            word_logprobs = self._word_logprobs(word, C)
+
+            # the best state for each new pair of last tags, with the
+            # number of the extension that produced it; ties are
+            # resolved in favour of the first extension
+            best = {}
+            n = 0
+            for (curr_sent_logprob, history, tags) in current_states:
+                for (tC, logp_wd) in word_logprobs:
+                    p2 = self._transition_logprob(history, tC) + logp_wd
+                    logprob = curr_sent_logprob + p2
+                    key = (history[1], tC)
+                    if key not in best or logprob > best[key][0]:
+                        best[key] = (logprob, n, key, (tC, tags))
+                    n += 1
+
+            # sort states by log prob (then by order of extension)
+            # set is now ordered greatest to least log probability
+            new_states = sorted(best.values(), key=lambda s: (-s[0], s[1]))
+            new_states = [(logprob, key, tags)
+                          for (logprob, n, key, tags) in new_states]
 
         # otherwise a new word, set of possible tags is unknown
         else:
@@ -384,37 +416,87 @@ class TnT(TaggerI):
             # and the probability of each specific tag
             # can not be returned from most classifiers:
             # specify that any unknown words are tagged with certainty
-            p = 1
-
-            # if no unknown word tagger has been specified
-            # then use the tag 'Unk'
-            if self._unk is None:
-                tag = ('Unk',C)
-
-            # otherwise apply the unknown word tagger
-            else:
-                [(_w, t)] = list(self._unk.tag([word]))
-                tag = (t,C)
-
-            for (history, logprob) in current_states:
-                history.append(tag)
-
-            new_states = current_states
-
-        # now have computed a set of possible new_states
-
-        # sort states by log prob
-        # set is now ordered greatest to least log probability
-        new_states.sort(reverse=True, key=itemgetter(1))
+            tag = (self._unknown_tag(word), C)
+
+            # append the tag to every state, keeping the first (and so
+            # most probable) state for each pair of last tags
+            new_states = []
+            seen = set()
+            for (logprob, history, tags) in current_states:
+                key = (history[1], tag)
+                if key not in seen:
+                    seen.add(key)
+                    new_states.append((logprob, key, (tag, tags)))
 
         # del everything after N (threshold)
         # this is the beam search cut
         if len(new_states) > self._N:
             new_states = new_states[:self._N]
 
-        # compute the tags for the rest of the sentence
-        # return the best list of tags for the sentence
-        return self._tagword(sent, new_states)
+        return new_states
+
+
+    def _transition_logprob(self, history, tC):
+        '''
+        Return the log probability of tag ``tC`` after the tags in
+        ``history``, interpolated from the uni-, bi- and trigram models.
+        '''
+        key = (history, tC)
+        try:
+            return self._transition_cache[key]
+        except KeyError:
+            pass
+        p_uni = self._uni.freq(tC)
+        # (lookups which don't add empty conditions to the models)
+        p_bi = self._bi[history[-1]].freq(tC) if history[-1] in self._bi else 0
+        p_tri = self._tri[history].freq(tC) if history in self._tri else 0
+        p = self._l1 *p_uni + self._l2 *p_bi + self._l3 *p_tri
+        self._transition_cache[key] = logp = log(p, 2)
+        return logp
+
+
+    def _word_logprobs(self, word, C):
+        '''
+        Return a list of the possible tags of the known word ``word``,
+        with the log probability of the word given each tag.
+        '''
+        key = (word, C)
+        try:
+            return self._word_cache[key]
+        except KeyError:
+            pass
+        logprobs = []
+        for t in self._wd[word].keys():
+            tC = (t,C)
+            p_wd = self._wd[word][t] / self._uni[tC]
+            logprobs.append((tC, log(p_wd, 2)))
+        if self._cache_size:
+            if len(self._word_cache) >= self._cache_size:
+                self._word_cache.clear()
+            self._word_cache[key] = logprobs
+        return logprobs
+
+
+    def _unknown_tag(self, word):
+        '''
+        Return the tag of the unknown word ``word``: the tag given to it
+        by the unknown word tagger, or 'Unk' if there is none.
+        '''
+        # if no unknown word tagger has been specified
+        # then use the tag 'Unk'
+        if self._unk is None:
+            return 'Unk'
+
+        # otherwise apply the unknown word tagger
+        try:
+            return self._unk_cache[word]
+        except KeyError:
+            [(_w, t)] = list(self._unk.tag([word]))
+            if self._cache_size:
+                if len(self._unk_cache) >= self._cache_size:
+                    self._unk_cache.clear()
+                self._unk_cache[word] = t
+            return t
 
 
 ########################################
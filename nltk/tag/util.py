@@ -5,6 +5,10 @@
 #         Steven Bird <stevenbird1@gmail.com>
 # URL: <http://nltk.org/>
 # For license information, see LICENSE.TXT
+from __future__ import division
+
+from collections import Counter
+
 
 def str2tuple(s, sep='/'):
     """
@@ -69,4 +73,147 @@ def untag(tagged_sentence):
     return [w for (w, t) in tagged_sentence]
 
 
+class TagScore(object):
+    """
+    A utility class for scoring taggers.  ``TagScore`` accumulates the
+    number of times each gold standard tag was tagged as each tag, over
+    all the sentences it has scored, from which it computes the overall
+    accuracy and the precision and recall of each tag.  Sentences are
+    scored one at a time with the ``score`` method, so that a tagger can
+    be evaluated on a corpus that is read lazily::
+
+        >>> from nltk.tag import TagScore
+        >>> tagscore = TagScore()
+        >>> tagscore.score([('the', 'DT'), ('dog', 'NN')],
+        ...                [('the', 'DT'), ('dog', 'VB')])
+        >>> tagscore.score([('runs', 'VBZ')], [('runs', 'VBZ')])
+        >>> tagscore.accuracy()   # doctest: +ELLIPSIS
+        0.666...
+        >>> tagscore.precision('VB'), tagscore.recall('NN')
+        (0.0, 0.0)
+        >>> sorted(tagscore.confusion().items())
+        [(('DT', 'DT'), 1), (('NN', 'VB'), 1), (('VBZ', 'VBZ'), 1)]
+    """
+    def __init__(self):
+        self._confusion = Counter()
+        self._correct = 0
+        self._total = 0
+        self._seconds = 0.0
+
+    def score(self, correct, guessed):
+        """
+        Given a correctly tagged sentence, score another tagged version
+        of the same sentence.  A token is counted as correct if both the
+        token and its tag are the same in both versions.
+
+        :type correct: list(tuple(str, str))
+        :param correct: The known-correct ("gold standard") tagged
+            sentence.
+        :type guessed: list(tuple(str, str))
+        :param guessed: The tagged sentence to be scored.
+        """
+        if len(correct) != len(guessed):
+            raise ValueError("Lists must have the same length.")
+        for (correct_token, guessed_token) in zip(correct, guessed):
+            self._confusion[correct_token[1], guessed_token[1]] += 1
+            if correct_token == guessed_token:
+                self._correct += 1
+        self._total += len(correct)
+
+    def add_time(self, seconds):
+        """
+        Record that *seconds* were spent tagging the sentences scored.
+        """
+        self._seconds += seconds
+
+    def accuracy(self):
+        """
+        Return the fraction of the tokens scored that were tagged
+        correctly.
+
+        :rtype: float
+        """
+        return self._correct / self._total
+
+    def precision(self, tag):
+        """
+        Return the fraction of the tokens tagged *tag* whose gold
+        standard tag is *tag*, or None if no token was tagged *tag*.
+
+        :rtype: float or None
+        """
+        guessed = sum(count for ((c, g), count) in self._confusion.items()
+                      if g == tag)
+        if guessed == 0:
+            return None
+        return self._confusion[tag, tag] / guessed
+
+    def recall(self, tag):
+        """
+        Return the fraction of the tokens whose gold standard tag is
+        *tag* that were tagged *tag*, or None if there were none.
+
+        :rtype: float or None
+        """
+        correct = sum(count for ((c, g), count) in self._confusion.items()
+                      if c == tag)
+        if correct == 0:
+            return None
+        return self._confusion[tag, tag] / correct
+
+    def f_measure(self, tag, alpha=0.5):
+        """
+        Return the f-measure of *tag*, combining its precision and
+        recall (see ``nltk.metrics.f_measure``), or None if either of
+        them is None.
+
+        :rtype: float or None
+        """
+        p = self.precision(tag)
+        r = self.recall(tag)
+        if p is None or r is None:
+            return None
+        if p == 0 or r == 0:
+            return 0
+        return 1.0 / (alpha / p + (1 - alpha) / r)
+
+    def confusion(self):
+        """
+        Return a dictionary mapping each pair ``(gold_tag, guessed_tag)``
+        to the number of tokens with that gold standard tag that were
+        given that tag.
+
+        :rtype: dict(tuple(str, str), int)
+        """
+        return dict(self._confusion)
+
+    def tags(self):
+        """
+        Return the set of the gold standard and guessed tags.
+
+        :rtype: set(str)
+        """
+        return (set(c for (c, g) in self._confusion) |
+                set(g for (c, g) in self._confusion))
+
+    def tokens(self):
+        """
+        Return the number of tokens scored.
+
+        :rtype: int
+        """
+        return self._total
+
+    def tokens_per_second(self):
+        """
+        Return the number of tokens scored per second spent tagging them
+        (see ``add_time``), or None if no time was recorded.
+
+        :rtype: float or None
+        """
+        if not self._seconds:
+            return None
+        return self._total / self._seconds
 
+    def __repr__(self):
+        return '<TagScore of %d tokens>' % self._total
@@ -195,6 +195,12 @@ class Rule(TagRule):
             self.__hash = hash(repr(self))
             return self.__hash
 
+    def __setstate__(self, state):
+        # Don't restore the cached hash value: a Rule pickled in another
+        # process (e.g. a training worker) may hash differently here.
+        self.__dict__.update(state)
+        self.__dict__.pop('_Rule__hash', None)
+
     def __repr__(self):
         # Cache the repr (justified by profiling -- this is used as
         # a sort key when deterministic=True.)
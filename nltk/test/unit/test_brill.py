@@ -25,3 +25,63 @@ class TestBrill(unittest.TestCase):
     @unittest.skip("Should be tested in __main__ of nltk.tbl.demo")
     def test_brill_demo(self):
         demo()
+
+    def test_parallel_training(self):
+        train_sents = [
+            [('the', 'DT'), ('dog', 'NN'), ('runs', 'VBZ'), ('fast', 'RB')],
+            [('the', 'DT'), ('runs', 'NNS'), ('stop', 'VBP')],
+            [('a', 'DT'), ('dog', 'NN'), ('can', 'MD'), ('run', 'VB')],
+            [('dogs', 'NNS'), ('run', 'VBP'), ('fast', 'RB')],
+            [('we', 'PRP'), ('can', 'MD'), ('stop', 'VB'), ('the', 'DT'),
+             ('runs', 'NNS')]] * 3
+        tagger = UnigramTagger(train_sents[:3])
+        trainer = brill_trainer.BrillTaggerTrainer(
+            tagger, brill.fntbl37(), deterministic=True)
+        serial = trainer.train(train_sents, max_rules=10, min_score=1)
+        parallel = trainer.train(train_sents, max_rules=10, min_score=1,
+                                 n_jobs=2)
+        self.assertEqual(parallel.rules(), serial.rules())
+        self.assertEqual(parallel.train_stats(), serial.train_stats())
+
+        # All CPUs are used for n_jobs=None or negative, with about four
+        # shards each.
+        import multiprocessing
+        cpus = multiprocessing.cpu_count()
+        calls = []
+        parallel_apply = brill_trainer.parallel_apply
+        def counting_parallel_apply(obj, method, items, n_jobs=1, chunksize=1):
+            items = list(items)
+            calls.append((len(items), n_jobs))
+            return parallel_apply(obj, method, items, n_jobs, chunksize)
+        brill_trainer.parallel_apply = counting_parallel_apply
+        try:
+            for n_jobs in (None, -1):
+                parallel = trainer.train(train_sents, max_rules=10,
+                                         min_score=1, n_jobs=n_jobs)
+                self.assertEqual(parallel.rules(), serial.rules())
+        finally:
+            brill_trainer.parallel_apply = parallel_apply
+        for shards, n_jobs in calls:
+            self.assertEqual(n_jobs, cpus)
+            self.assertTrue(shards <= (1 if cpus == 1 else 4 * cpus))
+
+    def test_rule_order(self):
+        from nltk.tag import DefaultTagger
+        from nltk.tbl import Rule
+
+        # rules that only apply after an earlier rule introduced their tag,
+        # and tags that disappear and come back
+        rules = [Rule('000', 'NN', 'VB', [(brill.Word([-1]), 'to')]),
+                 Rule('000', 'VB', 'NN', [(brill.Word([0]), 'run')]),
+                 Rule('000', 'NN', 'JJ', [(brill.Word([1]), 'dog')]),
+                 Rule('000', 'VB', 'VBZ', [(brill.Word([0]), 'go')]),
+                 Rule('000', 'JJ', 'NN', [(brill.Pos([-1]), 'VBZ')]),
+                 Rule('000', 'NN', 'NNS', [(brill.Word([0]), 'dog')])]
+        tagger = brill.BrillTagger(DefaultTagger('NN'), rules)
+        for sent in ['to go big dog', 'to run fast', 'to go',
+                     'dog to go to run']:
+            tokens = sent.split()
+            expected = [(token, 'NN') for token in tokens]
+            for rule in rules:
+                rule.apply(expected)
+            self.assertEqual(tagger.tag(tokens), expected)
@@ -80,6 +80,97 @@ def test_backward_probability():
     assert_array_almost_equal(wikipedia_results, bp, 4)
 
 
+def test_batch_best_paths():
+    model, states, symbols = hmm._market_hmm_example()
+    sequences = [['up', 'down', 'unchanged', 'up'], ['down'], [],
+                 ['unchanged', 'up', 'up'], ['down', 'down', 'up', 'up', 'up']]
+
+    expected = [model.best_path_simple(seq) if seq else []
+                for seq in sequences]
+    assert model._best_paths(sequences) == expected
+    assert [model.best_path(seq) for seq in sequences if seq] == \
+        [path for path in expected if path]
+
+    tagged = model.tag_sents(sequences, chunksize=2)
+    assert tagged == [list(zip(seq, path))
+                      for seq, path in zip(sequences, expected)]
+    assert model.tag_sents(sequences, n_jobs=2, chunksize=2) == tagged
+
+
+def _baum_welch(sequences, **kwargs):
+    model, states, symbols = hmm._market_hmm_example()
+    trainer = hmm.HiddenMarkovModelTrainer(states, symbols)
+    model = trainer.train_unsupervised(sequences, model=model,
+                                       max_iterations=2, **kwargs)
+    return [[model._transitions[s1].prob(s2) for s2 in states]
+            for s1 in states]
+
+
+def test_baum_welch_counts():
+    import numpy
+    from numpy.testing import assert_array_almost_equal
+
+    model, states, symbols = hmm._market_hmm_example()
+    sequences = [['up', 'up', 'down', 'unchanged'], ['down', 'up'],
+                 ['unchanged', 'unchanged', 'up'], ['up']]
+    numbers = dict((symbol, i) for i, symbol in enumerate(symbols))
+    arrays = [numpy.array([numbers[symbol] for symbol in seq])
+              for seq in sequences]
+    outputs = numpy.array([[model._output_logprob(s, sym) for sym in symbols]
+                           for s in states])
+    priors = numpy.array([model._priors.logprob(s) for s in states])
+    counts = hmm._BaumWelchCounts(arrays)
+    logprob, A_numer, A_denom, B_numer, B_denom = counts.shard_counts(
+        (priors, model._transitions_matrix().T, outputs, [(0, 2), (2, 4)]))
+
+    assert abs(logprob - sum(model.log_probability([(sym, None) for sym in seq])
+                             for seq in sequences)) < 1e-9
+    # each token is in exactly one state, and all but the last of each
+    # sequence is followed by exactly one transition
+    assert abs(B_denom.sum() - 10) < 1e-9
+    assert abs(A_denom.sum() - 6) < 1e-9
+    assert abs(A_numer.sum() - 6) < 1e-9
+    assert_array_almost_equal(B_numer.sum(axis=1), B_denom)
+
+
+def test_baum_welch_batches():
+    from numpy.testing import assert_array_almost_equal
+
+    sequences = [[('up', None), ('up', None), ('down', None)],
+                 [('down', None), ('up', None)], [],
+                 [('unchanged', None), ('up', None), ('up', None),
+                  ('down', None)]]
+    expected = _baum_welch(sequences)
+    assert_array_almost_equal(_baum_welch(sequences, batch_size=1), expected)
+    assert_array_almost_equal(_baum_welch(sequences, batch_size=2, n_jobs=2),
+                              expected)
+
+
+def test_baum_welch_worker_pool():
+    from numpy.testing import assert_array_almost_equal
+
+    sequences = [[('up', None), ('down', None)],
+                 [('unchanged', None), ('up', None), ('up', None)]]
+    expected = _baum_welch(sequences)
+
+    # one pool serves all the iterations of the training
+    pools = []
+
+    class CountingPool(hmm.WorkerPool):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super(CountingPool, self).__init__(*args, **kwargs)
+
+    original = hmm.WorkerPool
+    hmm.WorkerPool = CountingPool
+    try:
+        result = _baum_welch(sequences, batch_size=1, n_jobs=2)
+    finally:
+        hmm.WorkerPool = original
+    assert len(pools) == 1
+    assert_array_almost_equal(result, expected)
+
+
 def setup_module(module):
     from nose import SkipTest
     try:
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for nltk.internals.
+"""
+
+from __future__ import unicode_literals
+import os
+import sys
+import tempfile
+import shutil
+import unittest
+
+from nltk.internals import PersistentProcess
+
+# Answers each line with its words in upper case, one per line, followed by
+# an empty line; exits on "crash", or stops answering on "hang", if the
+# marker file exists.
+_DUMMY_PROGRAM = r'''
+import os, sys, time
+marker = sys.argv[1]
+for line in iter(sys.stdin.readline, ''):
+    if line.strip() in ('crash', 'hang') and os.path.exists(marker):
+        os.remove(marker)
+        if line.strip() == 'crash':
+            sys.exit(1)
+        time.sleep(60)
+    for word in line.split():
+        sys.stdout.write(word.upper() + '\n')
+    sys.stdout.write('\n')
+    sys.stdout.flush()
+'''
+
+
+class TestPersistentProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.marker = os.path.join(self.tempdir, 'crash')
+        self.cmd = [sys.executable, '-c', _DUMMY_PROGRAM, self.marker]
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_batches(self):
+        with PersistentProcess(self.cmd, item_end=lambda line: not line) as process:
+            self.assertEqual(process.communicate(['a b', 'c']),
+                             [['A', 'B', ''], ['C', '']])
+            self.assertEqual(process.communicate(['d']), [['D', '']])
+
+    def test_restart(self):
+        open(self.marker, 'w').close()
+        with PersistentProcess(self.cmd, item_end=lambda line: not line) as process:
+            self.assertEqual(process.communicate(['a', 'crash', 'b']),
+                             [['A', ''], ['CRASH', ''], ['B', '']])
+            self.assertFalse(os.path.exists(self.marker))
+
+    def test_pool(self):
+        items = ['w%d' % i for i in range(50)]
+        expected = [['W%d' % i, ''] for i in range(50)]
+        with PersistentProcess(self.cmd, item_end=lambda line: not line,
+                               processes=3) as process:
+            self.assertEqual(process.communicate(items), expected)
+
+    def test_timeout(self):
+        open(self.marker, 'w').close()
+        with PersistentProcess(self.cmd, item_end=lambda line: not line,
+                               timeout=1) as process:
+            self.assertEqual(process.communicate(['a', 'hang', 'b']),
+                             [['A', ''], ['HANG', ''], ['B', '']])
+            self.assertFalse(os.path.exists(self.marker))
+
+        # A program that only answers at the end of its input never does.
+        cmd = [sys.executable, '-c', 'import sys; print(sys.stdin.read())']
+        with PersistentProcess(cmd, max_restarts=1, timeout=0.5) as process:
+            self.assertRaises(OSError, process.communicate, ['a'])
+
+    def test_bad_command(self):
+        # A failed constructor leaves nothing for __del__ to trip over.
+        self.assertRaises(TypeError, PersistentProcess, None)
+        process = PersistentProcess.__new__(PersistentProcess)
+        self.assertRaises(TypeError, process.__init__, None)
+        process.close()
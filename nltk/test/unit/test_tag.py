@@ -12,6 +12,362 @@ def test_basic():
                       ('.', '.')]
 
 
+def _train_perceptron():
+    from nltk.tag.perceptron import PerceptronTagger
+
+    tagger = PerceptronTagger(load=False)
+    tagger.train([[('today', 'NN'), ('is', 'VBZ'), ('good', 'JJ'), ('day', 'NN')],
+                  [('yes', 'NNS'), ('it', 'PRP'), ('beautiful', 'JJ')],
+                  [('the', 'DT'), ('dog', 'NN'), ('runs', 'VBZ'), ('1999', 'CD')],
+                  [('a', 'DT'), ('good-looking', 'JJ'), ('cat', 'NN'),
+                   ('ran', 'VBD')]])
+    return tagger
+
+
+def test_perceptron_sparse_weights():
+    import nltk.tag.perceptron as perceptron
+
+    tagger = _train_perceptron()
+    sents = [['today', 'is', 'a', 'beautiful', 'day'],
+             ['the', 'cat', 'is', 'good', 'today'],
+             ['yes', 'unknown', 'words', 'are', 'here', '2018', '42']]
+    fast = [tagger.tag(sent) for sent in sents]
+    assert tagger.model._compiled is not None
+
+    # The sparse matrix must give the same tags as the dict-of-dicts.
+    np = perceptron.np
+    perceptron.np = None
+    try:
+        slow = [tagger.tag(sent) for sent in sents]
+    finally:
+        perceptron.np = np
+    assert fast == slow
+
+    # Near ties are broken by predict(), whose order of summation gives
+    # A 0.1 + 0.2 + 0.3 > 0.6, where the compiled scores would be equal.
+    near_tie = perceptron.PerceptronTagger(load=False)
+    prev_tag, prev2_tag, both_tags = near_tie._tag_features(*near_tie.START)
+    near_tie.model.weights = {'bias': {'A': 0.1, 'B': 0.6},
+                              prev_tag: {'A': 0.2}, prev2_tag: {'A': 0.3}}
+    near_tie.classes = near_tie.model.classes = set(['A', 'B'])
+    assert near_tie.tag(['x']) == [('x', 'A')]
+    assert near_tie.model._compiled is not None
+
+    # Changing the weights invalidates the compiled matrix.
+    tagger.model.weights = dict(tagger.model.weights)
+    assert tagger.model.compiled().weights is tagger.model.weights
+
+
+def test_perceptron_binary_model():
+    import os
+    import pickle
+    import shutil
+    import tempfile
+    from nltk.tag.perceptron import (PerceptronTagger, MappedWeights,
+                                     convert_pickle)
+
+    tagger = _train_perceptron()
+    tagger.tagdict['the'] = 'DT'
+    sents = [['today', 'is', 'a', 'beautiful', 'day'],
+             ['the', 'good-looking', 'dog', 'ran', '2018']]
+    tmpdir = tempfile.mkdtemp()
+    try:
+        pickle_path = os.path.join(tmpdir, 'model.pickle')
+        with open(pickle_path, 'wb') as fout:
+            pickle.dump((tagger.model.weights, tagger.tagdict, tagger.classes),
+                        fout, 2)
+        binary_path = os.path.join(tmpdir, 'model.bin')
+        convert_pickle('file:' + pickle_path, binary_path)
+
+        mapped = PerceptronTagger(load=False)
+        mapped.load_binary(binary_path)
+        assert mapped.tagdict == tagger.tagdict
+        assert mapped.classes == tagger.classes
+        assert [mapped.tag(sent) for sent in sents] == \
+            [tagger.tag(sent) for sent in sents]
+
+        weights = mapped.model.weights
+        assert len(weights) == len(tagger.model.weights)
+        assert 'bias' in weights and 'no such feature' not in weights
+        for label, weight in weights['bias'].items():
+            assert abs(weight - tagger.model.weights['bias'][label]) < 1e-6
+
+        # Pickling a tagger with a mapped model only stores the path.
+        copy = pickle.loads(pickle.dumps(mapped))
+        assert [copy.tag(sent) for sent in sents] == \
+            [mapped.tag(sent) for sent in sents]
+        # ... and tagging with the copy still uses the mapped weights.
+        assert isinstance(copy.model._compiled, MappedWeights)
+        assert copy.model.weights is copy.model._compiled.weights
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_perceptron_parallel_training():
+    import random
+    from nltk.tag.perceptron import PerceptronTagger
+
+    # With a single shard, parameter mixing and the averaging over the
+    # steps of the worker must give exactly the weights of serial training.
+    sent = [('the', 'DT'), ('dog', 'NN'), ('is', 'VBZ'), ('a', 'DT'),
+            ('good', 'JJ'), ('dog', 'NN'), ('today', 'NN'), ('.', '.')]
+    serial = PerceptronTagger(load=False)
+    serial.train([sent], nr_iter=3)
+    parallel = PerceptronTagger(load=False)
+    parallel.train([sent], nr_iter=3, n_jobs=2)
+    assert parallel.model.weights == serial.model.weights
+
+    rng = random.Random(0)
+    words = [('the', 'DT'), ('a', 'DT'), ('dog', 'NN'), ('cat', 'NN'),
+             ('runs', 'VBZ'), ('sleeps', 'VBZ'), ('big', 'JJ'), ('.', '.')]
+    sents = [[rng.choice(words[:2]), rng.choice(words[6:7] + words[2:4]),
+              rng.choice(words[2:4]), rng.choice(words[4:6]), words[7]]
+             for _ in range(40)]
+    parallel = PerceptronTagger(load=False)
+
+    # one pool of workers serves all the iterations
+    from nltk.tag import perceptron
+    pools = []
+
+    class CountingPool(perceptron.WorkerPool):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super(CountingPool, self).__init__(*args, **kwargs)
+
+    perceptron.WorkerPool = CountingPool
+    try:
+        parallel.train(sents, nr_iter=3, n_jobs=3)
+    finally:
+        perceptron.WorkerPool = CountingPool.__bases__[0]
+    assert len(pools) == 1
+    assert parallel.evaluate(sents) > 0.9
+
+
+def test_parallel_tag_sents():
+    from nltk.tag import (DefaultTagger, UnigramTagger, BigramTagger,
+                          BrillTaggerTrainer, HiddenMarkovModelTagger)
+    from nltk.tag.brill import fntbl37
+
+    train = [[('today', 'NN'), ('is', 'VBZ'), ('good', 'JJ'), ('day', 'NN')],
+             [('yes', 'NNS'), ('it', 'PRP'), ('beautiful', 'JJ')],
+             [('the', 'DT'), ('dog', 'NN'), ('is', 'VBZ'), ('good', 'JJ')]]
+    sents = [['today', 'is', 'a', 'beautiful', 'day'],
+             ['the', 'dog', 'is', 'good'], ['yes', 'it', 'is']] * 5
+
+    backoff = BigramTagger(train, backoff=UnigramTagger(
+        train, backoff=DefaultTagger('NN')))
+    taggers = [backoff, _train_perceptron(),
+               HiddenMarkovModelTagger.train(train),
+               BrillTaggerTrainer(backoff, fntbl37()).train(train)]
+    for tagger in taggers:
+        expected = [tagger.tag(sent) for sent in sents]
+        assert tagger.tag_sents(sents) == expected
+        assert tagger.tag_sents(sents, n_jobs=2, chunksize=2) == expected
+        assert list(tagger.iter_tag_sents(iter(sents), n_jobs=2)) == expected
+
+
+def test_ngram_backoff_chain():
+    import pickle
+    from nltk.tag import (DefaultTagger, UnigramTagger, BigramTagger,
+                          TrigramTagger, RegexpTagger)
+
+    train = [[('the', 'DT'), ('dog', 'NN'), ('runs', 'VBZ'), ('fast', 'RB')],
+             [('the', 'DT'), ('runs', 'NNS'), ('stop', 'VBP')],
+             [('a', 'DT'), ('dog', 'NN'), ('runs', 'VBZ'), ('home', 'NN')],
+             [('dogs', 'NNS'), ('run', 'VBP'), ('fast', 'JJ'), ('cars', 'NNS')]]
+    sents = [['the', 'dog', 'runs', 'fast'], ['the', 'runs', 'stop'],
+             ['a', 'cat', 'runs', 'home', 'fast'], ['dogs', 'run'],
+             ['unknown', 'dog', 'runs', 'fast', 'cars'], []]
+
+    regexp = RegexpTagger([(r'.*s$', 'NNS')], backoff=DefaultTagger('NN'))
+    trigram = TrigramTagger(train, backoff=BigramTagger(
+        train, backoff=UnigramTagger(train, backoff=regexp)))
+    for tagger in [trigram, trigram.backoff, TrigramTagger(train)]:
+        for sent in sents:
+            # the backoff chain, one token and tagger at a time
+            tags = []
+            for i in range(len(sent)):
+                tags.append(tagger.tag_one(sent, i, tags))
+            assert tagger.tag(sent) == list(zip(sent, tags))
+
+    bigram = trigram.backoff
+    assert bigram.size() == len(bigram._context_to_tag)
+    copy = BigramTagger(model=bigram._context_to_tag)
+    assert copy._context_to_tag == bigram._context_to_tag
+    assert copy.choose_tag(['the', 'runs'], 1, ['DT']) == 'NNS'
+    assert dict(copy._context_to_tag)[('DT',), 'runs'] == 'NNS'
+    assert copy._context_to_tag[('DT',), 'runs'] == 'NNS'
+    assert (('DT',), 'unknown') not in copy._context_to_tag
+    try:
+        copy._context_to_tag[('DT',), 'runs'] = 'VBZ'
+    except TypeError:
+        pass
+    else:
+        assert False, 'the table should be read-only'
+
+    restored = pickle.loads(pickle.dumps(trigram))
+    assert [restored.tag(sent) for sent in sents] == \
+        [trigram.tag(sent) for sent in sents]
+
+
+def test_tnt_viterbi():
+    import itertools
+    from nltk.tag import tnt
+
+    train = [[('the', 'DT'), ('dog', 'NN'), ('runs', 'VBZ'), ('fast', 'RB')],
+             [('the', 'DT'), ('runs', 'NNS'), ('stop', 'VBP')],
+             [('a', 'DT'), ('fast', 'JJ'), ('dog', 'NN'), ('runs', 'VBZ')],
+             [('dogs', 'NNS'), ('run', 'VBP'), ('fast', 'RB')],
+             [('we', 'PRP'), ('stop', 'VBP'), ('the', 'DT'), ('runs', 'NNS')]]
+    tagger = tnt.TnT()
+    tagger.train(train)
+
+    def logprob(words, tags):
+        history, total = ('BOS', 'BOS'), 0.0
+        for word, tag in zip(words, tags):
+            total += (tagger._transition_logprob(history, (tag, False)) +
+                      dict(tagger._word_logprobs(word, False))[tag, False])
+            history = (history[1], (tag, False))
+        return total
+
+    sents = [['the', 'runs', 'stop'], ['a', 'fast', 'dog', 'runs', 'fast'],
+             ['we', 'stop', 'the', 'dog'], ['dogs', 'run', 'fast', 'fast']]
+    for sent in sents:
+        best = max(itertools.product(*[list(tagger._wd[w]) for w in sent]),
+                   key=lambda tags: logprob(sent, tags))
+        assert tagger.tag(sent) == list(zip(sent, best))
+    assert tagger.tagdata(sents) == [tagger.tag(sent) for sent in sents]
+    assert tagger.tag(['the', 'cat']) == [('the', 'DT'), ('cat', 'Unk')]
+
+    # The caches of words are bounded.
+    from nltk.tag import DefaultTagger
+    bounded = tnt.TnT(unk=DefaultTagger('NN'), Trained=True, cache_size=3)
+    bounded.train(train)
+    unknown = ['cat', 'cow', 'pig', 'hen', 'owl', 'cat']
+    assert bounded.tag(unknown) == [(word, 'NN') for word in unknown]
+    assert bounded.tagdata(sents) == [tagger.tag(sent) for sent in sents]
+    assert len(bounded._unk_cache) <= 3 and len(bounded._word_cache) <= 3
+
+
+def test_classifier_based_tagger_batches():
+    from nltk.tag import ClassifierBasedPOSTagger, DefaultTagger
+
+    train = [[('the', 'DT'), ('dog', 'NN'), ('runs', 'VBZ'), ('fast', 'RB')],
+             [('the', 'DT'), ('runs', 'NNS'), ('stop', 'VBP')],
+             [('a', 'DT'), ('fast', 'JJ'), ('dog', 'NN'), ('runs', 'VBZ')],
+             [('dogs', 'NNS'), ('run', 'VBP'), ('fast', 'RB')]]
+    sents = [['the', 'dog', 'runs'], ['a', 'dog', 'runs', 'fast'], [],
+             ['dogs', 'run', 'fast', 'home'], ['the', 'dog', 'runs']]
+
+    tagger = ClassifierBasedPOSTagger(train=train, cache_size=0)
+    expected = []
+    for sent in sents:
+        # one token at a time, through choose_tag()
+        tags = []
+        for i in range(len(sent)):
+            tags.append(tagger.choose_tag(sent, i, tags))
+        expected.append(list(zip(sent, tags)))
+    assert tagger.tag_sents(sents) == expected
+    assert tagger._cache == {}
+
+    cached = ClassifierBasedPOSTagger(classifier=tagger.classifier())
+    assert cached.tag_sents(sents, chunksize=2) == expected
+    assert [cached.tag(sent) for sent in sents] == expected
+    assert cached._cache[('the', 'dog'), ('DT',)] == 'NN'
+
+    backoff = ClassifierBasedPOSTagger(train=train, cutoff_prob=0.9,
+                                       backoff=DefaultTagger('XX'))
+    tagged = backoff.tag_sents(sents)
+    assert ('home', 'XX') in tagged[3]
+    assert tagged == [backoff.tag(sent) for sent in sents]
+
+    streamed = ClassifierBasedPOSTagger(train=(sent for sent in train))
+    assert streamed.tag_sents(sents) == expected
+
+
+def test_classifier_based_tagger_subclass_cache():
+    from nltk.tag import ClassifierBasedPOSTagger
+
+    class NextWordPOSTagger(ClassifierBasedPOSTagger):
+        # Its featuresets depend on the next word, which the context
+        # cached by ClassifierBasedPOSTagger does not include.
+        def feature_detector(self, tokens, index, history):
+            features = ClassifierBasedPOSTagger.feature_detector(
+                self, tokens, index, history)
+            features['nextword'] = (tokens[index+1]
+                                    if index+1 < len(tokens) else None)
+            return features
+
+    train = [[('they', 'PRP'), ('can', 'MD'), ('fish', 'VB')],
+             [('they', 'PRP'), ('can', 'VBP'), ('tuna', 'NN')]] * 3
+    tagger = NextWordPOSTagger(train=train)
+    assert tagger.tag(['they', 'can', 'fish']) == train[0]
+    assert tagger.tag(['they', 'can', 'tuna']) == train[1]
+    assert tagger._cache == {}
+
+
+def test_evaluate_scores():
+    from nltk.tag import UnigramTagger, DefaultTagger
+
+    gold = [[('the', 'DT'), ('dog', 'NN'), ('runs', 'VBZ')],
+            [('the', 'DT'), ('runs', 'NNS'), ('stop', 'VBP')],
+            [('a', 'DT'), ('cat', 'NN')]]
+    tagger = UnigramTagger(gold[:1], backoff=DefaultTagger('NN'))
+
+    tagscore = tagger.evaluate_scores(iter(gold), n_jobs=2, chunksize=1)
+    assert tagscore.tokens() == 8
+    assert tagscore.accuracy() == tagger.evaluate(gold) == 5 / 8.0
+    assert tagscore.confusion()['NNS', 'VBZ'] == 1
+    assert tagscore.precision('VBZ') == 0.5 and tagscore.recall('VBZ') == 1
+    assert tagscore.precision('VBP') is None and tagscore.recall('VBP') == 0
+    assert tagscore.tokens_per_second() > 0
+
+
+def _batch_tagger():
+    from nltk.tag.api import TaggerI
+
+    class BatchTagger(TaggerI):
+        """A tagger like the Stanford and Senna taggers, which start an
+        external process for each call of ``tag_sents()``."""
+        def __init__(self):
+            self.calls = 0
+
+        def tag(self, tokens):
+            return self.tag_sents([tokens])[0]
+
+        def tag_sents(self, sentences):
+            self.calls += 1
+            return [[(word, 'NNS' if word.endswith('s') else 'NN')
+                     for word in sent] for sent in sentences]
+
+    return BatchTagger()
+
+
+def test_batch_tagger():
+    from nltk.tag import BrillTaggerTrainer
+    from nltk.tag.brill import fntbl37
+
+    gold = [[('dogs', 'NNS'), ('bark', 'VBP')], [('a', 'DT'), ('cat', 'NN')]] * 50
+    sents = [[word for (word, tag) in sent] for sent in gold]
+
+    tagger = _batch_tagger()
+    expected = [tagger.tag(sent) for sent in sents]
+    tagger.calls = 0
+    assert list(tagger.iter_tag_sents(iter(sents), chunksize=64)) == expected
+    assert tagger.calls == 2
+
+    tagger.calls = 0
+    assert tagger.evaluate(gold) == 0.5
+    assert tagger.calls == 2
+    assert tagger.evaluate_scores(iter(gold), chunksize=100).accuracy() == 0.5
+    assert tagger.calls == 3
+
+    tagger.calls = 0
+    brill = BrillTaggerTrainer(tagger, fntbl37()).train(gold, max_rules=5)
+    assert tagger.calls == 1
+    assert brill.evaluate(gold) == 1.0
+
+
 def setup_module(module):
     from nose import SkipTest
     try:
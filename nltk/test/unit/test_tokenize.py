@@ -5,10 +5,18 @@ See also nltk/test/tokenize.doctest
 """
 
 from __future__ import unicode_literals
-from nltk.tokenize import TweetTokenizer, StanfordSegmenter, TreebankWordTokenizer
+from nltk.tokenize import (TweetTokenizer, StanfordSegmenter,
+                           TreebankWordTokenizer, MWETokenizer,
+                           TextTilingTokenizer, ReppTokenizer,
+                           WhitespaceTokenizer, WordPunctTokenizer,
+                           RegexpTokenizer)
 from nose import SkipTest
 import unittest
 import os
+import sys
+import shutil
+import tempfile
+import io
 
 
 class TestTokenize(unittest.TestCase):
@@ -166,3 +174,206 @@ class TestTokenize(unittest.TestCase):
         ]
         result = list(tokenizer.span_tokenize(test3))
         self.assertEqual(result, expected)
+
+    def test_tweet_tokenizer_many(self):
+        """
+        Test that TweetTokenizer.tokenize_many() agrees with tokenize(),
+        both in-process and with worker processes.
+        """
+        tokenizer = TweetTokenizer(preserve_case=False, reduce_len=True)
+        texts = ["@remy: This is waaaaayyyy too much for you!!!!!! :D",
+                 "Fish &amp; Chips &pound;5 :-P <3",
+                 b"Price: &pound;100 XD",
+                 "NO ENTITIES HERE :P, just CAPS"]
+        expected = [tokenizer.tokenize(text) for text in texts]
+        self.assertEqual(expected[0][-1], ':D')
+        self.assertEqual(expected[1][:3], ['fish', '&', 'chips'])
+        self.assertEqual(tokenizer.tokenize_many(texts), expected)
+        self.assertEqual(tokenizer.tokenize_many(texts, n_jobs=2,
+                                                 chunksize=1), expected)
+
+    def test_mwe_tokenizer_longest_match(self):
+        """
+        Test that MWETokenizer falls back to the longest complete expression
+        when a longer candidate fails part-way through.
+        """
+        tokenizer = MWETokenizer([('a', 'little'), ('a', 'little', 'bit', 'more'),
+                                  ('bit', 'by', 'bit'), ('little', 'bit')])
+        tokens = 'a little bit by bit a little bit more'.split()
+        expected = ['a_little', 'bit_by_bit', 'a_little_bit_more']
+        self.assertEqual(tokenizer.tokenize(tokens), expected)
+        tokens = 'just a little bit'.split()
+        expected = ['just', 'a_little', 'bit']
+        self.assertEqual(tokenizer.tokenize(tokens), expected)
+
+    def test_mwe_tokenizer_old_pickle(self):
+        """
+        Test that MWETokenizers pickled with only a word trie in ``_mwes``
+        are restored with a working automaton.
+        """
+        from nltk.util import Trie
+        old_state = {'_mwes': Trie([('a', 'little'), ('a', 'lot')]),
+                     '_separator': '_'}
+        tokenizer = MWETokenizer.__new__(MWETokenizer)
+        tokenizer.__setstate__(old_state)
+        self.assertEqual(tokenizer.tokenize('a little or a lot'.split()),
+                         ['a_little', 'or', 'a_lot'])
+        tokenizer.add_mwe(('or', 'a'))
+        self.assertEqual(tokenizer.tokenize('a little or a lot'.split()),
+                         ['a_little', 'or_a', 'lot'])
+
+    def test_texttiling_stream(self):
+        """
+        Test that TextTilingTokenizer.tokenize_stream() yields sections
+        that reassemble the original text.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise SkipTest("numpy is required for TextTilingTokenizer")
+        topics = [['apple', 'pear', 'plum', 'fig', 'lime', 'kiwi'],
+                  ['car', 'bus', 'train', 'tram', 'ship', 'plane'],
+                  ['red', 'blue', 'green', 'pink', 'grey', 'gold']]
+        paragraphs = []
+        for i in range(30):
+            words = topics[i // 10]
+            paragraphs.append(' '.join(words[(i + j) % 6] for j in range(60)))
+        text = '\n\n'.join(paragraphs)
+        tokenizer = TextTilingTokenizer(stopwords=[], w=10, k=3)
+        sections = list(tokenizer.tokenize_stream(
+            (paragraph + '\n\n' for paragraph in paragraphs), lookahead=60))
+        self.assertTrue(len(sections) > 1)
+        self.assertEqual(''.join(sections), text + '\n\n')
+        self.assertEqual(''.join(tokenizer.tokenize(text)), text)
+
+    def test_repp_tokenizer_persistent(self):
+        """
+        Test ReppTokenizer in persistent mode, using a stand-in for the
+        REPP binary that splits on whitespace.
+        """
+        if os.name != 'posix':
+            raise SkipTest("the stand-in REPP binary needs a POSIX shell")
+        repp_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(repp_dir, 'src'))
+            os.makedirs(os.path.join(repp_dir, 'erg'))
+            open(os.path.join(repp_dir, 'erg', 'repp.set'), 'w').close()
+            repp_bin = os.path.join(repp_dir, 'src', 'repp')
+            with open(repp_bin, 'w') as f:
+                f.write('#!%s\n' % sys.executable)
+                f.write('import re, sys\n'
+                        'for line in iter(sys.stdin.readline, ""):\n'
+                        '    for m in re.finditer(r"\\S+", line):\n'
+                        '        print("(%d, %d, %s)" % (m.start(), m.end(), m.group()))\n'
+                        '    print("")\n'
+                        '    sys.stdout.flush()\n')
+            os.chmod(repp_bin, 0o755)
+
+            with ReppTokenizer(repp_dir, persistent=True, processes=2) as tokenizer:
+                sents = ['Hello there !', '', 'One', ' ', 'Two words']
+                self.assertEqual(list(tokenizer.tokenize_sents(sents)),
+                                 [('Hello', 'there', '!'), (), ('One',), (),
+                                  ('Two', 'words')])
+                self.assertEqual(tokenizer.tokenize('a b'), ('a', 'b'))
+                positions = list(tokenizer.tokenize_sents(
+                    ['to be'], keep_token_positions=True))
+                self.assertEqual(positions, [[('to', 0, 2), ('be', 3, 5)]])
+        finally:
+            shutil.rmtree(repp_dir)
+
+    def test_stanford_persistent(self):
+        """
+        Test StanfordTokenizer and StanfordSegmenter in persistent mode,
+        using a stand-in for java that answers each line of its input
+        with one line: the words and punctuation of the line for
+        PTBTokenizer, and the line in upper case for the segmenter.
+        """
+        if os.name != 'posix':
+            raise SkipTest("the stand-in java binary needs a POSIX shell")
+        import nltk.internals
+        from nltk.tokenize.stanford import StanfordTokenizer
+        java_dir = tempfile.mkdtemp()
+        java_config = nltk.internals._java_bin, nltk.internals._java_options
+        javahome = os.environ.get('JAVAHOME')
+        try:
+            java_bin = os.path.join(java_dir, 'java')
+            with open(java_bin, 'w') as f:
+                f.write('#!%s\n' % sys.executable)
+                f.write('import re, sys\n'
+                        'ptb = "edu.stanford.nlp.process.PTBTokenizer" in sys.argv\n'
+                        'for line in iter(sys.stdin.readline, ""):\n'
+                        '    if ptb:\n'
+                        '        print(" ".join(re.findall(r"\\w+|[^\\w\\s]", line)))\n'
+                        '    else:\n'
+                        '        print(line.strip().upper())\n'
+                        '    sys.stdout.flush()\n')
+            os.chmod(java_bin, 0o755)
+            jar = os.path.join(java_dir, 'stanford.jar')
+            open(jar, 'w').close()
+            os.environ['JAVAHOME'] = java_bin
+
+            with StanfordTokenizer(jar, persistent=True,
+                                   processes=2) as tokenizer:
+                self.assertEqual(
+                    tokenizer.tokenize_sents(['Good muffins.', '', 'Two\nlines!']),
+                    [['Good', 'muffins', '.'], [], ['Two', 'lines', '!']])
+                self.assertEqual(tokenizer.tokenize('Thanks.'), ['Thanks', '.'])
+
+            with StanfordSegmenter(jar, java_class='Segmenter',
+                                   path_to_model='model',
+                                   persistent=True) as segmenter:
+                self.assertEqual(
+                    segmenter.segment_sents([['a', 'b'], [], ['c']]),
+                    'A B\n\nC\n')
+        finally:
+            nltk.internals._java_bin, nltk.internals._java_options = java_config
+            if javahome is None:
+                os.environ.pop('JAVAHOME', None)
+            else:
+                os.environ['JAVAHOME'] = javahome
+            shutil.rmtree(java_dir)
+
+    def test_regexp_tokenizer_stream(self):
+        """
+        Test that streaming RegexpTokenizers agree with tokenizing the
+        whole string, whatever the buffer size.
+        """
+        text = ("Good muffins cost $3.88\nin New York.  Please buy me\n"
+                "two of them.\n\nThanks.  " * 20)
+        tokenizers = [WhitespaceTokenizer(), WordPunctTokenizer(),
+                      RegexpTokenizer(r'[A-Z]\w+(?=\s)'),
+                      RegexpTokenizer(r'\s+', gaps=True, discard_empty=False)]
+        for tokenizer in tokenizers:
+            expected = list(tokenizer.span_tokenize(text))
+            for blocksize in (1, 5, 64, 4096):
+                spans = tokenizer.span_tokenize_stream(
+                    io.StringIO(text), blocksize=blocksize, margin=16)
+                self.assertEqual(list(spans), expected)
+
+        # Leading, adjacent and trailing separators.
+        tokenizer = RegexpTokenizer(r'\s', gaps=True, discard_empty=False)
+        for s in (u' a b', u'a  b '):
+            expected = list(tokenizer.span_tokenize(s))
+            for blocksize in (1, 2, 64):
+                spans = tokenizer.span_tokenize_stream(
+                    io.StringIO(s), blocksize=blocksize, margin=1)
+                self.assertEqual(list(spans), expected)
+
+        # Adjacent separators give empty tokens unless they are discarded.
+        for discard_empty in (True, False):
+            tokenizer = RegexpTokenizer(',', gaps=True,
+                                        discard_empty=discard_empty)
+            for blocksize in (1, 2, 64):
+                tokens = tokenizer.tokenize_file(
+                    io.StringIO(u'a,,b,'), blocksize=blocksize, margin=1)
+                self.assertEqual(list(tokens), tokenizer.tokenize(u'a,,b,'))
+
+        fd, filename = tempfile.mkstemp()
+        try:
+            with io.open(fd, 'w', encoding='utf8', newline='') as f:
+                f.write(text)
+            tokenizer = WhitespaceTokenizer()
+            self.assertEqual(list(tokenizer.tokenize_file(filename, blocksize=10)),
+                             tokenizer.tokenize(text))
+        finally:
+            os.remove(filename)
@@ -42,6 +42,8 @@ import re
 from six import int2byte, unichr
 from six.moves import html_entities
 
+from nltk.util import parallel_apply
+
 ######################################################################
 # The following strings are components in the regular expression
 # that is used for tokenizing. It's important that phone_number
@@ -187,6 +189,10 @@ EMOTICON_RE = re.compile(EMOTICONS, re.VERBOSE | re.I | re.UNICODE)
 # These are for regularizing HTML entities to Unicode:
 ENT_RE = re.compile(r'&(#?(x?))([^&;\s]+);')
 
+# These are for normalizing word lengthening and removing handles:
+LENGTHENING_RE = re.compile(r"(.)\1{2,}")
+HANDLES_RE = re.compile(r"(?<![A-Za-z0-9_!@#\$%&*])@(([A-Za-z0-9_]){20}(?!@))|(?<![A-Za-z0-9_!@#\$%&*])@(([A-Za-z0-9_]){1,19})(?![A-Za-z0-9_]*@)")
+
 
 ######################################################################
 # Functions for converting html entities
@@ -291,8 +297,10 @@ class TweetTokenizer:
         :return: a tokenized list of strings; concatenating this list returns\
         the original string if `preserve_case=False`
         """
-        # Fix HTML character entities:
-        text = _replace_html_entities(text)
+        # Fix HTML character entities (only entities start with '&'):
+        text = _str_to_unicode(text)
+        if '&' in text:
+            text = _replace_html_entities(text)
         # Remove username handles
         if self.strip_handles:
             text = remove_handles(text)
@@ -303,12 +311,40 @@ class TweetTokenizer:
         safe_text = HANG_RE.sub(r'\1\1\1', text)
         # Tokenize:
         words = WORD_RE.findall(safe_text)
-        # Possibly alter the case, but avoid changing emoticons like :D into :d:
+        # Possibly alter the case, but avoid changing emoticons like :D into :d.
+        # Only words that lowercasing would change need the emoticon check.
         if not self.preserve_case:
-            words = list(map((lambda x : x if EMOTICON_RE.search(x) else
-                              x.lower()), words))
+            words = [_lower_unless_emoticon(word) for word in words]
         return words
 
+    def tokenize_many(self, texts, n_jobs=1, chunksize=256):
+        """
+        Tokenize each of ``texts``, optionally using a pool of worker
+        processes.
+
+            >>> tknzr = TweetTokenizer(preserve_case=False)
+            >>> tknzr.tokenize_many(['Oh HAI :D', 'Fish &amp; Chips'])
+            [['oh', 'hai', ':D'], ['fish', '&', 'chips']]
+
+        :param texts: the texts to tokenize.
+        :type texts: iter(str)
+        :param n_jobs: the number of worker processes; 1 tokenizes in the
+            current process, ``None`` uses all available CPUs.
+        :type n_jobs: int
+        :param chunksize: the number of texts sent to a worker at a time.
+        :type chunksize: int
+        :rtype: list(list(str))
+        """
+        return list(parallel_apply(self, 'tokenize', texts, n_jobs,
+                                   chunksize))
+
+
+def _lower_unless_emoticon(word):
+    lower = word.lower()
+    if lower == word or EMOTICON_RE.search(word):
+        return word
+    return lower
+
 ######################################################################
 # Normalization Functions
 ######################################################################
@@ -318,16 +354,14 @@ def reduce_lengthening(text):
     Replace repeated character sequences of length 3 or greater with sequences
     of length 3.
     """
-    pattern = re.compile(r"(.)\1{2,}")
-    return pattern.sub(r"\1\1\1", text)
+    return LENGTHENING_RE.sub(r"\1\1\1", text)
 
 def remove_handles(text):
     """
     Remove Twitter username handles from text.
     """
-    pattern = re.compile(r"(?<![A-Za-z0-9_!@#\$%&*])@(([A-Za-z0-9_]){20}(?!@))|(?<![A-Za-z0-9_!@#\$%&*])@(([A-Za-z0-9_]){1,19})(?![A-Za-z0-9_]*@)")
     # Substitute hadnles with ' ' to ensure that text on either side of removed handles are tokenized correctly
-    return pattern.sub(' ', text)
+    return HANDLES_RE.sub(' ', text)
 
 ######################################################################
 # Tokenization Function
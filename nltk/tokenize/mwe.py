@@ -27,12 +27,195 @@ of MWEs:
     >>> tokenizer.tokenize('In a little or a little bit or a lot in spite of'.split())
     ['In', 'a_little', 'or', 'a_little_bit', 'or', 'a_lot', 'in_spite_of']
 
+Matching uses an Aho-Corasick automaton (``MWEAutomaton``) compiled from the
+lexicon, so tokenizing takes time linear in the length of the text regardless
+of the size of the lexicon.  Where expressions overlap, the leftmost and then
+longest one is chosen.  The compiled automaton pickles to a compact form, and
+can be passed directly to ``MWETokenizer`` to avoid recompiling the lexicon:
+
+    >>> import pickle
+    >>> automaton = pickle.loads(pickle.dumps(tokenizer.automaton()))
+    >>> MWETokenizer(automaton).tokenize('a lot of'.split())
+    ['a_lot', 'of']
+
 """
+from array import array
+
 from nltk.util import Trie
 
 from nltk.tokenize.api import TokenizerI
 
 
+class MWEAutomaton(object):
+    """
+    An Aho-Corasick automaton over sequences of tokens.  States are
+    integers, with 0 the initial state; each state corresponds to a prefix
+    of some multi-word expression in the lexicon.  Besides the trie
+    transitions, every state has a failure link to the state of its longest
+    proper suffix that is also a prefix in the lexicon, and an output link
+    to the nearest state on its failure chain that completes an expression.
+
+        >>> automaton = MWEAutomaton([('a', 'b'), ('b', 'c', 'd')])
+        >>> list(automaton.longest_matches('x a b c d'.split()))
+        [(1, 3)]
+        >>> list(automaton.longest_matches('x b c d'.split()))
+        [(1, 4)]
+        >>> sorted(automaton.mwes())
+        [('a', 'b'), ('b', 'c', 'd')]
+    """
+
+    def __init__(self, mwes=()):
+        """
+        :param mwes: the multi-word expressions, either as a sequence of
+            sequences of strings or as a ``Trie`` of them.
+        :type mwes: list(list(str)) or Trie
+        """
+        if not isinstance(mwes, Trie):
+            mwes = Trie(mwes)
+
+        vocab = {}
+        edges = {}
+        depth = [0]
+        nodes = [mwes]
+        for state, node in enumerate(nodes):
+            for token, child in node.items():
+                if token is Trie.LEAF:
+                    continue
+                symbol = vocab.setdefault(token, len(vocab))
+                edges[state, symbol] = len(nodes)
+                nodes.append(child)
+                depth.append(depth[state] + 1)
+
+        # Nodes are numbered breadth first, so a state's failure link is
+        # always computed before those of its children.
+        fail = [0] * len(nodes)
+        report = [0] * len(nodes)
+        for (state, symbol), child in sorted(edges.items(),
+                                             key=lambda item: item[1]):
+            if state:
+                target = fail[state]
+                while target and (target, symbol) not in edges:
+                    target = fail[target]
+                fail[child] = edges.get((target, symbol), 0)
+            if Trie.LEAF in nodes[child]:
+                report[child] = child
+            else:
+                report[child] = report[fail[child]]
+
+        self._vocab = vocab
+        self._nsymbols = len(vocab)
+        self._goto = dict((state * self._nsymbols + symbol, child)
+                          for (state, symbol), child in edges.items())
+        self._depth = array('i', depth)
+        self._fail = array('i', fail)
+        self._report = array('i', report)
+
+    def __len__(self):
+        """
+        Return the number of states in the automaton.
+        """
+        return len(self._depth)
+
+    def mwes(self):
+        """
+        Return an iterator over the multi-word expressions in the lexicon,
+        each as a tuple of strings.
+
+        :rtype: iter(tuple(str))
+        """
+        tokens = [None] * self._nsymbols
+        for token, symbol in self._vocab.items():
+            tokens[symbol] = token
+        parent = [0] * len(self)
+        label = [None] * len(self)
+        for key, child in self._goto.items():
+            parent[child], symbol = divmod(key, self._nsymbols)
+            label[child] = tokens[symbol]
+        for state in range(1, len(self)):
+            if self._report[state] == state:
+                mwe = []
+                while state:
+                    mwe.append(label[state])
+                    state = parent[state]
+                yield tuple(reversed(mwe))
+
+    def longest_matches(self, tokens):
+        """
+        Find the multi-word expressions in ``tokens``, choosing the leftmost
+        and then the longest expression wherever matches overlap.
+
+        :param tokens: the tokens to search.
+        :type tokens: list(str)
+        :return: an iterator over ``(start, end)`` pairs, in order, such
+            that ``tokens[start:end]`` is a multi-word expression.
+        :rtype: iter(tuple(int, int))
+        """
+        vocab, goto, nsymbols = self._vocab, self._goto, self._nsymbols
+        depth, fail, report = self._depth, self._fail, self._report
+
+        # Record the longest match starting at each position; matches are
+        # found in order of their end, so later ones are always longer.
+        longest = {}
+        state = 0
+        for end, token in enumerate(tokens, 1):
+            symbol = vocab.get(token)
+            if symbol is None:
+                state = 0
+                continue
+            while True:
+                child = goto.get(state * nsymbols + symbol)
+                if child is not None or not state:
+                    state = child or 0
+                    break
+                state = fail[state]
+            match = report[state]
+            while match:
+                longest[end - depth[match]] = end
+                match = report[fail[match]]
+
+        i, n = 0, len(tokens)
+        while i < n:
+            if i in longest:
+                yield (i, longest[i])
+                i = longest[i]
+            else:
+                i += 1
+
+    # The transitions are stored in compressed sparse row form, so that
+    # pickles hold a few flat arrays rather than millions of small objects.
+    def __getstate__(self):
+        tokens = [None] * self._nsymbols
+        for token, symbol in self._vocab.items():
+            tokens[symbol] = token
+        rows = [[] for state in self._depth]
+        for key, child in self._goto.items():
+            state, symbol = divmod(key, self._nsymbols)
+            rows[state].append((symbol, child))
+        offsets, symbols, children = array('i', [0]), array('i'), array('i')
+        for row in rows:
+            for symbol, child in sorted(row):
+                symbols.append(symbol)
+                children.append(child)
+            offsets.append(len(symbols))
+        return {'tokens': tokens, 'offsets': offsets, 'symbols': symbols,
+                'children': children, 'depth': self._depth,
+                'fail': self._fail, 'report': self._report}
+
+    def __setstate__(self, state):
+        tokens, offsets = state['tokens'], state['offsets']
+        symbols, children = state['symbols'], state['children']
+        self._vocab = dict((token, symbol)
+                           for symbol, token in enumerate(tokens))
+        self._nsymbols = nsymbols = len(tokens)
+        self._goto = goto = {}
+        for source in range(len(offsets) - 1):
+            for i in range(offsets[source], offsets[source + 1]):
+                goto[source * nsymbols + symbols[i]] = children[i]
+        self._depth = state['depth']
+        self._fail = state['fail']
+        self._report = state['report']
+
+
 class MWETokenizer(TokenizerI):
     """A tokenizer that processes tokenized text and merges multi-word expressions
     into single tokens.
@@ -42,19 +225,31 @@ class MWETokenizer(TokenizerI):
         """Initialize the multi-word tokenizer with a list of expressions and a
         separator
 
-        :type mwes: list(list(str))
+        :type mwes: list(list(str)) or MWEAutomaton
         :param mwes: A sequence of multi-word expressions to be merged, where
-            each MWE is a sequence of strings.
+            each MWE is a sequence of strings, or an already compiled
+            ``MWEAutomaton``.
         :type separator: str
         :param separator: String that should be inserted between words in a multi-word
             expression token. (Default is '_')
 
         """
-        if not mwes:
-            mwes = []
-        self._mwes = Trie(mwes)
+        if isinstance(mwes, MWEAutomaton):
+            self._trie = None
+            self._automaton = mwes
+        else:
+            self._trie = Trie(mwes or [])
+            self._automaton = None
         self._separator = separator
 
+    @property
+    def _mwes(self):
+        # The word trie is only needed for adding expressions, so it is
+        # rebuilt on demand for tokenizers created from an automaton.
+        if self._trie is None:
+            self._trie = Trie(self._automaton.mwes())
+        return self._trie
+
     def add_mwe(self, mwe):
         """Add a multi-word expression to the lexicon (stored as a word trie)
 
@@ -76,6 +271,18 @@ class MWETokenizer(TokenizerI):
 
         """
         self._mwes.insert(mwe)
+        self._automaton = None
+
+    def automaton(self):
+        """
+        Return the ``MWEAutomaton`` compiled from this tokenizer's lexicon,
+        compiling it first if the lexicon has changed.
+
+        :rtype: MWEAutomaton
+        """
+        if self._automaton is None:
+            self._automaton = MWEAutomaton(self._trie)
+        return self._automaton
 
     def tokenize(self, text):
         """
@@ -93,28 +300,26 @@ class MWETokenizer(TokenizerI):
         
         """
         i = 0
-        n = len(text)
         result = []
 
-        while i < n:
-            if text[i] in self._mwes:
-                # possible MWE match
-                j = i
-                trie = self._mwes
-                while j < n and text[j] in trie:
-                    trie = trie[text[j]]
-                    j = j + 1
-                else:
-                    if Trie.LEAF in trie:
-                        # success!
-                        result.append(self._separator.join(text[i:j]))
-                        i = j
-                    else:
-                        # no match, so backtrack
-                        result.append(text[i])
-                        i += 1
-            else:
-                result.append(text[i])
-                i += 1
+        for start, end in self.automaton().longest_matches(text):
+            result.extend(text[i:start])
+            result.append(self._separator.join(text[start:end]))
+            i = end
+        result.extend(text[i:])
 
         return result
+
+    def __getstate__(self):
+        # Pickle the compiled automaton rather than the word trie.
+        return {'_trie': None, '_automaton': self.automaton(),
+                '_separator': self._separator}
+
+    def __setstate__(self, state):
+        # Tokenizers pickled before the automaton was added store the
+        # lexicon as a word trie in ``_mwes``.
+        if '_mwes' in state:
+            state = dict(state)
+            state['_trie'] = state.pop('_mwes')
+            state['_automaton'] = MWEAutomaton(state['_trie'])
+        self.__dict__.update(state)
@@ -59,6 +59,14 @@ All of the regular expression tokenizers are also available as functions:
     >>> blankline_tokenize(s)
     ['Good muffins cost $3.88\nin New York.  Please buy me\ntwo of them.', 'Thanks.']
 
+Large files can be tokenized with constant memory, reading them a buffer
+at a time; offsets are reported relative to the start of the file:
+
+    >>> from io import StringIO
+    >>> list(tokenizer.span_tokenize_stream(StringIO(s), blocksize=8))
+    [(0, 4), (5, 12), (13, 17), (18, 23), (24, 26), (27, 30), (31, 36),
+    (38, 44), (45, 48), (49, 51), (52, 55), (56, 58), (59, 64), (66, 73)]
+
 Caution: The function ``regexp_tokenize()`` takes the text as its
 first argument, and the regular expression pattern as its second
 argument.  This differs from the conventions used by Python's
@@ -67,8 +75,11 @@ argument.  This differs from the conventions used by Python's
 """
 from __future__ import unicode_literals
 
+import io
 import re
 
+from six import string_types
+
 from nltk.tokenize.api import TokenizerI
 from nltk.tokenize.util import regexp_span_tokenize
 from nltk.compat import python_2_unicode_compatible
@@ -141,6 +152,113 @@ class RegexpTokenizer(TokenizerI):
             for m in re.finditer(self._regexp, text):
                 yield m.span()
 
+    def span_tokenize_stream(self, stream, blocksize=65536, margin=1024):
+        """
+        Identify the tokens in the text read from *stream*, a file-like
+        object opened in text mode, reading *blocksize* characters at a
+        time.  The offsets are relative to the start of the stream.
+
+        A match of this tokenizer's pattern is only accepted once at least
+        *margin* characters of text beyond it have been read, so matches
+        that straddle two buffers are found just as in the whole text.
+        This holds as long as each match, together with any text the
+        pattern looks at around it, is shorter than *margin* characters.
+        (When ``gaps`` is true, this applies to the separators, not the
+        tokens between them.)
+
+        :param stream: the text to be tokenized
+        :param blocksize: the number of characters to read at a time
+        :type blocksize: int
+        :param margin: the number of characters of lookahead
+        :type margin: int
+        :rtype: iter(tuple(int, int))
+        """
+        for start, end, token in self._stream_tokens(stream, blocksize,
+                                                     margin, False):
+            yield start, end
+
+    def tokenize_file(self, file, encoding='utf8', blocksize=65536,
+                      margin=1024):
+        """
+        Return an iterator over the tokens of a file, reading it a buffer
+        at a time as described for ``span_tokenize_stream()``.
+
+        :param file: a filename, or a file-like object opened in text mode
+        :param encoding: the encoding used to open *file* if it is a
+            filename
+        :rtype: iter(str)
+        """
+        if isinstance(file, string_types):
+            with io.open(file, encoding=encoding, newline='') as stream:
+                for start, end, token in self._stream_tokens(
+                        stream, blocksize, margin, True):
+                    yield token
+        else:
+            for start, end, token in self._stream_tokens(
+                    file, blocksize, margin, True):
+                yield token
+
+    def _stream_tokens(self, stream, blocksize, margin, keep_text):
+        """
+        Yield ``(start, end, token)`` for the tokens read from *stream*,
+        where *token* is None unless *keep_text* is true.  The tokens are
+        those of ``tokenize()`` if *keep_text* is true, and otherwise the
+        spans of ``span_tokenize()``, which never include empty tokens
+        between adjacent separators.
+        """
+        self._check_regexp()
+
+        # The text read but not yet discarded, which starts at `offset` in
+        # the stream.  `pos` is where matching resumes, and `left` is the
+        # end of the last separator when this tokenizer matches gaps; both
+        # are relative to `text`.
+        text, offset, pos, left = '', 0, 0, 0
+        skip_empty = False
+        eof = False
+        while not eof:
+            block = stream.read(blocksize)
+            eof = not block
+            text += block
+            final = len(text) if eof else len(text) - margin
+
+            for m in self._regexp.finditer(text, pos):
+                start, end = m.span()
+                if end > final:
+                    # This match may change once more text has been read;
+                    # no earlier match can start before `final`.
+                    pos = max(pos, min(start, final))
+                    break
+                if skip_empty and start == end == pos:
+                    continue
+                if self._gaps:
+                    if start != left or (keep_text and
+                                         not self._discard_empty):
+                        yield (offset + left, offset + start,
+                               text[left:start] if keep_text else None)
+                    left = end
+                else:
+                    yield (offset + start, offset + end,
+                           text[start:end] if keep_text else None)
+                pos = end
+                skip_empty = (start == end)
+            else:
+                pos = max(pos, final)
+
+            # Discard consumed text, keeping `margin` characters before the
+            # resume position for lookbehind and word boundaries.
+            cut = pos - margin
+            if self._gaps and keep_text:
+                cut = min(cut, left)
+            if cut > 0:
+                text = text[cut:]
+                offset += cut
+                pos -= cut
+                left -= cut
+
+        if self._gaps and not (self._discard_empty and left == len(text)):
+            yield (offset + left, offset + len(text),
+                   text[left:] if keep_text else None)
+
     def __repr__(self):
         return ('%s(pattern=%r, gaps=%r, discard_empty=%r, flags=%r)' %
                 (self.__class__.__name__, self._pattern, self._gaps,
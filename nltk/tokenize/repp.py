@@ -19,7 +19,7 @@ import tempfile
 
 
 from nltk.data import ZipFilePathPointer
-from nltk.internals import find_dir
+from nltk.internals import find_dir, PersistentProcess
 
 from nltk.tokenize.api import TokenizerI
 
@@ -54,13 +54,37 @@ class ReppTokenizer(TokenizerI):
     [(u'Tokenization', 0, 12), (u'is', 13, 15), (u'widely', 16, 22), (u'regarded', 23, 31), (u'as', 32, 34), (u'a', 35, 36), (u'solved', 37, 43), (u'problem', 44, 51), (u'due', 52, 55), (u'to', 56, 58), (u'the', 59, 62), (u'high', 63, 67), (u'accuracy', 68, 76), (u'that', 77, 81), (u'rulebased', 82, 91), (u'tokenizers', 92, 102), (u'achieve', 103, 110), (u'.', 110, 111)]
     [(u'But', 0, 3), (u'rule-based', 4, 14), (u'tokenizers', 15, 25), (u'are', 26, 29), (u'hard', 30, 34), (u'to', 35, 37), (u'maintain', 38, 46), (u'and', 47, 50), (u'their', 51, 56), (u'rules', 57, 62), (u'language', 63, 71), (u'specific', 72, 80), (u'.', 80, 81)]
     [(u'We', 0, 2), (u'evaluated', 3, 12), (u'our', 13, 16), (u'method', 17, 23), (u'on', 24, 26), (u'three', 27, 32), (u'languages', 33, 42), (u'and', 43, 46), (u'obtained', 47, 55), (u'error', 56, 61), (u'rates', 62, 67), (u'of', 68, 70), (u'0.27', 71, 75), (u'%', 75, 76), (u'(', 77, 78), (u'English', 78, 85), (u')', 85, 86), (u',', 86, 87), (u'0.35', 88, 92), (u'%', 92, 93), (u'(', 94, 95), (u'Dutch', 95, 100), (u')', 100, 101), (u'and', 102, 105), (u'0.76', 106, 110), (u'%', 110, 111), (u'(', 112, 113), (u'Italian', 113, 120), (u')', 120, 121), (u'for', 122, 125), (u'our', 126, 129), (u'best', 130, 134), (u'models', 135, 141), (u'.', 141, 142)]
+
+    With ``persistent=True``, sentences are streamed to a REPP process (or a
+    pool of ``processes`` of them) that is started on first use and kept
+    running until ``close()`` is called, instead of running REPP on a
+    temporary file for every call:
+
+    >>> with ReppTokenizer('/home/alvas/repp/', persistent=True) as tokenizer: # doctest: +SKIP
+    ...     list(tokenizer.tokenize_sents(sents))                              # doctest: +SKIP
     """
-    def __init__(self, repp_dir, encoding='utf8'):
+    def __init__(self, repp_dir, encoding='utf8', persistent=False,
+                 processes=1):
         self.repp_dir = self.find_repptokenizer(repp_dir)
         # Set a directory to store the temporary files. 
         self.working_dir = tempfile.gettempdir()
         # Set an encoding for the input strings.
         self.encoding = encoding
+        self._persistent = persistent
+        self._num_processes = processes
+        self._process = None
+
+    def close(self):
+        """Stop the persistent REPP process, if one is running."""
+        if self._process is not None:
+            self._process.close()
+            self._process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
         
     def tokenize(self, sentence):
         """
@@ -82,6 +106,16 @@ class ReppTokenizer(TokenizerI):
         :return: A list of tuples of tokens
         :rtype: iter(tuple(str))
         """
+        if self._persistent:
+            for repp_output in self._persistent_outputs(sentences):
+                # Each output is a single sentence, possibly with no tokens.
+                tokenized_sent, = self.parse_repp_outputs(repp_output)
+                if not keep_token_positions:
+                    tokenized_sent = tuple(token for token, start, end
+                                           in tokenized_sent)
+                yield tokenized_sent
+            return
+
         with tempfile.NamedTemporaryFile(prefix='repp_input.', 
             dir=self.working_dir, mode='w', delete=False) as input_file:
             # Write sentences to temporary input file.
@@ -102,15 +136,35 @@ class ReppTokenizer(TokenizerI):
         """
         This module generates the REPP command to be used at the terminal.
         
-        :param inputfilename: path to the input file
+        :param inputfilename: path to the input file, or None to read
+            from standard input
         :type inputfilename: str
         """
         cmd = [self.repp_dir + '/src/repp']
         cmd+= ['-c', self.repp_dir + '/erg/repp.set']
         cmd+= ['--format', 'triple']
-        cmd+= [inputfilename]
+        if inputfilename is not None:
+            cmd+= [inputfilename]
         return cmd  
 
+    def _persistent_outputs(self, sentences):
+        """
+        Send *sentences* to the persistent REPP process, returning its
+        output for each of them.  In the triple format, the output for a
+        sentence ends with an empty line.  Blank sentences have no tokens,
+        and are not sent.
+        """
+        if self._process is None:
+            cmd = self.generate_repp_command(inputfilename=None)
+            self._process = PersistentProcess(cmd, item_end=lambda line: not line,
+                                              encoding=self.encoding,
+                                              processes=self._num_processes)
+        sentences = [text_type(sent) for sent in sentences]
+        answers = iter(self._process.communicate(
+            [sent for sent in sentences if sent.strip()]))
+        return ['\n'.join(next(answers)).strip() if sent.strip() else ''
+                for sent in sentences]
+
     @staticmethod
     def _execute(cmd):
         p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
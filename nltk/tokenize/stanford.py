@@ -17,7 +17,8 @@ import warnings
 
 from six import text_type
 
-from nltk.internals import find_jar, config_java, java, _java_options
+from nltk.internals import (find_jar, config_java, java, java_command,
+                            _java_options, PersistentProcess)
 from nltk.tokenize.api import TokenizerI
 from nltk.parse.corenlp import CoreNLPParser
 
@@ -35,11 +36,23 @@ class StanfordTokenizer(TokenizerI):
     >>> s = "The colour of the wall is blue."
     >>> StanfordTokenizer(options={"americanize": True}).tokenize(s)
     ['The', 'color', 'of', 'the', 'wall', 'is', 'blue', '.']
+
+    By default, each call starts a new Java process.  With ``persistent=True``
+    a single process (or a pool of ``processes`` of them) is started on first
+    use and kept running, and strings are sent to it one per line, for
+    PTBTokenizer to answer with the tokens of each line on one line (its
+    ``-preserveLines`` option); call ``close()``, or use the tokenizer in a
+    ``with`` statement, to stop it:
+
+    >>> with StanfordTokenizer(persistent=True) as tokenizer:
+    ...     tokenizer.tokenize_sents(["Good muffins cost $3.88.", "Thanks."])
+    [['Good', 'muffins', 'cost', '$', '3.88', '.'], ['Thanks', '.']]
     """
 
     _JAR = 'stanford-postagger.jar'
 
-    def __init__(self, path_to_jar=None, encoding='utf8', options=None, verbose=False, java_options='-mx1000m'):
+    def __init__(self, path_to_jar=None, encoding='utf8', options=None, verbose=False, java_options='-mx1000m',
+                 persistent=False, processes=1):
         # Raise deprecation warning.
         warnings.warn(str("\nThe StanfordTokenizer will "
                           "be deprecated in version 3.2.5.\n"
@@ -59,6 +72,22 @@ class StanfordTokenizer(TokenizerI):
         options = {} if options is None else options
         self._options_cmd = ','.join('{0}={1}'.format(key, val) for key, val in options.items())
 
+        self._persistent = persistent
+        self._num_processes = processes
+        self._process = None
+
+    def close(self):
+        """Stop the persistent Java process, if one is running."""
+        if self._process is not None:
+            self._process.close()
+            self._process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     @staticmethod
     def _parse_tokenized_output(s):
         return s.splitlines()
@@ -67,11 +96,44 @@ class StanfordTokenizer(TokenizerI):
         """
         Use stanford tokenizer's PTBTokenizer to tokenize multiple sentences.
         """
+        if self._persistent:
+            return self.tokenize_sents([s])[0]
         cmd = [
             'edu.stanford.nlp.process.PTBTokenizer',
         ]
         return self._parse_tokenized_output(self._execute(cmd, s))
 
+    def tokenize_sents(self, strings):
+        """
+        Tokenize each of *strings*; in persistent mode, they are all sent
+        to the running PTBTokenizer process as a single batch.
+        """
+        if not self._persistent:
+            return super(StanfordTokenizer, self).tokenize_sents(strings)
+        # With -preserveLines, the tokens of each input line are written
+        # on a single output line, separated by spaces.  Blank strings
+        # have no tokens, and are not sent.
+        lines = [' '.join(s.split()) for s in strings]
+        answers = iter(self._persistent_process().communicate(
+            [line for line in lines if line]))
+        return [next(answers)[0].split() if line else [] for line in lines]
+
+    def _persistent_process(self):
+        if self._process is None:
+            cmd = ['edu.stanford.nlp.process.PTBTokenizer', '-preserveLines',
+                   '-charset', self._encoding]
+            if self._options_cmd:
+                cmd.extend(['-options', self._options_cmd])
+
+            default_options = ' '.join(_java_options)
+            config_java(options=self.java_options, verbose=False)
+            cmd = java_command(cmd, classpath=self._stanford_jar)
+            config_java(options=default_options, verbose=False)
+
+            self._process = PersistentProcess(cmd, encoding=self._encoding,
+                                              processes=self._num_processes)
+        return self._process
+
     def _execute(self, cmd, input_, verbose=False):
         encoding = self._encoding
         cmd.extend(['-charset', encoding])
@@ -21,7 +21,8 @@ import warnings
 
 from nltk import compat
 from nltk.internals import find_jar, find_file, find_dir, \
-                           config_java, java, _java_options
+                           config_java, java, java_command, _java_options, \
+                           PersistentProcess
 from nltk.tokenize.api import TokenizerI
 
 from six import text_type
@@ -49,6 +50,13 @@ class StanfordSegmenter(TokenizerI):
     >>> print(seg.segment(sent.split()))
     \u0647\u0630\u0627 \u0647\u0648 \u062a\u0635\u0646\u064a\u0641 \u0633\u062a\u0627\u0646\u0641\u0648\u0631\u062f \u0627\u0644\u0639\u0631\u0628\u064a \u0644 \u0627\u0644\u0643\u0644\u0645\u0627\u062a
     <BLANKLINE>
+
+    With ``persistent=True``, ``segment_sents()`` sends sentences to a
+    segmenter process (or a pool of ``processes`` of them) that is started
+    on first use and kept running, reading from its standard input
+    (``-readStdin``) and answering each line with one line, until
+    ``close()`` is called.  Calling ``default_config()`` stops it, so that
+    the next call starts one with the new configuration.
     """
 
     _JAR = 'stanford-segmenter.jar'
@@ -63,7 +71,8 @@ class StanfordSegmenter(TokenizerI):
                  sihan_post_processing='false',
                  keep_whitespaces='false',
                  encoding='UTF-8', options=None,
-                 verbose=False, java_options='-mx2g'):
+                 verbose=False, java_options='-mx2g',
+                 persistent=False, processes=1):
         # Raise deprecation warning.
         warnings.simplefilter('always', DeprecationWarning)
         warnings.warn(str("\nThe StanfordTokenizer will "
@@ -104,11 +113,28 @@ class StanfordSegmenter(TokenizerI):
         options = {} if options is None else options
         self._options_cmd = ','.join('{0}={1}'.format(key, json.dumps(val)) for key, val in options.items())
 
+        self._persistent = persistent
+        self._num_processes = processes
+        self._process = None
+
+    def close(self):
+        """Stop the persistent segmenter process, if one is running."""
+        if self._process is not None:
+            self._process.close()
+            self._process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def default_config(self, lang):
         """
         Attempt to intialize Stanford Word Segmenter for the specified language
         using the STANFORD_SEGMENTER and STANFORD_MODELS environment variables
         """
+        self.close()
 
         search_path = ()
         if os.environ.get('STANFORD_SEGMENTER'):
@@ -184,6 +210,14 @@ class StanfordSegmenter(TokenizerI):
     def segment_sents(self, sentences):
         """
         """
+        if self._persistent:
+            # Empty sentences are not sent, and give empty lines.
+            lines = [' '.join(x) for x in sentences]
+            answers = iter(self._persistent_process().communicate(
+                [line for line in lines if line.strip()]))
+            return ''.join((next(answers)[0] if line.strip() else '') + '\n'
+                           for line in lines)
+
         encoding = self._encoding
         # Create a temporary input file
         _input_fh, self._input_file_path = tempfile.mkstemp(text=True)
@@ -214,6 +248,31 @@ class StanfordSegmenter(TokenizerI):
 
         return stdout
 
+    def _persistent_process(self):
+        if self._process is None:
+            cmd = [
+                self._java_class,
+                '-loadClassifier', self._model,
+                '-keepAllWhitespaces', self._keep_whitespaces,
+                '-readStdin'
+            ]
+            if self._sihan_corpora_dict is not None:
+                cmd.extend(['-serDictionary', self._dict,
+                            '-sighanCorporaDict', self._sihan_corpora_dict,
+                            '-sighanPostProcessing', self._sihan_post_processing])
+            cmd.extend(['-inputEncoding', self._encoding])
+            if self._options_cmd:
+                cmd.extend(['-options', self._options_cmd])
+
+            default_options = ' '.join(_java_options)
+            config_java(options=self.java_options, verbose=False)
+            cmd = java_command(cmd, classpath=self._stanford_jar)
+            config_java(options=default_options, verbose=False)
+
+            self._process = PersistentProcess(cmd, encoding=self._encoding,
+                                              processes=self._num_processes)
+        return self._process
+
     def _execute(self, cmd, verbose=False):
         encoding = self._encoding
         cmd.extend(['-inputEncoding', encoding])
@@ -7,7 +7,6 @@
 # For license information, see LICENSE.TXT
 
 import re
-import math
 
 try:
     import numpy
@@ -20,6 +19,9 @@ BLOCK_COMPARISON, VOCABULARY_INTRODUCTION = 0, 1
 LC, HC = 0, 1
 DEFAULT_SMOOTHING = [0]
 
+# The largest term-count matrix built at once by the block comparison method.
+MAX_MATRIX_CELLS = 2 ** 22
+
 
 class TextTilingTokenizer(TokenizerI):
     """Tokenize a document into topical sections using the TextTiling algorithm.
@@ -82,6 +84,71 @@ class TextTilingTokenizer(TokenizerI):
         """Return a tokenized copy of *text*, where each "token" represents
         a separate topic."""
 
+        (segmented_text, gap_scores, smooth_scores, depth_scores,
+         segment_boundaries) = self._tokenize(text)
+
+        if self.demo_mode:
+            return gap_scores, smooth_scores, depth_scores, segment_boundaries
+        return segmented_text
+
+    def tokenize_stream(self, stream, lookahead=100):
+        """Segment a long text incrementally, yielding each topical section
+        as soon as it is found.
+
+        *stream* is an iterable of pieces of text, such as an open file.
+        Text is buffered until it holds *lookahead* pseudosentences; the
+        buffer is then segmented as by ``tokenize()``, all its sections but
+        the last are yielded, and the last one is kept to be continued by
+        the following text.  Memory use is therefore bounded by the
+        lookahead rather than the length of the text, but boundaries are
+        chosen with less context than ``tokenize()`` has, so the two
+        methods need not agree.  Concatenating the sections yields the
+        original text.
+
+        :param stream: the text to segment, in pieces
+        :type stream: iter(str)
+        :param lookahead: the number of pseudosentences to buffer before
+            looking for boundaries
+        :type lookahead: int
+        :rtype: iter(str)
+        """
+        limit = lookahead * self.w
+        pieces, word_count = [], 0
+        for piece in stream:
+            pieces.append(piece)
+            word_count += len(re.findall(r"\w+", piece))
+            if word_count < limit:
+                continue
+            text = ''.join(pieces)
+            sections = self._tokenize_or_whole(text)
+            if len(sections) > 1:
+                for section in sections[:-1]:
+                    yield section
+                pieces = [sections[-1]]
+                word_count = len(re.findall(r"\w+", sections[-1]))
+            elif word_count >= 2 * limit:
+                # No boundary in twice the lookahead: give up on this text
+                # rather than let the buffer grow without bound.
+                yield text
+                pieces, word_count = [], 0
+
+        text = ''.join(pieces)
+        if text:
+            for section in self._tokenize_or_whole(text):
+                yield section
+
+    def _tokenize_or_whole(self, text):
+        """Segment *text*, treating texts too short to segment as a
+        single section."""
+        try:
+            return self._tokenize(text)[0]
+        except ValueError:
+            return [text]
+
+    def _tokenize(self, text):
+        """Segment *text*, returning the sections along with the gap,
+        smoothed and depth scores and the boundaries used in demo mode."""
+
         lowercase_text = text.lower()
         paragraph_breaks = self._mark_paragraph_breaks(text)
         text_length = len(lowercase_text)
@@ -89,8 +156,7 @@ class TextTilingTokenizer(TokenizerI):
         # Tokenization step starts here
 
         # Remove punctuation
-        nopunct_text = ''.join(c for c in lowercase_text
-                               if re.match("[a-z\-\' \n\t]", c))
+        nopunct_text = re.sub("[^a-z\-\' \n\t]", '', lowercase_text)
         nopunct_par_breaks = self._mark_paragraph_breaks(nopunct_text)
 
         tokseqs = self._divide_to_tokensequences(nopunct_text)
@@ -103,9 +169,10 @@ class TextTilingTokenizer(TokenizerI):
         #words = _stem_words(words)
 
         # Filter stopwords
+        stopwords = set(self.stopwords)
         for ts in tokseqs:
             ts.wrdindex_list = [wi for wi in ts.wrdindex_list
-                                if wi[0] not in self.stopwords]
+                                if wi[0] not in stopwords]
 
         token_table = self._create_token_table(tokseqs, nopunct_par_breaks)
         # End of the Tokenization step
@@ -147,50 +214,66 @@ class TextTilingTokenizer(TokenizerI):
         if not segmented_text:
             segmented_text = [text]
 
-        if self.demo_mode:
-            return gap_scores, smooth_scores, depth_scores, segment_boundaries
-        return segmented_text
+        return (segmented_text, gap_scores, smooth_scores, depth_scores,
+                segment_boundaries)
 
     def _block_comparison(self, tokseqs, token_table):
-        """Implements the block comparison method"""
-        def blk_frq(tok, block):
-            ts_occs = filter(lambda o: o[0] in block,
-                             token_table[tok].ts_occurences)
-            freq = sum([tsocc[1] for tsocc in ts_occs])
-            return freq
-
-        gap_scores = []
-        numgaps = len(tokseqs)-1
-
-        for curr_gap in range(numgaps):
-            score_dividend, score_divisor_b1, score_divisor_b2 = 0.0, 0.0, 0.0
-            score = 0.0
-            # adjust window size for boundary conditions
-            if curr_gap < self.k-1:
-                window_size = curr_gap + 1
-            elif curr_gap > numgaps-self.k:
-                window_size = numgaps - curr_gap
-            else:
-                window_size = self.k
-
-            b1 = [ts.index
-                  for ts in tokseqs[curr_gap-window_size+1 : curr_gap+1]]
-            b2 = [ts.index
-                  for ts in tokseqs[curr_gap+1 : curr_gap+window_size+1]]
-
-            for t in token_table:
-                score_dividend += blk_frq(t, b1)*blk_frq(t, b2)
-                score_divisor_b1 += blk_frq(t, b1)**2
-                score_divisor_b2 += blk_frq(t, b2)**2
-            try:
-                score = score_dividend / math.sqrt(score_divisor_b1 *
-                                                   score_divisor_b2)
-            except ZeroDivisionError:
-                pass  # score += 0.0
-
-            gap_scores.append(score)
-
-        return gap_scores
+        """Implements the block comparison method.
+
+        The scores are computed from a term-count matrix with a row per
+        pseudosentence: the difference of two of its cumulative row sums
+        is the term-count vector of a block, so the blocks either side of
+        every gap are found at once.  The matrix is built a slice of
+        columns at a time to bound memory use on long texts."""
+        numseqs = len(tokseqs)
+        numgaps = numseqs - 1
+        if numgaps < 1:
+            return []
+
+        # One entry per (pseudosentence, token) pair, ordered by token.
+        rows, cols, counts = [], [], []
+        for col, field in enumerate(token_table.values()):
+            for ts, count in field.ts_occurences:
+                rows.append(ts)
+                cols.append(col)
+                counts.append(count)
+        rows = numpy.array(rows, dtype=numpy.intp) + 1
+        cols = numpy.array(cols, dtype=numpy.intp)
+        counts = numpy.array(counts, dtype=numpy.int64)
+
+        # adjust window size for boundary conditions
+        gaps = numpy.arange(numgaps)
+        window_size = numpy.where(gaps < self.k-1, gaps + 1,
+                                  numpy.where(gaps > numgaps-self.k,
+                                              numgaps - gaps, self.k))
+        b1_start = gaps - window_size + 1
+        b2_start = gaps + 1
+        b2_end = numpy.minimum(gaps + window_size + 1, numseqs)
+
+        score_dividend = numpy.zeros(numgaps, dtype=numpy.int64)
+        score_divisor_b1 = numpy.zeros(numgaps, dtype=numpy.int64)
+        score_divisor_b2 = numpy.zeros(numgaps, dtype=numpy.int64)
+
+        numcols = len(token_table)
+        step = max(1, MAX_MATRIX_CELLS // (numseqs + 1))
+        for first in range(0, numcols, step):
+            lo, hi = numpy.searchsorted(cols, [first, first + step])
+            matrix = numpy.zeros((numseqs + 1, min(step, numcols - first)),
+                                 dtype=numpy.int64)
+            matrix[rows[lo:hi], cols[lo:hi] - first] = counts[lo:hi]
+            numpy.cumsum(matrix, axis=0, out=matrix)
+            b1 = matrix[b2_start] - matrix[b1_start]
+            b2 = matrix[b2_end] - matrix[b2_start]
+            score_dividend += (b1 * b2).sum(axis=1)
+            score_divisor_b1 += (b1 * b1).sum(axis=1)
+            score_divisor_b2 += (b2 * b2).sum(axis=1)
+
+        score_divisor = numpy.sqrt(score_divisor_b1.astype(float) *
+                                   score_divisor_b2.astype(float))
+        gap_scores = numpy.zeros(numgaps)
+        nonzero = score_divisor != 0
+        gap_scores[nonzero] = score_dividend[nonzero] / score_divisor[nonzero]
+        return gap_scores.tolist()
 
     def _smooth_scores(self, gap_scores):
         "Wraps the smooth function from the SciPy Cookbook"
@@ -293,11 +376,11 @@ class TextTilingTokenizer(TokenizerI):
         hp = list(filter(lambda x: x[0] > cutoff, depth_tuples))
 
         for dt in hp:
-            boundaries[dt[1]] = 1
-            for dt2 in hp:  # undo if there is a boundary close already
-                if dt[1] != dt2[1] and abs(dt2[1]-dt[1]) < 4 \
-                       and boundaries[dt2[1]] == 1:
-                    boundaries[dt[1]] = 0
+            # undo if there is a boundary close already
+            nearby = boundaries[max(dt[1]-3, 0):dt[1]] + \
+                boundaries[dt[1]+1:dt[1]+4]
+            if 1 not in nearby:
+                boundaries[dt[1]] = 1
         return boundaries
 
     def _depth_scores(self, scores):
@@ -310,23 +393,23 @@ class TextTilingTokenizer(TokenizerI):
         # pseudosentences for small texts and around 5 for larger ones.
 
         clip = min(max(len(scores) // 10, 2), 5)
-        index = clip
-
-        for gapscore in scores[clip:-clip]:
-            lpeak = gapscore
-            for score in scores[index::-1]:
-                if score >= lpeak:
-                    lpeak = score
-                else:
-                    break
-            rpeak = gapscore
-            for score in scores[index:]:
-                if score >= rpeak:
-                    rpeak = score
-                else:
-                    break
-            depth_scores[index] = lpeak + rpeak - 2 * gapscore
-            index += 1
+
+        # The left peak of a gap is found by climbing the scores leftwards
+        # for as long as they do not decrease; this is the left peak of the
+        # previous gap if its score is at least as high, so all the peaks
+        # can be found in one pass in each direction.
+        lpeaks = list(scores)
+        for index in range(1, len(scores)):
+            if scores[index-1] >= scores[index]:
+                lpeaks[index] = lpeaks[index-1]
+        rpeaks = list(scores)
+        for index in range(len(scores)-2, -1, -1):
+            if scores[index+1] >= scores[index]:
+                rpeaks[index] = rpeaks[index+1]
+
+        for index in range(clip, len(scores)-clip):
+            depth_scores[index] = (lpeaks[index] + rpeaks[index] -
+                                   2 * scores[index])
 
         return depth_scores
 
@@ -749,3 +749,148 @@ def choose(n, k):
         return ntok // ktok
     else:
         return 0
+
+######################################################################
+# Parallel processing
+######################################################################
+
+# The object shipped to each worker process by ``parallel_apply`` and
+# ``WorkerPool``.
+_worker_object = None
+
+def _parallel_init(obj):
+    global _worker_object
+    _worker_object = obj
+
+def _parallel_call(args):
+    method, item = args
+    return getattr(_worker_object, method)(item)
+
+def parallel_apply(obj, method, items, n_jobs=1, chunksize=1):
+    """
+    Call ``obj.method(item)`` for each element of ``items`` and yield
+    the results in input order.
+
+    If ``n_jobs`` is 1, the calls are made in the current process.
+    Otherwise, ``items`` are distributed over a ``multiprocessing.Pool``
+    of ``n_jobs`` workers (all available CPUs if ``n_jobs`` is ``None``
+    or negative).  ``obj`` is sent to each worker only once, when the
+    worker starts (it is inherited without pickling where processes are
+    forked), rather than once per task.  ``items`` is read lazily: no
+    more than two windows of a few chunks per worker are read ahead of
+    the results that have been yielded.
+
+        >>> from nltk.util import parallel_apply
+        >>> list(parallel_apply('abc', 'count', ['a', 'b', 'd']))
+        [1, 1, 0]
+
+    :param obj: the object whose method is called; must be picklable
+        unless worker processes are forked.
+    :param method: the name of the method to call.
+    :type method: str
+    :param items: the arguments for each call.
+    :param n_jobs: the number of worker processes.
+    :type n_jobs: int
+    :param chunksize: the number of items sent to a worker at a time.
+    :type chunksize: int
+    :rtype: iter
+    """
+    if n_jobs == 1:
+        call = getattr(obj, method)
+        for item in items:
+            yield call(item)
+        return
+
+    import multiprocessing
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(n_jobs, _parallel_init, (obj,))
+    try:
+        # The pool reads its whole input as soon as it can, so it is given
+        # one window of items at a time; the next window is submitted
+        # before the results of the current one are yielded, so that the
+        # workers don't wait between windows.
+        items = iter(items)
+        window = 4 * n_jobs * chunksize
+        pending = None
+        while True:
+            tasks = [(method, item) for item in islice(items, window)]
+            results = (pool.imap(_parallel_call, tasks, chunksize)
+                       if tasks else None)
+            if pending is not None:
+                for result in pending:
+                    yield result
+            if results is None:
+                break
+            pending = results
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+class WorkerPool(object):
+    """
+    A pool of ``n_jobs`` worker processes, each holding a copy of
+    ``obj``, for calling the methods of ``obj`` many times, as in each
+    iteration of a training algorithm, without starting new processes
+    or sending ``obj`` again each time.  ``obj`` is sent to each worker
+    once, when it starts (it is inherited without pickling where
+    processes are forked), so it should hold the data that does not
+    change between calls; the rest is passed with each call.
+
+    If ``n_jobs`` is 1, the calls are made in the current process.  A
+    ``WorkerPool`` should be closed when it is no longer needed, or used
+    in a ``with`` statement.
+
+        >>> from nltk.util import WorkerPool
+        >>> with WorkerPool('abc', n_jobs=2) as pool:
+        ...     pool.map('count', ['a', 'b', 'd'])
+        [1, 1, 0]
+
+    :param obj: the object whose methods are called; must be picklable
+        unless worker processes are forked.
+    :param n_jobs: the number of worker processes (all available CPUs if
+        ``None`` or negative).
+    :type n_jobs: int
+    """
+    def __init__(self, obj, n_jobs=1):
+        self._obj = obj
+        self._pool = None
+        if n_jobs is None or n_jobs < 1:
+            import multiprocessing
+            n_jobs = multiprocessing.cpu_count()
+        self.n_jobs = n_jobs
+        if n_jobs != 1:
+            import multiprocessing
+            self._pool = multiprocessing.Pool(n_jobs, _parallel_init, (obj,))
+
+    def map(self, method, items, chunksize=1):
+        """
+        Return the list of the results of ``obj.method(item)`` for each
+        element of ``items``, in input order.
+
+        :param method: the name of the method to call.
+        :type method: str
+        :param chunksize: the number of items sent to a worker at a time.
+        :type chunksize: int
+        :rtype: list
+        """
+        if self._pool is None:
+            call = getattr(self._obj, method)
+            return [call(item) for item in items]
+        return self._pool.map(_parallel_call,
+                              [(method, item) for item in items], chunksize)
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()